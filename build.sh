@@ -2,7 +2,7 @@
 set -euo pipefail
 
 SOURCE_DIR="llvm-project/llvm"
-BUILD_DIR="llvm-project/build"
+BUILD_DIR="${BUILD_DIR:-llvm-project/build}"
 CMAKE_BUILD_TYPE="Release"
 LLVM_ENABLE_PROJECTS="clang;clang-tools-extra"
 
@@ -42,6 +42,11 @@ cmake -G Ninja \
     -DCLANG_TIDY_ENABLE_STATIC_ANALYZER=OFF \
     "${CMAKE_EXTRA_ARGS[@]}"
 
+if [ -n "${CONFIGURE_ONLY:-}" ]; then
+    echo "Configured only, clang-tidy comes from the build cache"
+    exit 0
+fi
+
 echo "Building clang-tidy"
 ninja -C "$BUILD_DIR" clang-tidy
 
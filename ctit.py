@@ -2,12 +2,33 @@
 """CTIT - Clang Tidy Integration Tester CLI."""
 
 import argparse
+import json
+import os
 import sys
 
+from parse_issue import ParseResult
+from testers.benchmark import DEFAULT_BENCH_OUTPUT, bench
+from testers.build import DEFAULT_BUILD_DIR, DEFAULT_BUILD_SCRIPT, DEFAULT_KEEP_TREES
+from testers.build import DEFAULT_LLVM_DIR, build_clang_tidy
+from testers.build_cache import DEFAULT_BUILD_CACHE_MAX_BYTES
 from testers.clone_projects import clone_projects
 from testers.config import CONFIG_FILE, PROJECTS_DIR
 from testers.generate_report import DEFAULT_LOG_DIR, DEFAULT_OUTPUT_FILE
-from testers.generate_report import generate_report
+from testers.generate_report import DEFAULT_DETAILS_FILE, DEFAULT_MAX_BYTES
+from testers.generate_report import DEFAULT_TOP_N, generate_report
+from testers.generate_report import project_browse_urls
+from testers.report_formats import DEFAULT_JSON_FILE, DEFAULT_SARIF_FILE
+from testers.report_formats import write_result_formats
+from testers.result_store import DEFAULT_STORE, query, store_results
+from testers.run_tidy import DEFAULT_CLANG_TIDY, run_project
+from testers.stream_report import stream_report
+from testers.unit_cache import DEFAULT_UNIT_CACHE_MAX_BYTES
+
+
+def structured_outputs(args: argparse.Namespace, formats: list[str]) -> dict[str, str]:
+    """Maps the requested structured formats to their output paths."""
+    paths = {"json": args.json_output, "sarif": args.sarif_output}
+    return {fmt: paths[fmt] for fmt in dict.fromkeys(formats) if fmt in paths}
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -31,6 +52,22 @@ def main(argv: list[str] | None = None) -> None:
         default=CONFIG_FILE,
         help=f"Path to config file (default: {CONFIG_FILE})",
     )
+    clone_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of projects to clone concurrently (default: 1)",
+    )
+    clone_parser.add_argument(
+        "--filter",
+        dest="filter_spec",
+        help="Partial clone filter passed to git fetch (e.g. blob:none)",
+    )
+    clone_parser.add_argument(
+        "--cache-dir",
+        help="Persistent directory of bare mirrors; projects become worktrees",
+    )
 
     report_parser = subparsers.add_parser(
         "report",
@@ -46,6 +83,319 @@ def main(argv: list[str] | None = None) -> None:
         default=DEFAULT_OUTPUT_FILE,
         help=f"Output markdown file (default: {DEFAULT_OUTPUT_FILE})",
     )
+    report_parser.add_argument(
+        "--format",
+        dest="formats",
+        action="append",
+        choices=["markdown", "json", "sarif"],
+        help="Output format (repeatable; default: markdown)",
+    )
+    report_parser.add_argument(
+        "--json-output",
+        default=DEFAULT_JSON_FILE,
+        help=f"JSON output file, gzipped if it ends in .gz "
+        f"(default: {DEFAULT_JSON_FILE})",
+    )
+    report_parser.add_argument(
+        "--sarif-output",
+        default=DEFAULT_SARIF_FILE,
+        help=f"SARIF output file, gzipped if it ends in .gz "
+        f"(default: {DEFAULT_SARIF_FILE})",
+    )
+    report_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes used to parse log files (default: 1)",
+    )
+    report_parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Re-parse every log instead of reusing cached results",
+    )
+    report_parser.add_argument(
+        "--baseline",
+        action="store_true",
+        help="Only report findings added or removed relative to the baseline "
+        "results written by 'run --baseline-clang-tidy'",
+    )
+    report_parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help="Report size budget in bytes; 0 disables it "
+        f"(default: {DEFAULT_MAX_BYTES})",
+    )
+    report_parser.add_argument(
+        "--max-issues",
+        type=int,
+        default=0,
+        help="Maximum number of issues listed in the report; 0 disables it "
+        "(default: 0)",
+    )
+    report_parser.add_argument(
+        "--top-n",
+        type=int,
+        default=DEFAULT_TOP_N,
+        help="Files and messages listed for projects over budget "
+        f"(default: {DEFAULT_TOP_N})",
+    )
+    report_parser.add_argument(
+        "--details-output",
+        default=DEFAULT_DETAILS_FILE,
+        help="Gzipped full report written when the budget truncates it "
+        f"(default: {DEFAULT_DETAILS_FILE})",
+    )
+    report_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Spill parsed issues to disk and stream them into the report, "
+        "keeping memory bounded (no parse cache or --baseline)",
+    )
+    report_parser.add_argument(
+        "--store",
+        nargs="?",
+        const=DEFAULT_STORE,
+        help="Also ingest the parsed issues into this SQLite result store "
+        f"(default: {DEFAULT_STORE})",
+    )
+    report_parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Only count diagnostics and detect crashes, skipping per-issue "
+        "details (no --stream, --baseline or --store)",
+    )
+
+    run_parser = subparsers.add_parser(
+        "run",
+        help="Run clang-tidy over a project's compile database",
+    )
+    run_parser.add_argument("project", help="Project name, used for its log shards")
+    run_parser.add_argument(
+        "--build-dir",
+        required=True,
+        help="Build directory containing compile_commands.json",
+    )
+    run_parser.add_argument(
+        "--clang-tidy",
+        default=DEFAULT_CLANG_TIDY,
+        help=f"Path to the clang-tidy binary (default: {DEFAULT_CLANG_TIDY})",
+    )
+    run_parser.add_argument(
+        "--check",
+        default=os.environ.get("CHECK_NAME", ""),
+        help="Checks to run, comma-separated (default: $CHECK_NAME)",
+    )
+    run_parser.add_argument(
+        "--tidy-config",
+        default=os.environ.get("TIDY_CONFIG", ""),
+        help="clang-tidy -config string (default: $TIDY_CONFIG)",
+    )
+    run_parser.add_argument(
+        "--config-matrix",
+        default=os.environ.get("TIDY_CONFIG_MATRIX", ""),
+        help="JSON object of labelled -config strings to run each TU with, "
+        "replacing --tidy-config (default: $TIDY_CONFIG_MATRIX)",
+    )
+    run_parser.add_argument(
+        "--log-dir",
+        default=DEFAULT_LOG_DIR,
+        help=f"Directory to write log shards into (default: {DEFAULT_LOG_DIR})",
+    )
+    run_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="Number of concurrent clang-tidy processes (default: number of cores)",
+    )
+    run_parser.add_argument(
+        "--file-regex",
+        help="Only analyze files whose path matches this regex",
+    )
+    run_parser.add_argument(
+        "--filter-token",
+        dest="filter_tokens",
+        action="append",
+        help="Only analyze files reaching this identifier (repeatable; "
+        "default: known tokens of the check)",
+    )
+    run_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Analyze every file, bypassing the token pre-filter",
+    )
+    run_parser.add_argument(
+        "--verify-sample",
+        type=int,
+        default=0,
+        help="Also analyze N filtered-out files to verify the pre-filter",
+    )
+    run_parser.add_argument(
+        "--source-dir",
+        help="Project source root for the pre-filter index",
+    )
+    run_parser.add_argument(
+        "--index-dir",
+        help="Directory to persist the pre-filter index in, per project commit",
+    )
+    run_parser.add_argument(
+        "--baseline-clang-tidy",
+        help="Unpatched clang-tidy binary to compute the baseline with",
+    )
+    run_parser.add_argument(
+        "--baseline-cache-dir",
+        help="Directory caching baseline results across runs",
+    )
+    run_parser.add_argument(
+        "--llvm-revision",
+        default=os.environ.get("LLVM_REVISION"),
+        help="LLVM revision of the baseline binary (default: $LLVM_REVISION)",
+    )
+    run_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record per-check timings with clang-tidy's check profiler",
+    )
+    run_parser.add_argument(
+        "--unit-cache-dir",
+        help="Directory caching clang-tidy output per translation unit",
+    )
+    run_parser.add_argument(
+        "--unit-cache-max-bytes",
+        type=int,
+        default=DEFAULT_UNIT_CACHE_MAX_BYTES,
+        help="Size the unit cache is trimmed to after a run (default: %(default)s)",
+    )
+
+    build_parser = subparsers.add_parser(
+        "build",
+        help="Build the patched clang-tidy, reusing a cached binary if possible",
+    )
+    build_parser.add_argument(
+        "--build-dir",
+        default=DEFAULT_BUILD_DIR,
+        help=f"Build directory of the build script (default: {DEFAULT_BUILD_DIR})",
+    )
+    build_parser.add_argument(
+        "--build-script",
+        default=DEFAULT_BUILD_SCRIPT,
+        help=f"Script building clang-tidy (default: {DEFAULT_BUILD_SCRIPT})",
+    )
+    build_parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get("CTIT_BUILD_CACHE_DIR"),
+        help="Directory caching built binaries (default: $CTIT_BUILD_CACHE_DIR)",
+    )
+    build_parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_BUILD_CACHE_MAX_BYTES,
+        help="Size the build cache is trimmed to (default: %(default)s)",
+    )
+    build_parser.add_argument(
+        "--llvm-revision",
+        default=os.environ.get("LLVM_REVISION"),
+        help="LLVM revision the patch applies to (default: $LLVM_REVISION)",
+    )
+    build_parser.add_argument(
+        "--patch-sha256",
+        default=os.environ.get("PATCH_SHA256"),
+        help="Hash of the applied patch (default: $PATCH_SHA256)",
+    )
+    build_parser.add_argument(
+        "--llvm-dir",
+        default=DEFAULT_LLVM_DIR,
+        help=f"LLVM checkout the patch applies to (default: {DEFAULT_LLVM_DIR})",
+    )
+    build_parser.add_argument(
+        "--tree-dir",
+        default=os.environ.get("CTIT_BUILD_TREE_DIR"),
+        help="Directory keeping an incremental build tree per LLVM revision, "
+        "linked from --build-dir (default: $CTIT_BUILD_TREE_DIR)",
+    )
+    build_parser.add_argument(
+        "--patch",
+        help="Patch to build; with --tree-dir it replaces the previously built "
+        "patch, otherwise it must already be applied",
+    )
+    build_parser.add_argument(
+        "--keep-trees",
+        type=int,
+        default=DEFAULT_KEEP_TREES,
+        help="Number of build trees kept in --tree-dir (default: %(default)s)",
+    )
+
+    query_parser = subparsers.add_parser(
+        "query",
+        help="Query the SQLite result store of historical runs",
+    )
+    query_parser.add_argument(
+        "what",
+        choices=["runs", "issues", "trend"],
+        help="Ingested runs, matching issues with the run they were first "
+        "seen in, or issue counts per run",
+    )
+    query_parser.add_argument(
+        "--store",
+        default=DEFAULT_STORE,
+        help=f"Result store to query (default: {DEFAULT_STORE})",
+    )
+    query_parser.add_argument("--check", help="Only issues of this check")
+    query_parser.add_argument("--project", help="Only issues of this project")
+    query_parser.add_argument(
+        "--file", help="Only issues in this project-relative file"
+    )
+    query_parser.add_argument("--pr", help="Only runs of this PR link")
+    query_parser.add_argument("--run", type=int, help="Only issues of this run id")
+    query_parser.add_argument(
+        "--limit", type=int, help="Maximum number of issues to print"
+    )
+
+    bench_parser = subparsers.add_parser(
+        "bench",
+        help="Benchmark the report pipeline on a synthetic clang-tidy log",
+    )
+    bench_parser.add_argument(
+        "--diagnostics",
+        type=int,
+        default=100_000,
+        help="Number of diagnostics in the synthetic log (default: 100000)",
+    )
+    bench_parser.add_argument(
+        "--crash-density",
+        type=float,
+        default=0.0,
+        help="Fraction of diagnostics followed by a crash dump (default: 0.0)",
+    )
+    bench_parser.add_argument(
+        "--duplicate-ratio",
+        type=float,
+        default=0.0,
+        help="Fraction of diagnostics repeating a header warning (default: 0.0)",
+    )
+    bench_parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for the synthetic log (default: 0)",
+    )
+    bench_parser.add_argument(
+        "--output",
+        default=DEFAULT_BENCH_OUTPUT,
+        help=f"Output JSON file (default: {DEFAULT_BENCH_OUTPUT})",
+    )
+    bench_parser.add_argument(
+        "--compare",
+        help="Previous benchmark JSON to print per-stage speedups against",
+    )
+    bench_parser.add_argument(
+        "--issue-memory",
+        action="store_true",
+        help="Also measure retained memory per parsed issue",
+    )
 
     args = parser.parse_args(argv)
 
@@ -53,9 +403,126 @@ def main(argv: list[str] | None = None) -> None:
         parser.print_usage(sys.stderr)
         sys.exit(1)
     elif args.command == "clone":
-        clone_projects(work_dir=args.work_dir, config_path=args.config)
+        clone_projects(
+            work_dir=args.work_dir,
+            config_path=args.config,
+            jobs=args.jobs,
+            filter_spec=args.filter_spec,
+            cache_dir=args.cache_dir,
+        )
+    elif (
+        args.command == "report"
+        and args.summary_only
+        and (args.stream or args.baseline or args.store)
+    ):
+        report_parser.error(
+            "--summary-only cannot be combined with --stream/--baseline/--store"
+        )
+    elif args.command == "report" and args.stream:
+        if args.baseline:
+            report_parser.error("--stream cannot be combined with --baseline")
+        formats = args.formats or ["markdown"]
+        stream_report(
+            log_dir=args.log_dir,
+            output=args.output,
+            jobs=args.jobs,
+            max_bytes=args.max_bytes,
+            max_issues=args.max_issues,
+            top_n=args.top_n,
+            details_output=args.details_output,
+            markdown="markdown" in formats,
+            structured_outputs=structured_outputs(args, formats),
+            store=args.store,
+        )
     elif args.command == "report":
-        generate_report(log_dir=args.log_dir, output=args.output)
+        formats = args.formats or ["markdown"]
+        results = generate_report(
+            log_dir=args.log_dir,
+            output=args.output,
+            jobs=args.jobs,
+            use_cache=args.use_cache,
+            baseline=args.baseline,
+            max_bytes=args.max_bytes,
+            max_issues=args.max_issues,
+            top_n=args.top_n,
+            details_output=args.details_output,
+            markdown="markdown" in formats,
+            summary_only=args.summary_only,
+        )
+        write_result_formats(
+            structured_outputs(args, formats), results, project_browse_urls()
+        )
+        if args.store:
+            store_results(args.store, results)
+    elif args.command == "run":
+        if not args.check:
+            run_parser.error("a check name is required (--check or $CHECK_NAME)")
+        try:
+            config_matrix = json.loads(args.config_matrix or "{}")
+        except ValueError as e:
+            run_parser.error(f"--config-matrix is not valid JSON: {e}")
+        if not isinstance(config_matrix, dict):
+            run_parser.error("--config-matrix must be a JSON object")
+        request = ParseResult(
+            pr_link=os.environ.get("PR_LINK", ""),
+            check_name=args.check,
+            tidy_config=args.tidy_config,
+            config_matrix=config_matrix,
+        )
+        run_project(
+            project=args.project,
+            build_dir=args.build_dir,
+            request=request,
+            clang_tidy=args.clang_tidy,
+            log_dir=args.log_dir,
+            jobs=args.jobs,
+            file_regex=args.file_regex,
+            filter_tokens=args.filter_tokens,
+            full=args.full,
+            verify_sample=args.verify_sample,
+            source_dir=args.source_dir,
+            index_dir=args.index_dir,
+            baseline_clang_tidy=args.baseline_clang_tidy,
+            baseline_cache_dir=args.baseline_cache_dir,
+            llvm_revision=args.llvm_revision,
+            profile=args.profile,
+            unit_cache_dir=args.unit_cache_dir,
+            unit_cache_max_bytes=args.unit_cache_max_bytes,
+        )
+    elif args.command == "build":
+        build_clang_tidy(
+            build_dir=args.build_dir,
+            build_script=args.build_script,
+            cache_dir=args.cache_dir or None,
+            cache_max_bytes=args.cache_max_bytes,
+            llvm_revision=args.llvm_revision,
+            patch_sha256=args.patch_sha256,
+            llvm_dir=args.llvm_dir,
+            tree_dir=args.tree_dir or None,
+            patch=args.patch,
+            keep_trees=args.keep_trees,
+        )
+    elif args.command == "query":
+        query(
+            path=args.store,
+            what=args.what,
+            check_name=args.check,
+            project=args.project,
+            file_path=args.file,
+            pr_link=args.pr,
+            run_id=args.run,
+            limit=args.limit,
+        )
+    elif args.command == "bench":
+        bench(
+            output=args.output,
+            diagnostics=args.diagnostics,
+            crash_density=args.crash_density,
+            duplicate_ratio=args.duplicate_ratio,
+            seed=args.seed,
+            compare=args.compare,
+            issue_memory=args.issue_memory,
+        )
 
 
 if __name__ == "__main__":
@@ -1,20 +1,41 @@
 import argparse
+import itertools
 import json
+import re
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
+# Alternatives of an option value, e.g. "VariableCase: camelBack | CamelCase".
+# The spaces are required, so regex options can still contain "|".
+ALTERNATIVES_RE = re.compile(r"\s+\|\s+")
+MAX_MATRIX_CONFIGS = 16
+
 
 @dataclass
 class ParseResult:
     pr_link: str
+    # Comma-separated, as passed to clang-tidy's -checks.
     check_name: str
     tidy_config: str
+    # Label and tidy config of each option combination, for matrix runs.
+    config_matrix: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def check_names(self) -> list[str]:
+        return [name.strip() for name in self.check_name.split(",") if name.strip()]
 
 
 def parse_body(body: str) -> ParseResult:
     """
-    Parses the issue body to extract PR link, check name, and tidy configuration.
+    Parses the issue body to extract PR link, check names, and tidy configuration.
+
+    The first line may list several checks. Their options then go in blocks
+    headed by a ``check-name:`` line, or are prefixed with the check name.
+
+    Option values may list alternatives separated by `` | ``; every
+    combination becomes one entry of the config matrix, and the first one
+    is the tidy configuration.
     """
     body = body.strip()
     if not body:
@@ -24,17 +45,23 @@ def parse_body(body: str) -> ParseResult:
     if not lines:
         raise ValueError("No valid lines found")
 
-    # Parse [PR_URL] [CHECK_NAME]
+    # Parse [PR_URL] [CHECK_NAME]...
     first_line: str = lines[0]
     parts: list[str] = first_line.split()
     if len(parts) < 2:
         raise ValueError("First line must contain PR_URL and CHECK_NAME")
 
     pr_link: str = parts[0]
-    check_name: str = parts[1]
+    check_names: list[str] = list(
+        dict.fromkeys(name for part in parts[1:] for name in part.split(",") if name)
+    )
+    if not check_names:
+        raise ValueError("First line must contain PR_URL and CHECK_NAME")
 
-    # Parse options -- simple key and value
+    # Parse options -- simple key and value, per check
     check_options: dict[str, str] = {}
+    # With a single check, every option belongs to it.
+    current: str | None = check_names[0] if len(check_names) == 1 else None
     for line in lines[1:]:
         if ":" not in line:
             continue
@@ -43,28 +70,72 @@ def parse_body(body: str) -> ParseResult:
         key: str = key_raw.strip()
         value: str = value_raw.strip()
 
+        # A "check-name:" line starts the option block of that check
+        if not value and key in check_names:
+            current = key
+            continue
+
         # Handle prefixing and warn if mismatch
         if "." in key:
             prefix, actual_key = key.split(".", 1)
-            if prefix != check_name:
-                print(
-                    f"Warning: Prefix mismatch. Expected '{check_name}', got '{prefix}'. "
-                    f"Overriding to '{check_name}.{actual_key}'",
-                    file=sys.stderr,
-                )
+            if prefix in check_names and len(check_names) > 1:
+                check_name = prefix
+            elif current is None:
+                raise ValueError(f"Option '{key}' is not for one of {check_names}")
+            else:
+                check_name = current
+                if prefix != check_name:
+                    print(
+                        f"Warning: Prefix mismatch. Expected '{check_name}', "
+                        f"got '{prefix}'. "
+                        f"Overriding to '{check_name}.{actual_key}'",
+                        file=sys.stderr,
+                    )
             full_key = f"{check_name}.{actual_key}"
+        elif current is None:
+            raise ValueError(
+                f"Option '{key}' must follow a line naming its check, "
+                f"e.g. '{check_names[0]}:'"
+            )
         else:
-            full_key = f"{check_name}.{key}"
+            full_key = f"{current}.{key}"
 
         check_options[full_key] = value
 
-    # Format as clang-tidy config string
-    tidy_config: str = ""
-    if check_options:
-        config_dict: dict[str, Any] = {"CheckOptions": check_options}
-        tidy_config = json.dumps(config_dict)
-
-    return ParseResult(pr_link=pr_link, check_name=check_name, tidy_config=tidy_config)
+    # Expand alternatives into the option matrix
+    alternatives: dict[str, list[str]] = {
+        key: ALTERNATIVES_RE.split(value) for key, value in check_options.items()
+    }
+    combinations = list(itertools.product(*alternatives.values()))
+    if len(combinations) > MAX_MATRIX_CONFIGS:
+        raise ValueError(
+            f"Option matrix has {len(combinations)} configurations, "
+            f"at most {MAX_MATRIX_CONFIGS} are supported"
+        )
+    # Labels name the varying options, without the prefix of a lone check
+    varying: dict[str, str] = {
+        key: key if len(check_names) > 1 else key.split(".", 1)[1]
+        for key, values in alternatives.items()
+        if len(values) > 1
+    }
+
+    # Format as clang-tidy config strings
+    configs: list[str] = []
+    config_matrix: dict[str, str] = {}
+    for combination in combinations:
+        options: dict[str, str] = dict(zip(alternatives, combination))
+        config_dict: dict[str, Any] = {"CheckOptions": options}
+        configs.append(json.dumps(config_dict) if options else "")
+        if varying:
+            label = ",".join(f"{name}={options[key]}" for key, name in varying.items())
+            config_matrix[label] = configs[-1]
+
+    return ParseResult(
+        pr_link=pr_link,
+        check_name=",".join(check_names),
+        tidy_config=configs[0],
+        config_matrix=config_matrix,
+    )
 
 
 def main() -> None:
@@ -83,6 +154,8 @@ def main() -> None:
             f.write(f"PR_LINK<<EOF\n{result.pr_link}\nEOF\n")
             f.write(f"CHECK_NAME<<EOF\n{result.check_name}\nEOF\n")
             f.write(f"TIDY_CONFIG<<EOF\n{result.tidy_config}\nEOF\n")
+            matrix = json.dumps(result.config_matrix) if result.config_matrix else ""
+            f.write(f"TIDY_CONFIG_MATRIX<<EOF\n{matrix}\nEOF\n")
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,74 @@
+"""Cache of baseline (unpatched clang-tidy) results for differential runs."""
+
+import hashlib
+import json
+import os
+import sys
+
+from testers.generate_report import ProjectResult, result_from_dict, result_to_dict
+
+
+def normalize_tidy_config(tidy_config: str) -> str:
+    """Formats a JSON tidy config canonically, so formatting does not matter."""
+    try:
+        return json.dumps(json.loads(tidy_config), sort_keys=True)
+    except ValueError:
+        return tidy_config.strip()
+
+
+def baseline_key(
+    llvm_revision: str,
+    project_commit: str,
+    check_name: str,
+    tidy_config: str,
+    scope: list[str] | None = None,
+) -> str:
+    """
+    Returns the cache key of a baseline run.
+
+    ``tidy_config`` is normalized so formatting differences do not matter,
+    and ``scope`` (the analyzed files) keeps pre-filtered and full runs
+    apart.
+    """
+    config = normalize_tidy_config(tidy_config)
+    parts = [
+        llvm_revision,
+        project_commit,
+        check_name,
+        hashlib.sha256(config.encode()).hexdigest(),
+        hashlib.sha256("\n".join(sorted(scope or [])).encode()).hexdigest(),
+    ]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+class BaselineCache:
+    """Directory of baseline ProjectResults, one JSON file per key."""
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str, project: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}-{project}.json")
+
+    def load(self, key: str, project: str) -> ProjectResult | None:
+        try:
+            with open(self._path(key, project)) as f:
+                return result_from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Ignoring unreadable baseline cache entry: {e}", file=sys.stderr)
+            return None
+
+    def store(self, key: str, result: ProjectResult) -> None:
+        path = self._path(key, result.name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_baseline(path, result)
+
+
+def write_baseline(path: str, result: ProjectResult) -> None:
+    """Atomically writes a baseline result as JSON."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result_to_dict(result), f)
+    os.replace(tmp_path, path)
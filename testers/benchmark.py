@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Benchmarks for the report pipeline on synthetic clang-tidy logs."""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from testers.generate_report import (
+    ISSUE_PATTERN,
+    Issue,
+    generate_markdown,
+    get_relative_path,
+    parse_log_file,
+    write_project_details,
+)
+
+DEFAULT_BENCH_OUTPUT = "bench.json"
+
+_CHECKS = ["bugprone-use-after-move", "readability-identifier-naming"]
+_DIRS = ["lib", "src", "include/detail"]
+
+
+_CRASH_BLOCK = (
+    "PLEASE submit a bug report to https://github.com/llvm/llvm-project/issues/\n"
+    "Stack dump:\n"
+    "0.\tProgram arguments: clang-tidy -p build /work/test_projects/proj/lib/a.cpp\n"
+    " #0 0x0000563a1b2c3d4e llvm::sys::PrintStackTrace(llvm::raw_ostream&, int)\n"
+    "Segmentation fault (core dumped)\n"
+)
+
+
+def generate_synthetic_log(
+    path: str,
+    diagnostics: int,
+    crash_density: float = 0.0,
+    duplicate_ratio: float = 0.0,
+    seed: int = 0,
+) -> int:
+    """
+    Writes a clang-tidy-like log with ``diagnostics`` diagnostics.
+
+    Each diagnostic is followed by a context line and a caret line, and
+    paths and check names repeat the way they do in real runs.
+
+    Args:
+        path: Destination of the log.
+        diagnostics: Number of diagnostic lines to write.
+        crash_density: Fraction of diagnostics followed by a crash dump.
+        duplicate_ratio: Fraction of diagnostics that repeat a header
+            warning, as when a header is analyzed once per translation unit.
+        seed: Seed for the pseudo-random crash and duplicate placement.
+
+    Returns:
+        The number of lines written.
+    """
+    rng = random.Random(seed)
+    lines = 0
+    with open(path, "w") as f:
+        for i in range(diagnostics):
+            if rng.random() < duplicate_ratio:
+                f.write(
+                    f"/work/test_projects/proj/include/common{i % 8}.h:12:3: "
+                    f"warning: header issue [{_CHECKS[0]}]\n"
+                    "    int shared = compute();\n"
+                    "        ^\n"
+                )
+            else:
+                file_path = f"/work/test_projects/proj/{_DIRS[i % 3]}/file{i % 500}.cpp"
+                severity = "error" if i % 50 == 0 else "warning"
+                check = _CHECKS[i % 2]
+                f.write(
+                    f"{file_path}:{i}:{i % 80 + 1}: {severity}: "
+                    f"variable 'v{i}' is problematic [{check}]\n"
+                    f"    int v{i} = compute();\n"
+                    "        ^\n"
+                )
+            lines += 3
+
+            if rng.random() < crash_density:
+                f.write(_CRASH_BLOCK)
+                lines += _CRASH_BLOCK.count("\n")
+
+    return lines
+
+
+@dataclass
+class _PlainIssue:
+    """Issue layout before slots and string interning, for comparison."""
+
+    file_path: str
+    line: int
+    col: int
+    severity: str
+    message: str
+    check_name: str
+    context: str | None = None
+
+
+def _unshared(value: str) -> str:
+    # Round-trip through bytes to get a private copy, as the old parser had.
+    return value.encode().decode()
+
+
+def _traced_bytes_per_issue(log_path: str, plain: bool) -> float:
+    tracemalloc.start()
+    try:
+        issues: list[Issue] | list[_PlainIssue] = parse_log_file(log_path).issues
+        if plain:
+            issues = [
+                _PlainIssue(
+                    _unshared(i.file_path),
+                    i.line,
+                    i.col,
+                    _unshared(i.severity),
+                    i.message,
+                    _unshared(i.check_name),
+                    i.context,
+                )
+                for i in issues
+            ]
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current / max(len(issues), 1)
+
+
+def measure_issue_memory(diagnostics: int) -> dict[str, float]:
+    """
+    Measures retained memory per parsed issue on a synthetic log.
+
+    Returns:
+        Bytes per issue for the plain dataclass layout and for the
+        current compact Issue, and the relative saving.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "proj.log")
+        generate_synthetic_log(log_path, diagnostics)
+        plain = _traced_bytes_per_issue(log_path, plain=True)
+        compact = _traced_bytes_per_issue(log_path, plain=False)
+
+    return {
+        "diagnostics": diagnostics,
+        "plain_bytes_per_issue": plain,
+        "compact_bytes_per_issue": compact,
+        "saving": 1 - compact / plain,
+    }
+
+
+def peak_rss_bytes() -> int:
+    """Returns the peak resident set size of this process so far."""
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _stage(
+    fn: Callable[[], Any], lines: int, size: int
+) -> tuple[Any, dict[str, float]]:
+    """
+    Runs a stage twice: under tracemalloc for the peak memory the stage
+    itself allocates, then untraced for its timing.
+
+    Returns:
+        The value of the timed run and the stage's measurements.
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    value = fn()
+    seconds = time.perf_counter() - start
+    elapsed = max(seconds, 1e-9)
+    return value, {
+        "seconds": seconds,
+        "lines_per_s": lines / elapsed,
+        "mb_per_s": size / elapsed / (1 << 20),
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmark(
+    diagnostics: int,
+    crash_density: float = 0.0,
+    duplicate_ratio: float = 0.0,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Times each report pipeline stage on a freshly generated synthetic log.
+
+    Stages are timed in pipeline order: parse_log_file, get_relative_path
+    over every diagnostic path, write_project_details and generate_markdown.
+    Throughput is relative to the size of the log the stage stands in for.
+    Each stage's peak is the most memory it allocated itself, so a large
+    stage does not hide the peaks of the stages after it.
+
+    Returns:
+        JSON-compatible benchmark results.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "proj.log")
+        lines = generate_synthetic_log(
+            log_path, diagnostics, crash_density, duplicate_ratio, seed
+        )
+        size = os.path.getsize(log_path)
+        stages: dict[str, dict[str, float]] = {}
+
+        result, stages["parse_log_file"] = _stage(
+            lambda: parse_log_file(log_path), lines, size
+        )
+
+        with open(log_path, errors="replace") as f:
+            paths = [m.group(1) for m in map(ISSUE_PATTERN.match, f) if m]
+
+        def relative_paths() -> None:
+            for path in paths:
+                get_relative_path(path, result.name)
+
+        _, stages["get_relative_path"] = _stage(relative_paths, lines, size)
+
+        def details() -> None:
+            with open(os.devnull, "w") as f:
+                write_project_details(f, result, {})
+
+        _, stages["write_project_details"] = _stage(details, lines, size)
+
+        def markdown() -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_markdown([result], os.path.join(tmp_dir, "issue.md"))
+
+        _, stages["generate_markdown"] = _stage(markdown, lines, size)
+
+    return {
+        "python": platform.python_version(),
+        "params": {
+            "diagnostics": diagnostics,
+            "crash_density": crash_density,
+            "duplicate_ratio": duplicate_ratio,
+            "seed": seed,
+        },
+        "log": {"bytes": size, "lines": lines, "issues": len(result.issues)},
+        "stages": stages,
+    }
+
+
+def compare_benchmarks(baseline: dict[str, Any], current: dict[str, Any]) -> str:
+    """Formats per-stage speedups of ``current`` relative to ``baseline``."""
+    rows = ["| Stage | Baseline (s) | Current (s) | Speedup |"]
+    rows.append("| :--- | ---: | ---: | ---: |")
+    for name, stage in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None:
+            continue
+        speedup = base["seconds"] / max(stage["seconds"], 1e-9)
+        rows.append(
+            f"| {name} | {base['seconds']:.3f} | {stage['seconds']:.3f} "
+            f"| {speedup:.2f}x |"
+        )
+    return "\n".join(rows)
+
+
+def bench(
+    output: str,
+    diagnostics: int,
+    crash_density: float = 0.0,
+    duplicate_ratio: float = 0.0,
+    seed: int = 0,
+    compare: str | None = None,
+    issue_memory: bool = False,
+) -> None:
+    results = run_benchmark(diagnostics, crash_density, duplicate_ratio, seed)
+    if issue_memory:
+        results["issue_memory"] = measure_issue_memory(diagnostics)
+
+    for name, stage in results["stages"].items():
+        print(
+            f"{name:<24} {stage['seconds']:8.3f}s "
+            f"{stage['lines_per_s']:14,.0f} lines/s {stage['mb_per_s']:9.1f} MB/s "
+            f"{stage['peak_bytes'] / (1 << 20):9.1f} MiB peak"
+        )
+    print(f"Peak RSS: {peak_rss_bytes() / (1 << 20):.1f} MiB")
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results written: {output}")
+
+    if compare:
+        with open(compare) as f:
+            print(compare_benchmarks(json.load(f), results))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure per-issue memory on a synthetic clang-tidy log."
+    )
+    parser.add_argument(
+        "--diagnostics",
+        type=int,
+        default=1_000_000,
+        help="Number of diagnostics in the synthetic log (default: 1000000)",
+    )
+    args = parser.parse_args()
+
+    stats = measure_issue_memory(args.diagnostics)
+    print(f"Diagnostics:        {stats['diagnostics']}")
+    print(f"Plain dataclass:    {stats['plain_bytes_per_issue']:.1f} B/issue")
+    print(f"Compact Issue:      {stats['compact_bytes_per_issue']:.1f} B/issue")
+    print(f"Saving:             {stats['saving']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Build the patched clang-tidy, reusing cached binaries when possible."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+
+from testers.build_cache import (
+    DEFAULT_BUILD_CACHE_MAX_BYTES,
+    BuildCache,
+    build_flags,
+    build_key,
+)
+from testers.sources import file_digest, project_commit
+
+DEFAULT_BUILD_SCRIPT = "build.sh"
+DEFAULT_BUILD_DIR = "llvm-project/build"
+DEFAULT_LLVM_DIR = "llvm-project"
+DEFAULT_KEEP_TREES = 2
+APPLIED_PATCH_FILE = "ctit-patch.json"
+_SAVED_PATCH_FILE = "ctit-patch.diff"
+# Same as apply_patch.sh: tests of the patch are not needed to build it.
+_PATCH_EXCLUDE = "--exclude=*/test/*"
+
+
+@dataclass
+class AppliedPatch:
+    """Patch the sources of an incremental build tree were last built with."""
+
+    sha256: str
+    touched: list[str]
+
+
+def run_build_script(
+    build_script: str, build_dir: str, configure_only: bool = False
+) -> None:
+    """Runs the build script, exiting with its status if it fails."""
+    env = dict(os.environ, BUILD_DIR=build_dir)
+    if configure_only:
+        env["CONFIGURE_ONLY"] = "1"
+    result = subprocess.run(["bash", build_script], env=env)
+    if result.returncode != 0:
+        print(f"Error: {build_script} failed", file=sys.stderr)
+        sys.exit(result.returncode)
+
+
+def _git_apply(llvm_dir: str, patch: str, *flags: str) -> bool:
+    result = subprocess.run(
+        ["git", "-C", llvm_dir, "apply", _PATCH_EXCLUDE, *flags]
+        + [os.path.abspath(patch)],
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def patch_touched_files(llvm_dir: str, patch: str) -> list[str]:
+    """Returns the files, relative to ``llvm_dir``, that ``patch`` changes."""
+    result = subprocess.run(
+        ["git", "-C", llvm_dir, "apply", _PATCH_EXCLUDE, "--numstat"]
+        + [os.path.abspath(patch)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [line.split("\t", 2)[2] for line in result.stdout.splitlines()]
+
+
+def load_applied_patch(tree_dir: str) -> AppliedPatch | None:
+    """Loads the patch recorded for an incremental build tree, if any."""
+    try:
+        with open(os.path.join(tree_dir, APPLIED_PATCH_FILE)) as f:
+            return AppliedPatch(**json.load(f))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Ignoring unreadable applied patch in {tree_dir}: {e}", file=sys.stderr)
+        return None
+
+
+def switch_patch(llvm_dir: str, tree_dir: str, patch: str) -> AppliedPatch:
+    """
+    Replaces the patch last built in ``tree_dir`` with ``patch``.
+
+    The previous patch is reverted if it is still applied, and ``patch``
+    is applied unless it already is, so only the files either one touches
+    change and ninja rebuilds just those. A patch that applies neither way
+    exits with an error.
+
+    Returns:
+        The new patch, also recorded in ``tree_dir``.
+    """
+    sha256 = file_digest(patch)
+    saved_patch = os.path.join(tree_dir, _SAVED_PATCH_FILE)
+    previous = load_applied_patch(tree_dir)
+    if (
+        previous is not None
+        and previous.sha256 != sha256
+        and _git_apply(llvm_dir, saved_patch, "-R", "--check")
+    ):
+        print(f"Reverting previous patch {previous.sha256[:12]}")
+        _git_apply(llvm_dir, saved_patch, "-R")
+
+    if _git_apply(llvm_dir, patch, "--check"):
+        _git_apply(llvm_dir, patch)
+    elif not _git_apply(llvm_dir, patch, "-R", "--check"):
+        print(f"Error: {patch} does not apply to {llvm_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    applied = AppliedPatch(sha256, patch_touched_files(llvm_dir, patch))
+    shutil.copyfile(patch, saved_patch)
+    with open(os.path.join(tree_dir, f"{APPLIED_PATCH_FILE}.tmp"), "w") as f:
+        json.dump(asdict(applied), f, indent=1)
+    os.replace(
+        os.path.join(tree_dir, f"{APPLIED_PATCH_FILE}.tmp"),
+        os.path.join(tree_dir, APPLIED_PATCH_FILE),
+    )
+    print(f"Patch {sha256[:12]} touches {len(applied.touched)} files")
+    return applied
+
+
+def link_build_dir(build_dir: str, tree_dir: str) -> None:
+    """Points ``build_dir`` at ``tree_dir``, where testers expect the build."""
+    if os.path.islink(build_dir):
+        os.remove(build_dir)
+    elif os.path.exists(build_dir):
+        print(
+            f"Error: {build_dir} is not a link to an incremental build tree; "
+            "remove it first",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    os.symlink(os.path.abspath(tree_dir), build_dir)
+
+
+def prune_build_trees(tree_root: str, keep: int, current: str) -> list[str]:
+    """
+    Removes all but the ``keep`` most recently used build trees, never
+    ``current``.
+
+    Returns:
+        The removed trees.
+    """
+    trees = [
+        os.path.join(tree_root, name)
+        for name in os.listdir(tree_root)
+        if os.path.isdir(os.path.join(tree_root, name))
+    ]
+    trees.sort(key=os.path.getmtime, reverse=True)
+    stale = [tree for tree in trees if tree != current][max(keep - 1, 0) :]
+    for tree in stale:
+        shutil.rmtree(tree, ignore_errors=True)
+    return stale
+
+
+def prepare_build_tree(
+    llvm_dir: str,
+    build_dir: str,
+    tree_root: str,
+    llvm_revision: str,
+    patch: str | None = None,
+    keep_trees: int = DEFAULT_KEEP_TREES,
+) -> str:
+    """
+    Sets up the persistent build tree of ``llvm_revision`` under
+    ``tree_root`` and links ``build_dir`` to it.
+
+    Returns:
+        The build tree.
+    """
+    tree_dir = os.path.join(tree_root, llvm_revision)
+    os.makedirs(tree_dir, exist_ok=True)
+    # The tree's mtime orders trees by use for pruning.
+    os.utime(tree_dir)
+    if patch is not None:
+        switch_patch(llvm_dir, tree_dir, patch)
+    link_build_dir(build_dir, tree_dir)
+    for tree in prune_build_trees(tree_root, keep_trees, tree_dir):
+        print(f"Removed build tree {tree}")
+    return tree_dir
+
+
+def build_clang_tidy(
+    build_dir: str = DEFAULT_BUILD_DIR,
+    build_script: str = DEFAULT_BUILD_SCRIPT,
+    cache_dir: str | None = None,
+    cache_max_bytes: int = DEFAULT_BUILD_CACHE_MAX_BYTES,
+    llvm_revision: str | None = None,
+    patch_sha256: str | None = None,
+    llvm_dir: str = DEFAULT_LLVM_DIR,
+    tree_dir: str | None = None,
+    patch: str | None = None,
+    keep_trees: int = DEFAULT_KEEP_TREES,
+) -> bool:
+    """
+    Builds clang-tidy with ``build_script``, or restores it from the cache.
+
+    On a cache hit the build tree is only configured, since testers such
+    as the LLVM one read its compile database, and the binary is copied
+    into place instead of compiled.
+
+    Args:
+        build_dir: Build directory ``build_script`` builds into; the cached
+            binary is restored there.
+        build_script: Script configuring and building clang-tidy.
+        cache_dir: Directory caching built binaries across runs.
+        cache_max_bytes: Size the cache is trimmed to after storing a build.
+        llvm_revision: LLVM commit the patch applies to. Defaults to the
+            checkout of ``llvm_dir`` for incremental builds.
+        patch_sha256: Hash of the applied patch. Defaults to the hash of
+            ``patch``.
+        llvm_dir: LLVM checkout the patch applies to.
+        tree_dir: Directory keeping one build tree per LLVM revision. The
+            build then happens there, ``build_dir`` links to it, and only
+            what the patch changed since the last build is rebuilt.
+        patch: Patch to build, replacing the one last built in the tree.
+        keep_trees: Number of build trees kept in ``tree_dir``.
+
+    Returns:
+        Whether the binary came from the cache.
+    """
+    if patch is not None and not patch_sha256:
+        patch_sha256 = file_digest(patch)
+    if tree_dir is not None:
+        llvm_revision = llvm_revision or project_commit(llvm_dir)
+        if not llvm_revision:
+            print(f"Error: no LLVM checkout at {llvm_dir}", file=sys.stderr)
+            sys.exit(1)
+        build_dir = prepare_build_tree(
+            llvm_dir, build_dir, tree_dir, llvm_revision, patch, keep_trees
+        )
+
+    if cache_dir is None:
+        run_build_script(build_script, build_dir)
+        return False
+    if not llvm_revision or not patch_sha256:
+        print("Build not cached: LLVM revision or patch hash unknown", file=sys.stderr)
+        run_build_script(build_script, build_dir)
+        return False
+
+    cache = BuildCache(cache_dir, cache_max_bytes)
+    key = build_key(llvm_revision, patch_sha256, build_flags(build_script))
+    # The tree is configured first, so the restored binary is not replaced.
+    if cache.has(key):
+        run_build_script(build_script, build_dir, configure_only=True)
+        if cache.fetch(key, build_dir):
+            print(f"Reused cached clang-tidy build {key[:12]}")
+            return True
+
+    run_build_script(build_script, build_dir)
+    cache.store(key, build_dir)
+    print(f"Cached clang-tidy build {key[:12]}, {cache.evict()} evicted")
+    return False
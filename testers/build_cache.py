@@ -0,0 +1,140 @@
+"""Cache of built clang-tidy binaries, keyed by LLVM revision and patch."""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from testers.disk_cache import DiskCache
+from testers.sources import file_digest
+
+DEFAULT_BUILD_CACHE_MAX_BYTES = 10 << 30
+# Environment variables build.sh reads that change the produced binary.
+BUILD_ENV_VARS = ("LLVM_USE_LINKER",)
+CLANG_TIDY_PATH = os.path.join("bin", "clang-tidy")
+RESOURCE_DIR_PATH = os.path.join("lib", "clang")
+_KEY_VERSION = "1"
+
+
+def build_flags(build_script: str) -> dict[str, str]:
+    """
+    Returns everything besides the sources that the build depends on: the
+    content of the build script, whose CMake flags are fixed, and the
+    environment variables it reads.
+    """
+    flags = {"script": file_digest(build_script)}
+    flags.update({name: os.environ.get(name, "") for name in BUILD_ENV_VARS})
+    return flags
+
+
+def build_key(llvm_revision: str, patch_sha256: str, flags: dict[str, str]) -> str:
+    """Returns the cache key of a clang-tidy build."""
+    data = json.dumps(
+        [_KEY_VERSION, llvm_revision, patch_sha256, sorted(flags.items())]
+    )
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(directory, name))
+    return total
+
+
+def strip_debug_info(path: str) -> None:
+    """
+    Strips debug info from a binary, if a strip tool is available.
+
+    The symbol table is kept, so crash dumps of cached binaries are still
+    symbolized and can be grouped by frame.
+    """
+    tool = shutil.which("llvm-strip") or shutil.which("strip")
+    if tool is None:
+        return
+    result = subprocess.run([tool, "--strip-debug", path], capture_output=True)
+    if result.returncode != 0:
+        print(f"Warning: could not strip {path}", file=sys.stderr)
+
+
+class BuildCache(DiskCache):
+    """
+    Built clang-tidy binaries with their resource dir, one directory per key.
+
+    An entry is ``<key>/``, laid out like a build directory
+    (``bin/clang-tidy`` and ``lib/clang``), and ``<key>.json``, its size.
+    """
+
+    def __init__(
+        self, cache_dir: str, max_bytes: int = DEFAULT_BUILD_CACHE_MAX_BYTES
+    ) -> None:
+        super().__init__(cache_dir, max_bytes)
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", base
+
+    def _meta_paths(self) -> list[str]:
+        return glob.glob(os.path.join(self.cache_dir, "*.json"))
+
+    def _entry_size(self, meta_path: str, payload_path: str) -> int:
+        with open(meta_path) as f:
+            return int(json.load(f)["size"])
+
+    def has(self, key: str) -> bool:
+        """Returns whether a complete entry exists for ``key``."""
+        return os.path.isfile(self._paths(key)[0])
+
+    def fetch(self, key: str, build_dir: str) -> bool:
+        """
+        Copies the cached binary and resource dir of ``key`` into
+        ``build_dir``.
+
+        Returns:
+            Whether the entry was cached.
+        """
+        meta_path, entry_dir = self._paths(key)
+        if not self.has(key):
+            return False
+        try:
+            binary = os.path.join(build_dir, CLANG_TIDY_PATH)
+            os.makedirs(os.path.dirname(binary), exist_ok=True)
+            shutil.copy2(os.path.join(entry_dir, CLANG_TIDY_PATH), binary)
+            resource_dir = os.path.join(entry_dir, RESOURCE_DIR_PATH)
+            if os.path.isdir(resource_dir):
+                shutil.copytree(
+                    resource_dir,
+                    os.path.join(build_dir, RESOURCE_DIR_PATH),
+                    dirs_exist_ok=True,
+                )
+            self._touch(meta_path)
+        except OSError as e:
+            print(f"Ignoring unreadable build cache entry {key}: {e}", file=sys.stderr)
+            return False
+        return True
+
+    def store(self, key: str, build_dir: str) -> None:
+        """Caches the clang-tidy binary and resource dir of a finished build."""
+        meta_path, entry_dir = self._paths(key)
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+        try:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            binary = os.path.join(tmp_dir, CLANG_TIDY_PATH)
+            os.makedirs(os.path.dirname(binary))
+            shutil.copy2(os.path.join(build_dir, CLANG_TIDY_PATH), binary)
+            strip_debug_info(binary)
+            resource_dir = os.path.join(build_dir, RESOURCE_DIR_PATH)
+            if os.path.isdir(resource_dir):
+                shutil.copytree(resource_dir, os.path.join(tmp_dir, RESOURCE_DIR_PATH))
+
+            size = _tree_size(tmp_dir)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+            self._write_meta(meta_path, {"size": size})
+        except OSError as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"Error writing build cache entry {key}: {e}", file=sys.stderr)
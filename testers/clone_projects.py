@@ -1,30 +1,234 @@
 #!/usr/bin/env python3
 """Clone test projects defined in projects.json into a work directory."""
 
+import hashlib
 import os
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 from testers.config import load_projects
 
+_mirror_locks: dict[str, threading.Lock] = {}
+_mirror_locks_guard = threading.Lock()
 
-def clone_project(name: str, url: str, commit: str, dest_dir: str) -> None:
-    """Clone a project and checkout a specific commit."""
-    if not os.path.isdir(dest_dir):
-        subprocess.run(
-            ["git", "clone", url, dest_dir],
-            check=True,
+
+def _mirror_lock(mirror_dir: str) -> threading.Lock:
+    with _mirror_locks_guard:
+        return _mirror_locks.setdefault(mirror_dir, threading.Lock())
+
+
+def _fetch_cmd(repo_dir: str, filter_spec: str | None) -> list[str]:
+    cmd = ["git", "-C", repo_dir, "fetch", "--depth", "1"]
+    if filter_spec:
+        cmd.append(f"--filter={filter_spec}")
+    return cmd
+
+
+def has_commit(repo_dir: str, commit: str) -> bool:
+    """Returns whether ``commit`` is present in the repository's object store."""
+    result = subprocess.run(
+        ["git", "-C", repo_dir, "cat-file", "-e", f"{commit}^{{commit}}"],
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def mirror_path(cache_dir: str, url: str) -> str:
+    """Returns the bare mirror directory used for ``url`` inside ``cache_dir``."""
+    base = os.path.basename(url.rstrip("/")).removesuffix(".git")
+    digest = hashlib.sha256(url.encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{base}-{digest}.git")
+
+
+def ensure_mirror(
+    url: str, commit: str, mirror_dir: str, filter_spec: str | None = None
+) -> None:
+    """
+    Make sure the bare mirror for ``url`` contains ``commit``.
+
+    The network is only touched when the pinned commit is missing.
+    """
+    with _mirror_lock(mirror_dir):
+        if not os.path.isdir(mirror_dir):
+            subprocess.run(["git", "init", "-q", "--bare", mirror_dir], check=True)
+            subprocess.run(
+                ["git", "-C", mirror_dir, "remote", "add", "origin", url],
+                check=True,
+            )
+
+        if not has_commit(mirror_dir, commit):
+            subprocess.run(
+                [*_fetch_cmd(mirror_dir, filter_spec), "origin", commit],
+                check=True,
+            )
+
+
+@dataclass
+class WorktreeState:
+    """Checked-out commit and local modifications of a worktree."""
+
+    head: str | None
+    tracked_changes: bool
+    untracked_files: bool
+
+    def matches(self, commit: str) -> bool:
+        return (
+            self.head == commit
+            and not self.tracked_changes
+            and not self.untracked_files
         )
 
-    subprocess.run(
-        ["git", "-C", dest_dir, "checkout", commit],
+
+def read_worktree_state(repo_dir: str) -> WorktreeState:
+    """Reads HEAD and dirtiness; ignored files such as build dirs don't count."""
+    head = subprocess.run(
+        ["git", "-C", repo_dir, "rev-parse", "--verify", "-q", "HEAD"],
+        capture_output=True,
+        text=True,
+    )
+    status = subprocess.run(
+        ["git", "-C", repo_dir, "status", "--porcelain"],
+        capture_output=True,
+        text=True,
         check=True,
     )
+    entries = status.stdout.splitlines()
+    return WorktreeState(
+        head=head.stdout.strip() if head.returncode == 0 else None,
+        tracked_changes=any(not e.startswith("??") for e in entries),
+        untracked_files=any(e.startswith("??") for e in entries),
+    )
+
+
+def _timed(timings: dict[str, float], step: str, cmd: list[str]) -> None:
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    timings[step] = timings.get(step, 0.0) + time.perf_counter() - start
+
+
+def _report_timings(name: str, timings: dict[str, float]) -> None:
+    steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items())
+    print(f"[{name}] {steps}")
+
+
+def clone_project(
+    name: str,
+    url: str,
+    commit: str,
+    dest_dir: str,
+    filter_spec: str | None = None,
+    cache_dir: str | None = None,
+) -> dict[str, float]:
+    """
+    Idempotently sync a project to its pinned commit.
+
+    Instead of cloning the full history, the repository is initialized
+    empty and the single commit is fetched with depth 1, optionally as a
+    partial clone using ``filter_spec`` (e.g. ``blob:none``).
+
+    With ``cache_dir``, the commit is fetched into a persistent bare mirror
+    instead, and ``dest_dir`` is created as a git worktree of that mirror.
+
+    An existing ``dest_dir`` that is already at ``commit`` with a clean
+    worktree is left untouched. Otherwise only the needed steps run: fetch
+    if the commit is missing, a forced checkout if HEAD differs or tracked
+    files were modified, and a clean if untracked files were left behind.
+
+    Returns:
+        Seconds spent in each step that ran.
+    """
+    timings: dict[str, float] = {}
+    fetch_source = "origin"
+
+    if cache_dir is not None:
+        mirror_dir = mirror_path(cache_dir, url)
+        fetch_source = mirror_dir
+        start = time.perf_counter()
+        ensure_mirror(url, commit, mirror_dir, filter_spec)
+        timings["mirror"] = time.perf_counter() - start
+
+        if not os.path.isdir(dest_dir):
+            with _mirror_lock(mirror_dir):
+                _timed(
+                    timings, "worktree", ["git", "-C", mirror_dir, "worktree", "prune"]
+                )
+                _timed(
+                    timings,
+                    "worktree",
+                    [
+                        "git",
+                        "-C",
+                        mirror_dir,
+                        "worktree",
+                        "add",
+                        "--detach",
+                        os.path.abspath(dest_dir),
+                        commit,
+                    ],
+                )
+            _report_timings(name, timings)
+            return timings
+    elif not os.path.isdir(dest_dir):
+        _timed(timings, "init", ["git", "init", "-q", dest_dir])
+        _timed(timings, "init", ["git", "-C", dest_dir, "remote", "add", "origin", url])
+
+    start = time.perf_counter()
+    state = read_worktree_state(dest_dir)
+    timings["status"] = time.perf_counter() - start
+
+    if state.matches(commit):
+        print(f"[{name}] Already at {commit}, nothing to do")
+        _report_timings(name, timings)
+        return timings
+
+    if state.head != commit and not has_commit(dest_dir, commit):
+        _timed(
+            timings,
+            "fetch",
+            [*_fetch_cmd(dest_dir, filter_spec), fetch_source, commit],
+        )
+
+    if state.head != commit or state.tracked_changes:
+        _timed(
+            timings,
+            "checkout",
+            ["git", "-C", dest_dir, "checkout", "-q", "--force", "--detach", commit],
+        )
+
+    if state.untracked_files:
+        _timed(timings, "clean", ["git", "-C", dest_dir, "clean", "-q", "-f", "-d"])
+
+    _report_timings(name, timings)
+    return timings
 
 
-def clone_projects(work_dir: str, config_path: str) -> None:
+def clone_projects(
+    work_dir: str,
+    config_path: str,
+    jobs: int = 1,
+    filter_spec: str | None = None,
+    cache_dir: str | None = None,
+) -> None:
     projects = load_projects(config_path)
     os.makedirs(work_dir, exist_ok=True)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
 
-    for project in projects:
-        dest_dir = os.path.join(work_dir, project.name)
-        clone_project(project.name, project.url, project.commit, dest_dir)
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        futures = [
+            pool.submit(
+                clone_project,
+                project.name,
+                project.url,
+                project.commit,
+                os.path.join(work_dir, project.name),
+                filter_spec=filter_spec,
+                cache_dir=cache_dir,
+            )
+            for project in projects
+        ]
+        for future in futures:
+            future.result()
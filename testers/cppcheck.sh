@@ -55,6 +55,22 @@ cmake -S "$SOURCE_DIR" \
 
 echo "[Cppcheck] Running Pre-build..."
 cmake --build "$BUILD_DIR" -j "$(nproc)"
+
+if [ -n "${TIDY_CONFIG_MATRIX:-}" ]; then
+    echo "[Cppcheck] Running clang-tidy with every configuration of the option matrix..."
+    rm -f "$LOG_FILE"
+    "$ROOT_DIR/ctit.py" run cppcheck \
+        --build-dir "$BUILD_DIR" \
+        --clang-tidy "$CLANG_TIDY_BIN" \
+        --check "$CHECK_NAME" \
+        --full \
+        --config-matrix "$TIDY_CONFIG_MATRIX" \
+        --log-dir "$LOG_DIR" \
+        --jobs "$(nproc)" || true
+    echo "[Cppcheck] Finished. Log shards saved under $LOG_DIR/cppcheck@*/"
+    exit 0
+fi
+
 echo "[Cppcheck] Running clang-tidy..."
 TIDY_ARGS=("-clang-tidy-binary" "$CLANG_TIDY_BIN" "-p" "$BUILD_DIR" "-checks=-*,$CHECK_NAME" "-quiet")
 if [ -n "${TIDY_CONFIG:-}" ]; then
@@ -0,0 +1,85 @@
+"""Size-bounded directory caches evicting the least recently used entries."""
+
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class DiskCache(ABC):
+    """
+    A directory of entries, each a payload and a JSON metadata file.
+
+    The metadata is written last and marks an entry complete. Reused
+    entries are touched, so eviction removes the least recently used ones
+    first.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @abstractmethod
+    def _paths(self, key: str) -> tuple[str, str]:
+        """Returns the metadata and payload paths of ``key``."""
+
+    @abstractmethod
+    def _meta_paths(self) -> list[str]:
+        """Returns the metadata files of all entries."""
+
+    @abstractmethod
+    def _entry_size(self, meta_path: str, payload_path: str) -> int:
+        """Returns the size of an entry, raising OSError if it is incomplete."""
+
+    def _payload_path(self, meta_path: str) -> str:
+        return self._paths(os.path.basename(meta_path)[: -len(".json")])[1]
+
+    @staticmethod
+    def _write_meta(meta_path: str, data: Any) -> None:
+        """Writes an entry's metadata, which marks it complete."""
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    @staticmethod
+    def _touch(meta_path: str) -> None:
+        """Marks an entry as just used."""
+        os.utime(meta_path)
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used entries until the cache fits in
+        ``max_bytes``.
+
+        Returns:
+            The number of removed entries.
+        """
+        entries: list[tuple[float, str, str, int]] = []
+        total = 0
+        for meta_path in self._meta_paths():
+            payload_path = self._payload_path(meta_path)
+            try:
+                size = self._entry_size(meta_path, payload_path)
+                mtime = os.stat(meta_path).st_mtime
+            except (OSError, ValueError, TypeError, KeyError):
+                continue
+            entries.append((mtime, meta_path, payload_path, size))
+            total += size
+
+        removed = 0
+        for _, meta_path, payload_path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                # The metadata goes first, so a partly removed entry is a miss.
+                os.remove(meta_path)
+            except OSError:
+                continue
+            if os.path.isdir(payload_path):
+                shutil.rmtree(payload_path, ignore_errors=True)
+            elif os.path.exists(payload_path):
+                os.remove(payload_path)
+            total -= size
+            removed += 1
+        return removed
@@ -1,20 +1,46 @@
 #!/usr/bin/env python3
 import glob
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import mmap
 import os
 import re
 import sys
-from dataclasses import dataclass, field
-from typing import TextIO
+from collections import Counter, defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, TextIO
 
 from testers.config import load_projects
+from testers.parse_cache import CACHE_FILE, ParseCache
+from testers.run_profile import RunProfile, load_run_profile
 
 DEFAULT_LOG_DIR = "logs"
 DEFAULT_OUTPUT_FILE = "issue.md"
+BASELINE_SUFFIX = ".baseline.json"
+DEFAULT_DETAILS_FILE = "issue-details.md.gz"
+# GitHub rejects comments over 65536 characters; leave room for the footer.
+DEFAULT_MAX_BYTES = 60_000
+DEFAULT_TOP_N = 10
+# Separates a project from its configuration in the log directories of
+# option-matrix runs, e.g. "cppcheck@0-VariableCase=camelBack".
+MATRIX_SEPARATOR = "@"
+_MATRIX_LABEL_RE = re.compile(r"[^\w.,=+-]")
+_MATRIX_LABEL_MAX = 80
 
 
-@dataclass
+@dataclass(slots=True)
 class Issue:
-    """Represents a single static analysis issue."""
+    """
+    Represents a single static analysis issue.
+
+    Slotted, with the highly repetitive path, severity and check strings
+    interned, so large result sets share one copy of each.
+    """
 
     file_path: str
     line: int
@@ -24,16 +50,197 @@ class Issue:
     check_name: str
     context: str | None = None
 
+    def __post_init__(self) -> None:
+        self.file_path = sys.intern(self.file_path)
+        self.severity = sys.intern(self.severity)
+        self.check_name = sys.intern(self.check_name)
 
-@dataclass
+
+IssueKey = tuple[str, int, int, str, str]
+FileGroups = Iterable[tuple[str, list[Issue]]]
+
+
+def issue_key(issue: Issue) -> IssueKey:
+    """Returns the identity used to deduplicate repeated diagnostics."""
+    return (issue.file_path, issue.line, issue.col, issue.check_name, issue.message)
+
+
+# Stack frames as printed by LLVM's signal handler, symbolized
+# ("#3 0x55d5 clang::Foo() (/bin/clang-tidy+0x1f)") or in the legacy
+# layout ("3  clang-tidy 0x55d5 clang::Foo() + 31").
+_FRAME_RE = re.compile(r"#\d+ 0x[0-9a-fA-F]+ ?(.*)")
+_LEGACY_FRAME_RE = re.compile(r"\d+ +(\S+) +0x[0-9a-fA-F]+ ?(.*)")
+_FRAME_MODULE_RE = re.compile(r"(.*?) ?\(([^()]+)\+(0x[0-9a-fA-F]+)\)")
+_FRAME_LOCATION_RE = re.compile(r" \S+:\d+(?::\d+)?$")
+_PRETTY_STACK_RE = re.compile(r"\d+\.\s+(.*)")
+_BUG_REPORT_PREFIX = "PLEASE submit a bug report"
+_PROGRAM_ARGUMENTS_PREFIX = "Program arguments: "
+
+# Leading frames of the crash handling itself, the same for every crash.
+_HANDLER_FRAME_PREFIXES = (
+    "llvm::sys::",
+    "PrintStackTraceSignalHandler",
+    "SignalHandler",
+    "__restore_rt",
+    "libc.so",
+    "libpthread.so",
+    "raise",
+    "abort",
+    "gsignal",
+    "pthread_kill",
+    "__pthread_kill",
+    "__assert_fail",
+)
+CRASH_SIGNATURE_FRAMES = 5
+
+# Flags that only change how results are printed, dropped from repros.
+_OUTPUT_ONLY_FLAGS = ("-quiet", "-use-color", "-export-fixes")
+_SOURCE_SUFFIXES = (".c", ".cc", ".cpp", ".cxx", ".c++", ".m", ".mm", ".cu")
+
+
+def normalize_frame(frame: str) -> str:
+    """
+    Reduces a stack frame to what stays stable between runs.
+
+    Addresses and source locations are dropped; frames without a symbol
+    keep their module and offset, which do not depend on where the
+    module was loaded.
+    """
+    match = _FRAME_RE.match(frame)
+    if match:
+        rest = match.group(1)
+        located = _FRAME_MODULE_RE.fullmatch(rest)
+        if located:
+            function, module, offset = located.groups()
+            return function or f"{os.path.basename(module)}+{offset}"
+        return _FRAME_LOCATION_RE.sub("", rest)
+    match = _LEGACY_FRAME_RE.match(frame)
+    if match:
+        module, function = match.groups()
+        return function.rsplit(" + ", 1)[0] or module
+    return frame
+
+
+@dataclass(slots=True)
+class CrashRecord:
+    """
+    A crash dump found in a log.
+
+    ``stack_context`` holds the entries LLVM prints before the frames,
+    such as the AST matcher that was running.
+    """
+
+    program_arguments: str | None = None
+    bug_report: str | None = None
+    stack_context: list[str] = field(default_factory=list)
+    frames: list[str] = field(default_factory=list)
+
+    def add_line(self, line: str) -> bool:
+        """
+        Adds a stripped log line to the dump.
+
+        Returns:
+            False when the line does not belong to this dump, which ends it.
+        """
+        started = bool(self.stack_context or self.frames or self.program_arguments)
+        if line.startswith(_BUG_REPORT_PREFIX):
+            if started or self.bug_report is not None:
+                return False
+            self.bug_report = line
+            return True
+        if line.startswith("Stack dump"):
+            return not started
+        if _FRAME_RE.match(line) or _LEGACY_FRAME_RE.match(line):
+            self.frames.append(line)
+            return True
+        if self.frames:
+            return False
+        match = _PRETTY_STACK_RE.match(line)
+        if match:
+            entry = match.group(1)
+            if entry.startswith(_PROGRAM_ARGUMENTS_PREFIX):
+                self.program_arguments = entry[len(_PROGRAM_ARGUMENTS_PREFIX) :]
+            else:
+                self.stack_context.append(entry)
+            return True
+        # Before the frames, AST dumps of the pretty stack entries may
+        # follow; only a diagnostic means the dump is over.
+        return match_issue_line(line) is None
+
+    def signature_frames(self) -> list[str]:
+        """Returns the normalized top frames below the crash handler."""
+        frames = [normalize_frame(frame) for frame in self.frames]
+        for i, frame in enumerate(frames):
+            if not frame.startswith(_HANDLER_FRAME_PREFIXES):
+                return frames[i : i + CRASH_SIGNATURE_FRAMES]
+        return frames[:CRASH_SIGNATURE_FRAMES]
+
+    @property
+    def signature(self) -> str:
+        """A short hash identifying crashes with the same stack."""
+        key = "\n".join(self.signature_frames())
+        return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+    @property
+    def source_file(self) -> str | None:
+        """The translation unit that was being analyzed, if known."""
+        for arg in reversed((self.program_arguments or "").split()):
+            if arg.lower().endswith(_SOURCE_SUFFIXES):
+                return arg
+        return None
+
+    @property
+    def repro_command(self) -> str | None:
+        """The crashing command without its output-only flags."""
+        if not self.program_arguments:
+            return None
+        args = self.program_arguments.split()
+        kept: list[str] = []
+        skip_value = False
+        for arg in args:
+            if skip_value:
+                skip_value = False
+                continue
+            flag = "-" + arg.lstrip("-").split("=", 1)[0]
+            if flag in _OUTPUT_ONLY_FLAGS:
+                skip_value = flag == "-export-fixes" and "=" not in arg
+                continue
+            kept.append(arg)
+        return " ".join(kept)
+
+
+def group_crashes(crashes: Iterable[CrashRecord]) -> list[list[CrashRecord]]:
+    """Groups crashes by signature, most frequent first."""
+    groups: dict[str, list[CrashRecord]] = {}
+    for crash in crashes:
+        groups.setdefault(crash.signature, []).append(crash)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def shortest_repro_command(crashes: Iterable[CrashRecord]) -> str | None:
+    """Returns the shortest repro command among crashes, if any."""
+    commands = [c.repro_command for c in crashes if c.repro_command]
+    return min(commands, key=len) if commands else None
+
+
+@dataclass(slots=True)
 class ProjectResult:
-    """Aggregated analysis results for a single project."""
+    """
+    Aggregated analysis results for a single project.
+
+    ``warnings_count`` and ``errors_count`` count unique diagnostics, while
+    the ``raw_*`` counters include every repeated occurrence, e.g. a header
+    warning printed once per translation unit.
+    """
 
     name: str
     warnings_count: int = 0
     errors_count: int = 0
     has_crash: bool = False
     issues: list[Issue] = field(default_factory=list)
+    raw_warnings_count: int = 0
+    raw_errors_count: int = 0
+    crashes: list[CrashRecord] = field(default_factory=list)
 
     @property
     def status_emoji(self) -> str:
@@ -58,6 +265,51 @@ class ProjectResult:
         return "Pass"
 
 
+def result_to_dict(result: ProjectResult) -> dict[str, Any]:
+    """Serializes a ProjectResult into JSON-compatible data."""
+    return asdict(result)
+
+
+def result_from_dict(data: dict[str, Any]) -> ProjectResult:
+    """Rebuilds a ProjectResult serialized by result_to_dict."""
+    fields = dict(data)
+    fields["issues"] = [Issue(**issue) for issue in fields.get("issues", [])]
+    fields["crashes"] = [CrashRecord(**crash) for crash in fields.get("crashes", [])]
+    return ProjectResult(**fields)
+
+
+def parser_version() -> str:
+    """
+    Returns a fingerprint of the parser implementation.
+
+    Derived from this module's source, so any change to the parser
+    invalidates previously cached parse results.
+    """
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def matrix_project_name(project: str, index: int, label: str) -> str:
+    """
+    Returns the log directory name of one configuration of a matrix run.
+
+    The index is zero-padded, so the directories sort in matrix order.
+    """
+    slug = _MATRIX_LABEL_RE.sub("_", label)[:_MATRIX_LABEL_MAX]
+    return f"{project}{MATRIX_SEPARATOR}{index:02d}-{slug}"
+
+
+def matrix_project(name: str) -> str | None:
+    """Returns the project a matrix configuration belongs to, if it is one."""
+    project, separator, _ = name.partition(MATRIX_SEPARATOR)
+    return project if separator else None
+
+
+def matrix_config(name: str) -> str:
+    """Returns the index and label of a matrix configuration's log directory."""
+    return name.partition(MATRIX_SEPARATOR)[2]
+
+
 def get_relative_path(full_path: str, project_name: str) -> str:
     """
     Extracts the relative path of a file within the project.
@@ -69,6 +321,7 @@ def get_relative_path(full_path: str, project_name: str) -> str:
     Returns:
         The relative path string.
     """
+    project_name = matrix_project(project_name) or project_name
     markers = [
         f"test_projects/{project_name}/",
         f"test-projects/{project_name}/",
@@ -80,64 +333,185 @@ def get_relative_path(full_path: str, project_name: str) -> str:
     return os.path.basename(full_path)
 
 
-def parse_log_file(log_path: str) -> ProjectResult:
+# Regex to capture standard clang-tidy output format:
+# Example: /path/to/file.cpp:10:5: warning: message [check-name]
+ISSUE_PATTERN = re.compile(r"^(.+):(\d+):(\d+): (warning|error): (.+) \[(.+)\]$")
+
+_SEVERITY_MARKERS = ((": warning: ", "warning"), (": error: ", "error"))
+# A line containing one of these, or starting with one of the prefixes,
+# reports a crash. Parsing and the mapped summary scan share both.
+_CRASH_MARKERS = ("Segmentation fault", "Stack dump:")
+_CRASH_PREFIXES = (_BUG_REPORT_PREFIX, "Stack dump")
+
+
+def is_crash_line(line: str) -> bool:
+    """Returns whether a stripped log line reports a crash."""
+    return line.startswith(_CRASH_PREFIXES) or any(
+        marker in line for marker in _CRASH_MARKERS
+    )
+
+
+def match_issue_line(line: str) -> tuple[str, str, str, str, str, str] | None:
+    """
+    Splits a stripped diagnostic line into its ISSUE_PATTERN groups.
+
+    Returns exactly what ``ISSUE_PATTERN.match(line).groups()`` would, but
+    most lines are rejected by a substring check, and diagnostics are split
+    from the right without backtracking. The regex is only consulted when
+    the split is ambiguous, e.g. when a message repeats a severity marker.
+
+    Returns:
+        (path, line, col, severity, message, check), or None.
+    """
+    # Tier 1: code context and caret lines never contain a severity marker.
+    pos = -1
+    marker = severity = ""
+    for candidate, name in _SEVERITY_MARKERS:
+        found = line.rfind(candidate)
+        if found > pos:
+            pos, marker, severity = found, candidate, name
+    if pos < 0 or not line.endswith("]"):
+        return None
+
+    # Tier 2: the greedy regex splits at the rightmost marker and the last
+    # " [", and the location is the last two colon-separated fields, so
+    # drive letters and colons earlier in the path stay part of it.
+    path, sep, col_num = line[:pos].rpartition(":")
+    path, sep2, line_num = path.rpartition(":")
+    rest = line[pos + len(marker) :]
+    bracket = rest.rfind(" [")
+    if (
+        sep
+        and sep2
+        and path
+        and line_num.isdecimal()
+        and col_num.isdecimal()
+        and bracket > 0
+        and bracket + 3 < len(rest)
+    ):
+        message, check_name = rest[:bracket], rest[bracket + 2 : -1]
+        return path, line_num, col_num, severity, message, check_name
+
+    # Tier 3: let the regex backtrack over the ambiguous cases.
+    match = ISSUE_PATTERN.match(line)
+    if match is None:
+        return None
+    path, line_num, col_num, severity, message, check_name = match.groups()
+    return path, line_num, col_num, severity, message, check_name
+
+
+def iter_log_issues(
+    lines: Iterable[str], result: ProjectResult, dedup: bool = True
+) -> Iterator[Issue]:
+    """
+    Lazily parses clang-tidy output, yielding issues as they are found.
+
+    Only the current issue is buffered while waiting for the next line, which
+    provides its context snippet, so memory stays flat regardless of the log
+    size. Repeats of an already seen diagnostic are counted but not yielded.
+    Counters, the crash flag and crash records are updated on ``result`` as
+    a side effect; issues are not appended to it.
+
+    Args:
+        lines: An iterable of raw log lines, e.g. an open file.
+        result: The ProjectResult whose counters are updated.
+        dedup: Skip repeats of seen diagnostics. Without it every
+            diagnostic is yielded, no keys are remembered, and only the raw
+            counters are updated; the caller deduplicates.
+
+    Yields:
+        Issue objects in the order they appear in the log.
+    """
+    pending: Issue | None = None
+    crash: CrashRecord | None = None
+    seen: set[IssueKey] = set()
+
+    for raw_line in lines:
+        line = raw_line.strip()
+
+        if pending is not None:
+            # Extract context code (the line following the error message)
+            # simplistic check to avoid capturing paths or noise
+            if line and not line.startswith("/"):
+                pending.context = line
+            yield pending
+            pending = None
+
+        if crash is not None:
+            if crash.add_line(line):
+                continue
+            # A diagnostic of another unit may come between the header of a
+            # dump and its frames; the dump goes on after it.
+            if crash.frames or match_issue_line(line) is None:
+                result.crashes.append(crash)
+                crash = None
+
+        if line.startswith(_CRASH_PREFIXES):
+            result.has_crash = True
+            crash = CrashRecord()
+            crash.add_line(line)
+            continue
+
+        # Check for tool crash indicators
+        if is_crash_line(line):
+            result.has_crash = True
+            continue
+
+        groups = match_issue_line(line)
+        if groups:
+            raw_path, line_num, col_num, severity, message, check_name = groups
+
+            issue = Issue(
+                file_path=get_relative_path(raw_path, result.name),
+                line=int(line_num),
+                col=int(col_num),
+                severity=severity,
+                message=message,
+                check_name=check_name,
+            )
+
+            # Update counts, skipping repeats of an already reported issue
+            if not dedup:
+                is_new = False
+                pending = issue
+            elif is_new := issue_key(issue) not in seen:
+                seen.add(issue_key(issue))
+                pending = issue
+
+            if severity == "warning":
+                result.raw_warnings_count += 1
+                result.warnings_count += is_new
+            elif severity == "error":
+                result.raw_errors_count += 1
+                result.errors_count += is_new
+
+    if crash is not None:
+        result.crashes.append(crash)
+    if pending is not None:
+        yield pending
+
+
+def parse_log_file(log_path: str, project_name: str | None = None) -> ProjectResult:
     """
     Parses a single tool log file to extract analysis results.
 
+    The file is read in a single streaming pass, so only the collected
+    issues are kept in memory, never the raw log.
+
     Args:
         log_path: Path to the log file.
+        project_name: Project the log belongs to; defaults to the file name.
 
     Returns:
         A ProjectResult object containing the parsed data.
     """
-    project_name = os.path.basename(log_path).replace(".log", "")
+    if project_name is None:
+        project_name = os.path.basename(log_path).replace(".log", "")
     result = ProjectResult(name=project_name)
 
-    # Regex to capture standard clang-tidy output format:
-    # Example: /path/to/file.cpp:10:5: warning: message [check-name]
-    issue_pattern = re.compile(r"^(.+):(\d+):(\d+): (warning|error): (.+) \[(.+)\]$")
-
     try:
         with open(log_path, errors="replace") as f:
-            lines = f.readlines()
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-
-            # Check for tool crash indicators
-            if "Segmentation fault" in line or "Stack dump:" in line:
-                result.has_crash = True
-                continue
-
-            match = issue_pattern.match(line)
-            if match:
-                raw_path, line_num, col_num, severity, message, check_name = (
-                    match.groups()
-                )
-
-                # Update counts
-                if severity == "warning":
-                    result.warnings_count += 1
-                elif severity == "error":
-                    result.errors_count += 1
-
-                # Extract context code (the line following the error message)
-                context_code = None
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    # simplistic check to avoid capturing paths or noise
-                    if next_line and not next_line.startswith("/"):
-                        context_code = next_line
-
-                issue = Issue(
-                    file_path=get_relative_path(raw_path, project_name),
-                    line=int(line_num),
-                    col=int(col_num),
-                    severity=severity,
-                    message=message,
-                    check_name=check_name,
-                    context=context_code,
-                )
+            for issue in iter_log_issues(f, result):
                 result.issues.append(issue)
 
     except OSError as e:
@@ -148,71 +522,1028 @@ def parse_log_file(log_path: str) -> ProjectResult:
     return result
 
 
+def _mapped_crash(data: mmap.mmap) -> bool:
+    """Returns whether a mapped log has a line ``is_crash_line`` accepts."""
+    if any(data.find(marker.encode()) >= 0 for marker in _CRASH_MARKERS):
+        return True
+    for prefix in _CRASH_PREFIXES:
+        needle = prefix.encode()
+        pos = data.find(needle)
+        while pos >= 0:
+            start = data.rfind(b"\n", 0, pos) + 1
+            if not data[start:pos].strip():
+                return True
+            pos = data.find(needle, pos + 1)
+    return False
+
+
+def _scan_mapped_log(
+    data: mmap.mmap,
+    result: ProjectResult,
+    seen: set[int],
+    relative_paths: dict[str, str],
+) -> None:
+    """Counts the diagnostics of one mapped log into ``result``."""
+    if _mapped_crash(data):
+        result.has_crash = True
+
+    skip = b""
+    for marker, _ in _SEVERITY_MARKERS:
+        needle = marker.encode()
+        pos = data.find(needle)
+        while pos >= 0:
+            start = data.rfind(b"\n", 0, pos) + 1
+            end = data.find(b"\n", pos)
+            if end < 0:
+                end = len(data)
+            pos = data.find(needle, end)
+
+            raw_line = data[start:end]
+            # A line with both markers was counted by the earlier search.
+            if skip and skip in raw_line:
+                continue
+            line = raw_line.decode(errors="replace").strip()
+            if is_crash_line(line):
+                continue
+            groups = match_issue_line(line)
+            if groups is None:
+                continue
+
+            raw_path, line_num, col_num, severity, message, check_name = groups
+            file_path = relative_paths.get(raw_path)
+            if file_path is None:
+                file_path = get_relative_path(raw_path, result.name)
+                relative_paths[raw_path] = file_path
+            key = hash((file_path, int(line_num), int(col_num), check_name, message))
+            is_new = key not in seen
+            seen.add(key)
+            if severity == "warning":
+                result.raw_warnings_count += 1
+                result.warnings_count += is_new
+            else:
+                result.raw_errors_count += 1
+                result.errors_count += is_new
+        skip = needle
+
+
+def scan_log_summary(project_name: str, log_paths: list[str]) -> ProjectResult:
+    """
+    Counts a project's diagnostics and detects crashes without parsing.
+
+    Each log is memory-mapped and searched for the severity and crash
+    markers in bulk, so only diagnostic lines are ever decoded and no
+    Issue objects are created. The counters and crash flag match what
+    parsing the same logs and merging them would give; repeats are
+    recognized by the hash of their issue key.
+
+    Args:
+        project_name: Project the logs belong to.
+        log_paths: The project's log and log shards.
+
+    Returns:
+        A ProjectResult with counters and crash flag, but no issues or
+        crash records.
+    """
+    result = ProjectResult(name=project_name)
+    seen: set[int] = set()
+    relative_paths: dict[str, str] = {}
+    for log_path in log_paths:
+        try:
+            with open(log_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    _scan_mapped_log(data, result, seen, relative_paths)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {log_path}: {e}", file=sys.stderr)
+    return result
+
+
+def fingerprint(issue: Issue) -> str:
+    """
+    Returns a location-independent identity for an issue.
+
+    Line and column are left out, so a finding that merely moved because
+    unrelated lines shifted still matches its baseline counterpart.
+    """
+    context = " ".join((issue.context or "").split())
+    key = "\0".join(
+        (issue.file_path, issue.check_name, issue.severity, issue.message, context)
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+@dataclass
+class ResultDiff:
+    """Findings the patch added and removed for one project."""
+
+    name: str
+    added: list[Issue] = field(default_factory=list)
+    removed: list[Issue] = field(default_factory=list)
+
+
+def diff_results(baseline: ProjectResult, patched: ProjectResult) -> ResultDiff:
+    """
+    Matches patched findings to baseline findings by fingerprint.
+
+    Identical fingerprints are matched as a multiset, in log order, so a
+    finding duplicated by the patch is still reported as added.
+    """
+    unmatched: dict[str, deque[int]] = defaultdict(deque)
+    for i, issue in enumerate(baseline.issues):
+        unmatched[fingerprint(issue)].append(i)
+
+    diff = ResultDiff(name=patched.name)
+    for issue in patched.issues:
+        candidates = unmatched.get(fingerprint(issue))
+        if candidates:
+            candidates.popleft()
+        else:
+            diff.added.append(issue)
+
+    removed = sorted(i for indices in unmatched.values() for i in indices)
+    diff.removed = [baseline.issues[i] for i in removed]
+    return diff
+
+
+@dataclass
+class MatrixDiff:
+    """Findings of every configuration of an option-matrix run."""
+
+    name: str
+    configs: list[str]
+    common: list[Issue] = field(default_factory=list)
+    only: dict[str, list[Issue]] = field(default_factory=dict)
+
+
+def split_common(
+    issue_lists: list[list[Issue]],
+) -> tuple[list[Issue], list[list[Issue]]]:
+    """
+    Splits each list of issues into those all lists share and those
+    specific to it.
+
+    Fingerprints are counted per list and intersected, so a finding
+    reported twice in every list is common twice. Common findings are
+    listed in the order of the first list.
+    """
+    counts = [Counter(fingerprint(issue) for issue in issues) for issues in issue_lists]
+    shared = counts[0].copy()
+    for count in counts[1:]:
+        shared &= count
+
+    common: list[Issue] = []
+    only: list[list[Issue]] = []
+    for i, issues in enumerate(issue_lists):
+        unmatched = shared.copy()
+        specific: list[Issue] = []
+        for issue in issues:
+            key = fingerprint(issue)
+            if unmatched[key] > 0:
+                unmatched[key] -= 1
+                if i == 0:
+                    common.append(issue)
+            else:
+                specific.append(issue)
+        only.append(specific)
+    return common, only
+
+
+def diff_matrix(name: str, results: list[ProjectResult]) -> MatrixDiff:
+    """
+    Splits the findings of each configuration into those all
+    configurations share and those specific to it, as ``split_common``.
+    """
+    common, only = split_common([r.issues for r in results])
+    return MatrixDiff(
+        name,
+        [r.name for r in results],
+        common,
+        {r.name: issues for r, issues in zip(results, only)},
+    )
+
+
+def matrix_diffs(results: list[ProjectResult]) -> dict[str, MatrixDiff]:
+    """Compares the configurations of each project run with an option matrix."""
+    configs: dict[str, list[ProjectResult]] = {}
+    for result in results:
+        project = matrix_project(result.name)
+        if project is not None:
+            configs.setdefault(project, []).append(result)
+    return {name: diff_matrix(name, parts) for name, parts in configs.items()}
+
+
+def baseline_path(log_dir: str, project: str) -> str:
+    """Returns where the report step looks for a project's baseline."""
+    return os.path.join(log_dir, f"{project}{BASELINE_SUFFIX}")
+
+
+def load_baseline(log_dir: str, project: str) -> ProjectResult | None:
+    """Loads the baseline written next to a project's logs, if any."""
+    try:
+        with open(baseline_path(log_dir, project)) as f:
+            return result_from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Ignoring unreadable baseline for {project}: {e}", file=sys.stderr)
+        return None
+
+
+def format_count(unique: int, raw: int) -> str:
+    """Formats a unique count, appending the raw count when they differ."""
+    if raw > unique:
+        return f"{unique} ({raw} raw)"
+    return str(unique)
+
+
 def write_summary_table(f: TextIO, results: list[ProjectResult]) -> None:
     """Writes the high-level summary table to the markdown file."""
     f.write("### 🧪 Clang-Tidy Integration Test Results\n\n")
     f.write("| Project | Status | Warnings | Errors | Crash |\n")
     f.write("| :--- | :--- | :--- | :--- | :--- |\n")
 
+    has_duplicates = False
     for res in results:
         status_display = f"{res.status_emoji} {res.status_text}"
         crash_mark = "YES" if res.has_crash else "-"
+        warnings = format_count(res.warnings_count, res.raw_warnings_count)
+        errors = format_count(res.errors_count, res.raw_errors_count)
         f.write(
             f"| **{res.name}** | {status_display} "
-            f"| {res.warnings_count} | {res.errors_count} "
+            f"| {warnings} | {errors} "
             f"| {crash_mark} |\n"
         )
+        has_duplicates |= (
+            res.raw_warnings_count > res.warnings_count
+            or res.raw_errors_count > res.errors_count
+        )
+
+    if has_duplicates:
+        f.write(
+            "\nCounts are unique diagnostics; raw counts include repeats "
+            "reported once per translation unit.\n"
+        )
 
     f.write("\n---\n")
 
 
+def format_issue(issue: Issue, base_url: str | None) -> str:
+    """Formats one issue as a markdown list entry."""
+    # Create link if base URL is available
+    if base_url:
+        link = f"{base_url}/{issue.file_path}#L{issue.line}"
+        loc_text = f"[{issue.line}:{issue.col}]({link})"
+    else:
+        loc_text = f"{issue.line}:{issue.col}"
+
+    icon = "🛑" if issue.severity == "error" else "⚠️"
+
+    entry = f"- {icon} **{loc_text}**: {issue.message} `[{issue.check_name}]`\n"
+    if issue.context:
+        entry += f"  ```cpp\n  {issue.context}\n  ```\n"
+    return entry
+
+
+def group_by_file(issues: Iterable[Issue]) -> Iterator[tuple[str, list[Issue]]]:
+    """Groups issues by file, in order of each file's first issue."""
+    files_dict: dict[str, list[Issue]] = {}
+    for issue in issues:
+        files_dict.setdefault(issue.file_path, []).append(issue)
+    yield from files_dict.items()
+
+
+def file_heading(file_path: str, level: int) -> str:
+    """Returns the markdown heading of a file's issues."""
+    return f"{'#' * level} 📄 `{file_path}`\n"
+
+
+def iter_issue_entries(
+    groups: Iterable[tuple[str, list[Issue]]], base_url: str | None, level: int = 4
+) -> Iterator[str]:
+    """
+    Yields the markdown of per-file issue groups, one chunk per issue.
+
+    The first chunk of each file carries the file heading, of ``level``.
+    """
+    for file_path, file_issues in groups:
+        heading = file_heading(file_path, level)
+        for issue in file_issues:
+            yield heading + format_issue(issue, base_url)
+            heading = ""
+
+
+_QUOTED_RE = re.compile(r"'[^']*'")
+
+
+def message_group(issue: Issue) -> tuple[str, str]:
+    """Groups messages that only differ in the quoted names they mention."""
+    return issue.check_name, _QUOTED_RE.sub("'…'", issue.message)
+
+
+@dataclass
+class IssueStats:
+    """Issue counts of a project per file and per message group."""
+
+    total: int = 0
+    by_check: Counter[str] = field(default_factory=Counter)
+    by_file: Counter[str] = field(default_factory=Counter)
+    by_message: Counter[tuple[str, str]] = field(default_factory=Counter)
+    samples: dict[tuple[str, str], Issue] = field(default_factory=dict)
+
+    def add(self, issue: Issue) -> None:
+        self.total += 1
+        self.by_check[issue.check_name] += 1
+        self.by_file[issue.file_path] += 1
+        group = message_group(issue)
+        self.by_message[group] += 1
+        self.samples.setdefault(group, issue)
+
+    @classmethod
+    def of(cls, issues: Iterable[Issue]) -> "IssueStats":
+        stats = cls()
+        for issue in issues:
+            stats.add(issue)
+        return stats
+
+
+def fair_share(left: float, demands: list[float]) -> float:
+    """
+    Returns the share of ``left`` for the first of ``demands``.
+
+    Demands below an even share are met in full and the others split the
+    rest evenly. The first demand also gets whatever the others leave
+    unused; later shares are worked out again from what is then left.
+    """
+    remaining, count = max(left, 0.0), len(demands)
+    for demand in sorted(demands):
+        if demand * count > remaining:
+            break
+        remaining -= demand
+        count -= 1
+    level = remaining / count if count else float("inf")
+    return max(left, 0.0) - sum(min(demand, level) for demand in demands[1:])
+
+
+@dataclass
+class ReportBudget:
+    """
+    Size limits the markdown report is written within.
+
+    What is left of the budget is shared between the project sections
+    still to be written by what each needs in full: sections needing less
+    than an even share get all of it and the others split the rest, so one
+    noisy project cannot starve the others and small ones leave nothing
+    unused. Everything a section writes is charged to its allowance,
+    including the markup around its entries.
+    """
+
+    max_bytes: int | None = None
+    max_issues: int | None = None
+    top_n: int = DEFAULT_TOP_N
+    bytes_left: float = 0
+    issues_left: float = 0
+    issues_spent: int = 0
+    truncated: list[str] = field(default_factory=list)
+
+    def begin_section(
+        self,
+        f: TextIO,
+        demands: Sequence[tuple[float, float]] = ((float("inf"), float("inf")),),
+    ) -> None:
+        """
+        Sets the allowance of the next section from the budget left.
+
+        ``demands`` are the bytes and issues that section and every later
+        one need in full, as measured by ``section_demand``.
+        """
+        if self.max_bytes is None:
+            self.bytes_left = float("inf")
+        else:
+            needs = [demand[0] for demand in demands]
+            self.bytes_left = fair_share(self.max_bytes - f.tell(), needs)
+        if self.max_issues is None:
+            self.issues_left = float("inf")
+        else:
+            needs = [demand[1] for demand in demands]
+            self.issues_left = fair_share(self.max_issues - self.issues_spent, needs)
+
+    def allow_all(self) -> None:
+        """Gives the next section the whole budget, for ``section_demand``."""
+        self.bytes_left = float("inf") if self.max_bytes is None else self.max_bytes
+        self.issues_left = float("inf") if self.max_issues is None else self.max_issues
+
+    def share(self, parts_left: int) -> tuple[float, float]:
+        """
+        Limits the allowance to an even share for the next of
+        ``parts_left`` parts of a section.
+
+        Returns:
+            The held back bytes and issues, to be given back with ``restore``.
+        """
+        share = max(parts_left, 1)
+        held = (
+            self.bytes_left - self.bytes_left / share,
+            self.issues_left - self.issues_left / share,
+        )
+        self.bytes_left -= held[0]
+        self.issues_left -= held[1]
+        return held
+
+    def restore(self, held: tuple[float, float]) -> None:
+        """Gives back an allowance held back by ``share``."""
+        self.bytes_left += held[0]
+        self.issues_left += held[1]
+
+    def spend(self, text: str, issues: int = 0) -> bool:
+        """Accounts for ``text`` if it fits the section allowance."""
+        size = len(text.encode())
+        if size > self.bytes_left or issues > self.issues_left:
+            return False
+        self.bytes_left -= size
+        self.issues_left -= issues
+        self.issues_spent += issues
+        return True
+
+
+def write_grouped_summary(
+    f: TextIO, stats: IssueStats, budget: ReportBudget
+) -> list[Issue]:
+    """
+    Writes the top files and messages by issue count.
+
+    Returns:
+        The first occurrence of each listed message group, as samples.
+    """
+    rows = ["| File | Issues |\n", "| :--- | ---: |\n"]
+    rows += [
+        f"| `{path}` | {n} |\n" for path, n in stats.by_file.most_common(budget.top_n)
+    ]
+    rows += ["\n| Check | Message | Issues |\n", "| :--- | :--- | ---: |\n"]
+    samples = []
+    for group, n in stats.by_message.most_common(budget.top_n):
+        check, message = group
+        message = message.replace("|", "\\|")
+        rows.append(f"| `{check}` | {message} | {n} |\n")
+        samples.append(stats.samples[group])
+
+    for row in rows:
+        if not budget.spend(row):
+            break
+        f.write(row)
+    return samples
+
+
+class _IssuePicker:
+    """Issues picked to fit a budget, charged with their file headings."""
+
+    def __init__(self, budget: ReportBudget, base_url: str | None, level: int) -> None:
+        self.budget = budget
+        self.base_url = base_url
+        self.level = level
+        self.picked: list[Issue] = []
+        self._files: set[str] = set()
+
+    def take(self, issue: Issue) -> bool:
+        """Picks ``issue`` if its entry still fits the allowance."""
+        text = format_issue(issue, self.base_url)
+        if issue.file_path not in self._files:
+            text = file_heading(issue.file_path, self.level) + text
+        if not self.budget.spend(text, issues=1):
+            return False
+        self._files.add(issue.file_path)
+        self.picked.append(issue)
+        return True
+
+    def write(self, f: TextIO) -> None:
+        groups = group_by_file(self.picked)
+        f.writelines(iter_issue_entries(groups, self.base_url, self.level))
+
+
+def write_budgeted_groups(
+    f: TextIO,
+    name: str,
+    groups: Iterable[tuple[str, list[Issue]]],
+    stats: IssueStats,
+    base_url: str | None,
+    budget: ReportBudget | None,
+    level: int = 4,
+) -> None:
+    """
+    Writes per-file issue groups within the section's budget, with file
+    headings of ``level``.
+
+    When they do not all fit, the top-N files and messages are written with
+    their counts instead. The rest of the allowance is filled with
+    occurrences: a sample of each listed message group first, then the
+    others in file order. The full list goes to the details artifact.
+    """
+    if budget is None:
+        f.writelines(iter_issue_entries(groups, base_url, level))
+        return
+
+    # Buffer at most one section's worth before deciding how to render it.
+    issues = (issue for _, file_issues in groups for issue in file_issues)
+    allowance = (budget.bytes_left, budget.issues_left, budget.issues_spent)
+    listed = _IssuePicker(budget, base_url, level)
+    for issue in issues:
+        if not listed.take(issue):
+            overflow = issue
+            break
+    else:
+        listed.write(f)
+        return
+
+    budget.bytes_left, budget.issues_left, budget.issues_spent = allowance
+    budget.truncated.append(name)
+    note = (
+        f"> ⚠️ {stats.total} issues exceed the report budget; showing the most "
+        "frequent groups and a sample. See the details artifact for all of "
+        "them.\n\n"
+    )
+    if budget.spend(note):
+        f.write(note)
+    samples = write_grouped_summary(f, stats, budget)
+
+    label = "\n**Sample occurrences**\n\n"
+    if not budget.spend(label):
+        return
+    picker = _IssuePicker(budget, base_url, level)
+    sample_keys = Counter(issue_key(sample) for sample in samples)
+    if all(picker.take(sample) for sample in samples):
+        for issue in itertools.chain(listed.picked, [overflow], issues):
+            key = issue_key(issue)
+            if sample_keys[key]:
+                sample_keys[key] -= 1
+            elif not picker.take(issue):
+                break
+    if picker.picked:
+        f.write(label)
+        picker.write(f)
+    else:
+        budget.bytes_left += len(label.encode())
+
+
+def issues_of_check(
+    groups: FileGroups, check: str
+) -> Iterator[tuple[str, list[Issue]]]:
+    """Narrows per-file issue groups to the issues of one check."""
+    for file_path, file_issues in groups:
+        selected = [issue for issue in file_issues if issue.check_name == check]
+        if selected:
+            yield file_path, selected
+
+
+def write_check_sections(
+    f: TextIO,
+    name: str,
+    groups: Callable[[], FileGroups],
+    stats: IssueStats,
+    base_url: str | None,
+    budget: ReportBudget | None,
+    level: int = 4,
+) -> None:
+    """
+    Writes per-file issue groups, split into one section per check when
+    the issues come from several checks.
+
+    Check headings are of ``level`` and nest the file headings below them;
+    with a single check, the file headings are of ``level``. ``groups`` is
+    called once per check, so a streamed project reads its issues again
+    for each one. Checks get an even share of the budget.
+    """
+    if len(stats.by_check) <= 1:
+        write_budgeted_groups(f, name, groups(), stats, base_url, budget, level)
+        return
+
+    check_stats: dict[str, IssueStats] = defaultdict(IssueStats)
+    for _, file_issues in groups():
+        for issue in file_issues:
+            check_stats[issue.check_name].add(issue)
+    checks = list(stats.by_check)
+    for i, check in enumerate(checks):
+        held = budget.share(len(checks) - i) if budget is not None else (0.0, 0.0)
+        heading = f"{'#' * level} 🔎 `{check}` ({stats.by_check[check]} issues)\n\n"
+        if budget is not None and not budget.spend(heading + "\n"):
+            budget.truncated.append(name)
+        else:
+            f.write(heading)
+            check_groups = issues_of_check(groups(), check)
+            write_budgeted_groups(
+                f, name, check_groups, check_stats[check], base_url, budget, level + 1
+            )
+            f.write("\n")
+        if budget is not None:
+            budget.restore(held)
+
+
+def write_budgeted_issues(
+    f: TextIO,
+    name: str,
+    issues: list[Issue],
+    base_url: str | None,
+    budget: ReportBudget | None,
+    level: int = 4,
+) -> None:
+    """
+    Writes issues grouped by file, and by check if there are several,
+    under headings of ``level``.
+    """
+    write_check_sections(
+        f,
+        name,
+        lambda: group_by_file(issues),
+        IssueStats.of(issues),
+        base_url,
+        budget,
+        level,
+    )
+
+
+def format_crash_group(crashes: list[CrashRecord]) -> str:
+    """Formats crashes sharing a signature as a markdown list entry."""
+    crash = crashes[0]
+    frames = crash.signature_frames()
+    count = "1 crash" if len(crashes) == 1 else f"{len(crashes)} crashes"
+    top_frame = f" in `{frames[0]}`" if frames else ""
+    entry = f"- 💥 **{count}** `{crash.signature}`{top_frame}\n"
+
+    files = list(dict.fromkeys(c.source_file for c in crashes if c.source_file))
+    if files:
+        more = f" and {len(files) - 3} more" if len(files) > 3 else ""
+        entry += f"  Files: {', '.join(f'`{p}`' for p in files[:3])}{more}\n"
+    command = shortest_repro_command(crashes)
+    if command:
+        entry += f"  ```sh\n  {command}\n  ```\n"
+    return entry
+
+
+def write_crash_groups(
+    f: TextIO, name: str, crashes: list[CrashRecord], budget: ReportBudget | None
+) -> None:
+    """Writes one entry per crash signature, within the section's budget."""
+    groups = group_crashes(crashes)
+    if not groups:
+        return
+    heading = "#### 💥 Crash signatures\n\n"
+    if budget is not None and not budget.spend(heading + "\n"):
+        budget.truncated.append(name)
+        return
+    f.write(heading)
+    for text in map(format_crash_group, groups):
+        if budget is not None and not budget.spend(text):
+            budget.truncated.append(name)
+            break
+        f.write(text)
+    f.write("\n")
+
+
+def open_section(
+    f: TextIO, name: str, frame: list[str], budget: ReportBudget | None
+) -> bool:
+    """
+    Charges the markup a section always writes, and writes its opening.
+
+    ``frame`` is the opening followed by the rest of that markup, which
+    the caller writes later. A section whose markup does not fit is
+    skipped, leaving it to the details artifact.
+    """
+    if budget is not None and not budget.spend("".join(frame)):
+        budget.truncated.append(name)
+        return False
+    f.write(frame[0])
+    return True
+
+
+_CLOSING = "\n</details>\n"
+
+
 def write_project_details(
-    f: TextIO, result: ProjectResult, project_urls: dict[str, str]
+    f: TextIO,
+    result: ProjectResult,
+    project_urls: dict[str, str],
+    budget: ReportBudget | None = None,
+    groups: Callable[[], FileGroups] | None = None,
+    stats: IssueStats | None = None,
 ) -> None:
-    """Writes the detailed breakdown of issues for a single project."""
-    if not result.issues and not result.has_crash:
+    """
+    Writes the detailed breakdown of issues for a single project.
+
+    The issues come from ``result.issues`` unless ``groups`` and ``stats``
+    are given, which lets a caller stream them one file group at a time.
+    ``groups`` returns a fresh iterable on each call.
+    """
+    total = len(result.issues) if stats is None else stats.total
+    if not total and not result.has_crash:
         return
 
     summary_text = f"🔍 {result.name} Details ({result.warnings_count} warnings, {result.errors_count} errors)"
-    f.write(f"\n<details>\n<summary><strong>{summary_text}</strong></summary>\n\n")
+    opening = f"\n<details>\n<summary><strong>{summary_text}</strong></summary>\n\n"
+    banner = "🚨 **CRASH DETECTED** in this project!\n\n" if result.has_crash else ""
+    if not open_section(f, result.name, [opening, banner, _CLOSING], budget):
+        return
 
     if result.has_crash:
-        f.write("🚨 **CRASH DETECTED** in this project!\n\n")
+        f.write(banner)
+        write_crash_groups(f, result.name, result.crashes, budget)
 
-    # Group issues by file
-    files_dict: dict[str, list[Issue]] = {}
-    for issue in result.issues:
-        files_dict.setdefault(issue.file_path, []).append(issue)
+    base_url = project_urls.get(result.name)
+    if groups is None or stats is None:
+        write_budgeted_issues(f, result.name, result.issues, base_url, budget)
+    else:
+        write_check_sections(f, result.name, groups, stats, base_url, budget)
+
+    f.write(_CLOSING)
+
+
+def write_project_diff(
+    f: TextIO,
+    result: ProjectResult,
+    diff: ResultDiff,
+    project_urls: dict[str, str],
+    budget: ReportBudget | None = None,
+) -> None:
+    """Writes the findings a patch added and removed for a single project."""
+    if not diff.added and not diff.removed and not result.has_crash:
+        return
+
+    summary_text = (
+        f"🔍 {result.name} Changes vs. baseline "
+        f"(+{len(diff.added)} added, -{len(diff.removed)} removed)"
+    )
+    opening = f"\n<details>\n<summary><strong>{summary_text}</strong></summary>\n\n"
+    banner = "🚨 **CRASH DETECTED** in this project!\n\n" if result.has_crash else ""
+    added = "#### ➕ Added findings\n\n" if diff.added else ""
+    removed = "\n#### ➖ Removed findings\n\n" if diff.removed else ""
+    frame = [opening, banner, added, removed, _CLOSING]
+    if not open_section(f, result.name, frame, budget):
+        return
+
+    if result.has_crash:
+        f.write(banner)
+        write_crash_groups(f, result.name, result.crashes, budget)
 
     base_url = project_urls.get(result.name)
+    if diff.added:
+        f.write(added)
+        write_budgeted_issues(f, result.name, diff.added, base_url, budget, 5)
+    if diff.removed:
+        f.write(removed)
+        write_budgeted_issues(f, result.name, diff.removed, base_url, budget, 5)
 
-    for file_path, issues in files_dict.items():
-        f.write(f"#### 📄 `{file_path}`\n")
+    f.write(_CLOSING)
 
-        for issue in issues:
-            # Create link if base URL is available
-            if base_url:
-                link = f"{base_url}/{file_path}#L{issue.line}"
-                loc_text = f"[{issue.line}:{issue.col}]({link})"
+
+GroupedIssues = tuple[Callable[[], FileGroups], IssueStats]
+
+
+def write_matrix_section(
+    f: TextIO,
+    name: str,
+    configs: list[ProjectResult],
+    common: GroupedIssues,
+    only: list[GroupedIssues],
+    project_urls: dict[str, str],
+    budget: ReportBudget | None = None,
+) -> None:
+    """
+    Writes the findings all configurations of a matrix run share once,
+    then the findings specific to each configuration that has any.
+
+    ``configs`` are the configurations' results, for their crashes, and
+    ``only`` holds their specific findings in the same order. Each part is
+    a ``groups`` callable and stats, as taken by ``write_check_sections``.
+    """
+    crashed = [r for r in configs if r.has_crash]
+    common_total = common[1].total
+    specific = sum(stats.total for _, stats in only)
+    if not common_total and not specific and not crashed:
+        return
+
+    summary_text = (
+        f"🔍 {name} Across {len(configs)} configs "
+        f"({common_total} common, {specific} config-specific)"
+    )
+    opening = f"\n<details>\n<summary><strong>{summary_text}</strong></summary>\n\n"
+    banners = [
+        f"🚨 **CRASH DETECTED** with `{matrix_config(r.name)}`!\n\n" for r in crashed
+    ]
+    parts = [("🟰 Common to all configs", common)]
+    parts += [
+        (f"⚙️ Only with `{matrix_config(r.name)}`", part)
+        for r, part in zip(configs, only)
+        if part[1].total
+    ]
+    headings = [f"\n#### {title} ({part[1].total})\n\n" for title, part in parts]
+    frame = [opening, *banners, *headings, _CLOSING]
+    if not open_section(f, name, frame, budget):
+        return
+
+    for result, banner in zip(crashed, banners):
+        f.write(banner)
+        write_crash_groups(f, name, result.crashes, budget)
+
+    base_url = project_urls.get(name)
+    for i, (heading, (_, (groups, stats))) in enumerate(zip(headings, parts)):
+        held = budget.share(len(parts) - i) if budget is not None else (0.0, 0.0)
+        f.write(heading)
+        write_check_sections(f, name, groups, stats, base_url, budget, 5)
+        if budget is not None:
+            budget.restore(held)
+
+    f.write(_CLOSING)
+
+
+def write_project_matrix(
+    f: TextIO,
+    matrix: MatrixDiff,
+    results: dict[str, ProjectResult],
+    project_urls: dict[str, str],
+    budget: ReportBudget | None = None,
+) -> None:
+    """Writes the section of a matrix run whose findings are in memory."""
+
+    def grouped(issues: list[Issue]) -> GroupedIssues:
+        return (lambda: group_by_file(issues)), IssueStats.of(issues)
+
+    write_matrix_section(
+        f,
+        matrix.name,
+        [results[name] for name in matrix.configs],
+        grouped(matrix.common),
+        [grouped(matrix.only[name]) for name in matrix.configs],
+        project_urls,
+        budget,
+    )
+
+
+def write_project_performance(
+    f: TextIO, name: str, profile: RunProfile, budget: ReportBudget | None = None
+) -> None:
+    """Writes a project's slowest translation units and time per check."""
+    if not profile.units:
+        return
+
+    top_n = DEFAULT_TOP_N if budget is None else budget.top_n
+    slowest = profile.slowest(top_n)
+    # Cached units report the timings of the run that filled the cache.
+    cached = f", {profile.cache_hits} cached" if profile.cache_hits else ""
+    summary_text = (
+        f"⏱️ {name} Performance ({len(profile.units)} files{cached}, "
+        f"{profile.total_seconds:.1f}s total, "
+        f"slowest {slowest[0].wall_seconds:.1f}s)"
+    )
+    rows = [
+        f"\n<details>\n<summary><strong>{summary_text}</strong></summary>\n\n",
+        "| File | Wall time (s) | Peak RSS (MiB) |\n",
+        "| :--- | ---: | ---: |\n",
+    ]
+    rows += [
+        f"| `{get_relative_path(unit.file, name)}` | {unit.wall_seconds:.2f} "
+        f"| {unit.max_rss_kib / 1024:.0f} |\n"
+        for unit in slowest
+    ]
+    checks = list(profile.check_totals().items())[:top_n]
+    if checks:
+        rows += ["\n| Check | Matcher time (s) |\n", "| :--- | ---: |\n"]
+        rows += [f"| `{check}` | {seconds:.2f} |\n" for check, seconds in checks]
+    rows.append("\n</details>\n")
+
+    text = "".join(rows)
+    if budget is not None and not budget.spend(text):
+        budget.truncated.append(name)
+        return
+    f.write(text)
+
+
+# Writes one section of the report, within the budget if one is given.
+Section = Callable[[TextIO, ReportBudget | None], None]
+
+
+class _ByteCounter(io.StringIO):
+    """Discards the text written to it, counting its size in bytes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.size = 0
+
+    def write(self, s: str) -> int:
+        self.size += len(s.encode())
+        return len(s)
+
+
+def section_demand(write: Section, budget: ReportBudget) -> tuple[float, float]:
+    """
+    Returns the bytes and issues ``write`` needs to write its section in
+    full, or infinity when the whole budget is not enough.
+    """
+    counter = _ByteCounter()
+    trial = ReportBudget(budget.max_bytes, budget.max_issues, budget.top_n)
+    trial.allow_all()
+    write(counter, trial)
+    if trial.truncated:
+        return float("inf"), float("inf")
+    return counter.size, trial.issues_spent
+
+
+def write_sections(
+    f: TextIO, sections: list[Section], budget: ReportBudget | None
+) -> None:
+    """
+    Writes report sections, sharing the budget between them by what each
+    needs in full. Every section is written once more beforehand, to a
+    counter, to measure that.
+    """
+    if budget is None:
+        for write in sections:
+            write(f, None)
+        return
+    demands = [section_demand(write, budget) for write in sections]
+    for i, write in enumerate(sections):
+        budget.begin_section(f, demands[i:])
+        write(f, budget)
+
+
+def write_report(
+    f: TextIO,
+    results: list[ProjectResult],
+    project_urls: dict[str, str],
+    diffs: dict[str, ResultDiff],
+    budget: ReportBudget | None = None,
+    profiles: dict[str, RunProfile] | None = None,
+    matrices: dict[str, MatrixDiff] | None = None,
+) -> None:
+    """
+    Writes the summary table and every project's section.
+
+    The configurations of a matrix run share one section, written in place
+    of the first configuration's.
+    """
+    write_summary_table(f, results)
+    if diffs:
+        f.write(
+            "\nCompared against the unpatched baseline; only findings "
+            "the patch added or removed are listed.\n"
+        )
+    by_name = {res.name: res for res in results}
+    matrix_of = {name: m for m in (matrices or {}).values() for name in m.configs}
+
+    def section(res: ProjectResult) -> Section:
+        def write(f: TextIO, budget: ReportBudget | None) -> None:
+            matrix = matrix_of.get(res.name)
+            if matrix is not None:
+                if res.name == matrix.configs[0]:
+                    write_project_matrix(f, matrix, by_name, project_urls, budget)
+            elif res.name in diffs:
+                write_project_diff(f, res, diffs[res.name], project_urls, budget)
             else:
-                loc_text = f"{issue.line}:{issue.col}"
+                write_project_details(f, res, project_urls, budget)
+            if profiles and res.name in profiles:
+                write_project_performance(f, res.name, profiles[res.name], budget)
 
-            icon = "🛑" if issue.severity == "error" else "⚠️"
+        return write
+
+    write_sections(f, [section(res) for res in results], budget)
 
-            f.write(
-                f"- {icon} **{loc_text}**: {issue.message} `[{issue.check_name}]`\n"
-            )
 
-            if issue.context:
-                f.write(f"  ```cpp\n  {issue.context}\n  ```\n")
+def write_markdown_files(
+    write: Callable[[TextIO, ReportBudget | None], None],
+    output_path: str,
+    budget: ReportBudget | None = None,
+    details_path: str | None = None,
+) -> None:
+    """
+    Writes the report with ``write``, and the unabridged report as well
+    when the budget truncated any project.
+    """
+    try:
+        with open(output_path, "w") as f:
+            write(f, budget)
+        print(f"Report generated: {output_path}")
+    except OSError as e:
+        print(f"Error writing report to {output_path}: {e}", file=sys.stderr)
+        return
 
-    f.write("\n</details>\n")
+    if budget is None or not budget.truncated or details_path is None:
+        return
+    print(f"Report budget exceeded for: {', '.join(dict.fromkeys(budget.truncated))}")
+    try:
+        with gzip.open(details_path, "wt") as f:
+            write(f, None)
+        print(f"Full details written: {details_path}")
+    except OSError as e:
+        print(f"Error writing details to {details_path}: {e}", file=sys.stderr)
 
 
 def generate_markdown(
     results: list[ProjectResult],
     output_path: str,
     project_urls: dict[str, str] | None = None,
+    diffs: dict[str, ResultDiff] | None = None,
+    budget: ReportBudget | None = None,
+    details_path: str | None = None,
+    profiles: dict[str, RunProfile] | None = None,
+    matrices: dict[str, MatrixDiff] | None = None,
 ) -> None:
     """
     Orchestrates the creation of the markdown report.
@@ -221,37 +1552,231 @@ def generate_markdown(
         results: List of parsed project results.
         output_path: Destination path for the report.
         project_urls: Mapping of project names to browse URLs.
+        diffs: Baseline comparisons; projects listed here only show the
+            findings the patch added or removed.
+        budget: Size limits for the report; projects over their share are
+            summarized.
+        details_path: Gzipped markdown file receiving the unabridged report
+            when the budget truncated any project.
+        profiles: Run profiles; each gets a performance section after its
+            project's findings.
+        matrices: Comparisons of the configurations of option-matrix runs,
+            by project.
     """
-    if project_urls is None:
-        project_urls = {}
+    urls = project_urls or {}
+    project_diffs = diffs or {}
+    write_markdown_files(
+        lambda f, b: write_report(
+            f, results, urls, project_diffs, b, profiles, matrices
+        ),
+        output_path,
+        budget,
+        details_path,
+    )
+
 
+def project_browse_urls() -> dict[str, str]:
+    """Returns the browse URL of each configured project, if available."""
     try:
-        with open(output_path, "w") as f:
-            write_summary_table(f, results)
-            for res in results:
-                write_project_details(f, res, project_urls)
-        print(f"Report generated: {output_path}")
-    except OSError as e:
-        print(f"Error writing report to {output_path}: {e}", file=sys.stderr)
+        return {p.name: p.browse_url for p in load_projects()}
+    except (OSError, KeyError):
+        return {}
+
+
+def merge_results(name: str, parts: list[ProjectResult]) -> ProjectResult:
+    """
+    Combines per-shard results of one project into a single result.
+
+    Diagnostics repeated across shards, e.g. from a header shared by several
+    translation units, are kept once, in shard order.
+    """
+    merged = ProjectResult(name=name)
+    seen: set[IssueKey] = set()
+    for part in parts:
+        merged.has_crash |= part.has_crash
+        merged.raw_warnings_count += part.raw_warnings_count
+        merged.raw_errors_count += part.raw_errors_count
+        merged.crashes += part.crashes
+        for issue in part.issues:
+            if issue_key(issue) in seen:
+                continue
+            seen.add(issue_key(issue))
+            merged.issues.append(issue)
+            if issue.severity == "warning":
+                merged.warnings_count += 1
+            elif issue.severity == "error":
+                merged.errors_count += 1
+    return merged
+
+
+def find_log_files(log_dir: str) -> tuple[list[str], list[str]]:
+    """
+    Finds project logs and per-translation-unit log shards.
+
+    ``<log_dir>/<project>.log`` is a whole-project log, and every
+    ``<log_dir>/<project>/*.log`` is a shard of that project.
 
+    Returns:
+        The log paths in a stable order and the project of each one.
+    """
+    log_files: list[str] = []
+    project_names: list[str] = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "*.log"))):
+        log_files.append(path)
+        project_names.append(os.path.basename(path).replace(".log", ""))
+    for path in sorted(glob.glob(os.path.join(log_dir, "*", "*.log"))):
+        log_files.append(path)
+        project_names.append(os.path.basename(os.path.dirname(path)))
+    return log_files, project_names
+
+
+def parse_log_files(
+    log_files: list[str],
+    jobs: int = 1,
+    cache: ParseCache | None = None,
+    project_names: list[str] | None = None,
+) -> list[ProjectResult]:
+    """
+    Parses log files, optionally in parallel, sorted by project name.
+
+    Logs sharing a project name are merged into one result.
+
+    Args:
+        log_files: Paths of the log files to parse.
+        jobs: Number of worker processes; 1 parses serially in-process.
+        cache: Parse cache consulted before, and updated after, parsing.
+        project_names: Project of each log; defaults to the file names.
+
+    Returns:
+        The parsed results sorted by project name.
+    """
+    if project_names is None:
+        project_names = [os.path.basename(p).replace(".log", "") for p in log_files]
 
-def generate_report(log_dir: str, output: str) -> None:
+    parsed: dict[str, ProjectResult] = {}
+    to_parse: list[str] = []
+    to_parse_names: list[str] = []
+    for log, name in zip(log_files, project_names):
+        cached = cache.lookup(log) if cache is not None else None
+        if cached is not None:
+            parsed[log] = result_from_dict(cached)
+        else:
+            to_parse.append(log)
+            to_parse_names.append(name)
+
+    if jobs > 1 and len(to_parse) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(to_parse))) as pool:
+            fresh = list(pool.map(parse_log_file, to_parse, to_parse_names))
+    else:
+        fresh = [parse_log_file(log, n) for log, n in zip(to_parse, to_parse_names)]
+
+    for log, result in zip(to_parse, fresh):
+        parsed[log] = result
+        if cache is not None:
+            cache.store(log, result_to_dict(result))
+
+    by_project: dict[str, list[ProjectResult]] = {}
+    for log, name in zip(log_files, project_names):
+        by_project.setdefault(name, []).append(parsed[log])
+
+    results = [
+        parts[0] if len(parts) == 1 else merge_results(name, parts)
+        for name, parts in by_project.items()
+    ]
+    results.sort(key=lambda x: x.name)
+    return results
+
+
+def summarize_log_files(
+    log_files: list[str], project_names: list[str], jobs: int = 1
+) -> list[ProjectResult]:
+    """
+    Counts each project's diagnostics with scan_log_summary.
+
+    Returns:
+        Results without issues, sorted by project name.
+    """
+    by_project: dict[str, list[str]] = {}
+    for log, name in zip(log_files, project_names):
+        by_project.setdefault(name, []).append(log)
+
+    names = sorted(by_project)
+    paths = [by_project[name] for name in names]
+    if jobs > 1 and len(names) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(names))) as pool:
+            return list(pool.map(scan_log_summary, names, paths))
+    return list(map(scan_log_summary, names, paths))
+
+
+def load_run_profiles(log_dir: str, names: Iterable[str]) -> dict[str, RunProfile]:
+    """Loads the run profiles of the given projects that have one."""
+    profiles = {name: load_run_profile(log_dir, name) for name in names}
+    return {name: p for name, p in profiles.items() if p is not None}
+
+
+def generate_report(
+    log_dir: str,
+    output: str,
+    jobs: int = 1,
+    use_cache: bool = True,
+    baseline: bool = False,
+    max_bytes: int | None = None,
+    max_issues: int | None = None,
+    top_n: int = DEFAULT_TOP_N,
+    details_output: str = DEFAULT_DETAILS_FILE,
+    markdown: bool = True,
+    summary_only: bool = False,
+) -> list[ProjectResult]:
     if not os.path.exists(log_dir):
         print(f"Log directory '{log_dir}' not found.", file=sys.stderr)
         sys.exit(1)
 
-    log_files = glob.glob(os.path.join(log_dir, "*.log"))
+    log_files, project_names = find_log_files(log_dir)
     if not log_files:
         print(f"No log files found in '{log_dir}'.", file=sys.stderr)
         sys.exit(0)
 
-    try:
-        projects = load_projects()
-        project_urls = {p.name: p.browse_url for p in projects}
-    except (OSError, KeyError):
-        project_urls = {}
+    project_urls = project_browse_urls()
+
+    if summary_only:
+        summaries = summarize_log_files(log_files, project_names, jobs)
+        if markdown:
+            generate_markdown(summaries, output, project_urls)
+        return summaries
 
-    all_results = [parse_log_file(log) for log in log_files]
-    all_results.sort(key=lambda x: x.name)
+    cache = None
+    if use_cache:
+        cache = ParseCache(os.path.join(log_dir, CACHE_FILE), parser_version())
 
-    generate_markdown(all_results, output, project_urls)
+    all_results = parse_log_files(log_files, jobs, cache, project_names)
+
+    if cache is not None:
+        cache.prune(log_files)
+        cache.save()
+        print(f"Parse cache: {cache.hits} reused, {cache.misses} parsed")
+
+    diffs: dict[str, ResultDiff] = {}
+    if baseline:
+        for res in all_results:
+            base = load_baseline(log_dir, res.name)
+            if base is None:
+                print(f"No baseline for {res.name}, reporting all findings")
+            else:
+                diffs[res.name] = diff_results(base, res)
+
+    budget = None
+    if max_bytes or max_issues:
+        budget = ReportBudget(max_bytes or None, max_issues or None, top_n)
+
+    if markdown:
+        generate_markdown(
+            all_results,
+            output,
+            project_urls,
+            diffs,
+            budget,
+            details_output,
+            load_run_profiles(log_dir, (r.name for r in all_results)),
+            matrix_diffs(all_results),
+        )
+    return all_results
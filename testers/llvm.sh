@@ -57,6 +57,22 @@ echo "[LLVM] Running clang-tidy on Clang codebase..."
 TARGET_DIR="$SOURCE_DIR/clang"
 TARGET_REGEX="^$TARGET_DIR/.*(?<!\.S)$"
 
+if [ -n "${TIDY_CONFIG_MATRIX:-}" ]; then
+    echo "[LLVM] Running clang-tidy with every configuration of the option matrix..."
+    rm -f "$LOG_FILE"
+    "$ROOT_DIR/ctit.py" run llvm \
+        --build-dir "$BUILD_DIR" \
+        --clang-tidy "$CLANG_TIDY_BIN" \
+        --check "$CHECK_NAME" \
+        --full \
+        --config-matrix "$TIDY_CONFIG_MATRIX" \
+        --file-regex "$TARGET_REGEX" \
+        --log-dir "$LOG_DIR" \
+        --jobs "$(nproc)" || true
+    echo "[LLVM] Finished. Log shards saved under $LOG_DIR/llvm@*/"
+    exit 0
+fi
+
 TIDY_ARGS=("-clang-tidy-binary" "$CLANG_TIDY_BIN" "-p" "$BUILD_DIR" "-checks=-*,$CHECK_NAME" "-quiet")
 if [ -n "${TIDY_CONFIG:-}" ]; then
     TIDY_ARGS+=("-config=$TIDY_CONFIG")
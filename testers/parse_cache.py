@@ -0,0 +1,96 @@
+"""On-disk cache of parsed log results, keyed by log file contents."""
+
+import json
+import os
+import sys
+from typing import Any
+
+from testers.sources import file_digest
+
+CACHE_FILE = ".ctit-parse-cache.json"
+
+
+class ParseCache:
+    """
+    JSON sidecar mapping log files to their serialized parse results.
+
+    An entry is only reused when the log path, size, mtime and content hash
+    all match. The whole cache is discarded when ``version`` differs from the
+    one it was written with, so parser changes invalidate it automatically.
+    """
+
+    def __init__(self, path: str, version: str) -> None:
+        self.path = path
+        self.version = version
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable parse cache {self.path}: {e}", file=sys.stderr)
+            return
+
+        if isinstance(data, dict) and data.get("version") == self.version:
+            self.entries = data.get("entries", {})
+
+    @staticmethod
+    def _key(log_path: str) -> str:
+        return os.path.abspath(log_path)
+
+    def lookup(self, log_path: str) -> dict[str, Any] | None:
+        """Returns the cached result for ``log_path`` if it is still valid."""
+        entry = self.entries.get(self._key(log_path))
+        try:
+            st = os.stat(log_path)
+            if (
+                entry is not None
+                and entry["size"] == st.st_size
+                and entry["mtime_ns"] == st.st_mtime_ns
+                and entry["sha256"] == file_digest(log_path)
+                and isinstance(entry["result"], dict)
+            ):
+                self.hits += 1
+                result: dict[str, Any] = entry["result"]
+                return result
+        except OSError:
+            pass
+
+        self.misses += 1
+        return None
+
+    def store(self, log_path: str, result: dict[str, Any]) -> None:
+        """Records the parse result for the current contents of ``log_path``."""
+        try:
+            st = os.stat(log_path)
+            digest = file_digest(log_path)
+        except OSError:
+            return
+
+        self.entries[self._key(log_path)] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": digest,
+            "result": result,
+        }
+
+    def prune(self, log_paths: list[str]) -> None:
+        """Drops entries for logs that are no longer present."""
+        keep = {self._key(p) for p in log_paths}
+        self.entries = {k: v for k, v in self.entries.items() if k in keep}
+
+    def save(self) -> None:
+        """Atomically writes the cache back to disk."""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": self.version, "entries": self.entries}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error writing parse cache {self.path}: {e}", file=sys.stderr)
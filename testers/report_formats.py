@@ -0,0 +1,275 @@
+"""Streaming JSON and SARIF serializations of report results."""
+
+import gzip
+import json
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from contextlib import ExitStack
+from dataclasses import asdict
+from typing import Any, TextIO
+
+from testers.generate_report import (
+    CrashRecord,
+    Issue,
+    ProjectResult,
+    group_by_file,
+    group_crashes,
+    shortest_repro_command,
+)
+
+DEFAULT_JSON_FILE = "issue.json"
+DEFAULT_SARIF_FILE = "issue.sarif"
+JSON_FORMAT_VERSION = 1
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+CLANG_TIDY_URI = "https://clang.llvm.org/extra/clang-tidy/"
+
+# Issues and groups of one project, read once for every structured format.
+ProjectGroups = tuple[ProjectResult, Iterable[tuple[str, list[Issue]]]]
+
+
+def open_output(path: str) -> TextIO:
+    """Opens an output for writing, gzip-compressed when it ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def crash_notification(crashes: list[CrashRecord]) -> dict[str, Any]:
+    """Describes crashes sharing a signature as a SARIF notification."""
+    crash = crashes[0]
+    frames = crash.signature_frames()
+    text = f"clang-tidy crashed {len(crashes)} time(s)"
+    if frames:
+        text += f" in {frames[0]}"
+    command = shortest_repro_command(crashes)
+    properties: dict[str, Any] = {
+        "signature": crash.signature,
+        "count": len(crashes),
+        "frames": frames,
+    }
+    if command:
+        properties["reproCommand"] = command
+    return {"level": "error", "message": {"text": text}, "properties": properties}
+
+
+class StructuredWriter(ABC):
+    """
+    Serializes results incrementally: only the current issue group is
+    ever held, and document syntax is written around it as it streams.
+    """
+
+    def __init__(self, f: TextIO) -> None:
+        self.f = f
+        self._first_project = True
+        self._first_issue = True
+
+    @abstractmethod
+    def begin(self) -> None:
+        """Writes the start of the document."""
+
+    @abstractmethod
+    def begin_project(self, result: ProjectResult, base_url: str | None) -> None:
+        """Writes the start of a project, before its issues."""
+
+    @abstractmethod
+    def add_issue(self, issue: Issue) -> None:
+        """Writes one issue of the current project."""
+
+    @abstractmethod
+    def end_project(self) -> None:
+        """Writes the end of the current project."""
+
+    @abstractmethod
+    def end(self) -> None:
+        """Writes the end of the document."""
+
+    def _item(self, value: Any) -> None:
+        if not self._first_issue:
+            self.f.write(",")
+        self._first_issue = False
+        self.f.write(json.dumps(value, ensure_ascii=False))
+
+
+class JsonReportWriter(StructuredWriter):
+    """
+    Writes ``{"version": 1, "projects": [...]}``, one object per project
+    with the ProjectResult fields, so each loads with result_from_dict.
+    """
+
+    def begin(self) -> None:
+        self.f.write(f'{{"version": {JSON_FORMAT_VERSION}, "projects": [')
+
+    def begin_project(self, result: ProjectResult, base_url: str | None) -> None:
+        if not self._first_project:
+            self.f.write(",")
+        self._first_project = False
+        fields = {
+            "name": result.name,
+            "warnings_count": result.warnings_count,
+            "errors_count": result.errors_count,
+            "has_crash": result.has_crash,
+            "raw_warnings_count": result.raw_warnings_count,
+            "raw_errors_count": result.raw_errors_count,
+            "crashes": [asdict(crash) for crash in result.crashes],
+        }
+        self.f.write(json.dumps(fields, ensure_ascii=False)[:-1] + ', "issues": [')
+        self._first_issue = True
+
+    def add_issue(self, issue: Issue) -> None:
+        self._item(
+            {
+                "file_path": issue.file_path,
+                "line": issue.line,
+                "col": issue.col,
+                "severity": issue.severity,
+                "message": issue.message,
+                "check_name": issue.check_name,
+                "context": issue.context,
+            }
+        )
+
+    def end_project(self) -> None:
+        self.f.write("]}")
+
+    def end(self) -> None:
+        self.f.write("]}\n")
+
+
+class SarifReportWriter(StructuredWriter):
+    """Writes a SARIF 2.1.0 log with one run per project."""
+
+    def begin(self) -> None:
+        self.f.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", "runs": [')
+
+    def begin_project(self, result: ProjectResult, base_url: str | None) -> None:
+        if not self._first_project:
+            self.f.write(",")
+        self._first_project = False
+        self._result = result
+        self._base_url = base_url
+        self._rules: dict[str, None] = {}
+        self.f.write('{"results": [')
+        self._first_issue = True
+
+    def add_issue(self, issue: Issue) -> None:
+        self._rules[issue.check_name] = None
+        region: dict[str, Any] = {"startLine": issue.line, "startColumn": issue.col}
+        if issue.context:
+            region["snippet"] = {"text": issue.context}
+        location: dict[str, Any] = {"uri": issue.file_path}
+        if self._base_url:
+            location["uriBaseId"] = "SRCROOT"
+        self._item(
+            {
+                "ruleId": issue.check_name,
+                "level": "error" if issue.severity == "error" else "warning",
+                "message": {"text": issue.message},
+                "locations": [
+                    {
+                        "physicalLocation": {
+                            "artifactLocation": location,
+                            "region": region,
+                        }
+                    }
+                ],
+            }
+        )
+
+    def end_project(self) -> None:
+        # The rules are only known once every result has been written.
+        result = self._result
+        run: dict[str, Any] = {
+            "tool": {
+                "driver": {
+                    "name": "clang-tidy",
+                    "informationUri": CLANG_TIDY_URI,
+                    "rules": [{"id": rule} for rule in self._rules],
+                }
+            },
+            "automationDetails": {"id": f"{result.name}/"},
+            "invocations": [
+                {
+                    "executionSuccessful": not result.has_crash,
+                    "toolExecutionNotifications": [
+                        crash_notification(crashes)
+                        for crashes in group_crashes(result.crashes)
+                    ],
+                }
+            ],
+            "properties": {
+                "project": result.name,
+                "warningsCount": result.warnings_count,
+                "errorsCount": result.errors_count,
+                "rawWarningsCount": result.raw_warnings_count,
+                "rawErrorsCount": result.raw_errors_count,
+            },
+        }
+        if self._base_url:
+            run["originalUriBaseIds"] = {"SRCROOT": {"uri": f"{self._base_url}/"}}
+        self.f.write("], " + json.dumps(run, ensure_ascii=False)[1:])
+
+    def end(self) -> None:
+        self.f.write("]}\n")
+
+
+WRITERS: dict[str, type[StructuredWriter]] = {
+    "json": JsonReportWriter,
+    "sarif": SarifReportWriter,
+}
+
+
+def write_structured_reports(
+    outputs: dict[str, str],
+    projects: Iterable[ProjectGroups],
+    project_urls: dict[str, str],
+) -> None:
+    """
+    Writes every requested structured format in a single pass.
+
+    Args:
+        outputs: Output path of each format in WRITERS; paths ending in
+            .gz are gzip-compressed.
+        projects: Each project's result and its issues grouped by file.
+        project_urls: Mapping of project names to browse URLs.
+    """
+    if not outputs:
+        return
+
+    try:
+        with ExitStack() as stack:
+            writers = [
+                WRITERS[fmt](stack.enter_context(open_output(path)))
+                for fmt, path in outputs.items()
+            ]
+            for writer in writers:
+                writer.begin()
+            for result, groups in projects:
+                base_url = project_urls.get(result.name)
+                for writer in writers:
+                    writer.begin_project(result, base_url)
+                for _, issues in groups:
+                    for issue in issues:
+                        for writer in writers:
+                            writer.add_issue(issue)
+                for writer in writers:
+                    writer.end_project()
+            for writer in writers:
+                writer.end()
+    except OSError as e:
+        print(f"Error writing structured report: {e}", file=sys.stderr)
+        return
+
+    for fmt, path in outputs.items():
+        print(f"{fmt.upper()} report generated: {path}")
+
+
+def write_result_formats(
+    outputs: dict[str, str],
+    results: list[ProjectResult],
+    project_urls: dict[str, str],
+) -> None:
+    """Writes structured formats of results whose issues are in memory."""
+    write_structured_reports(
+        outputs, ((r, group_by_file(r.issues)) for r in results), project_urls
+    )
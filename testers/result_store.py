@@ -0,0 +1,339 @@
+"""SQLite store of parsed results across historical runs."""
+
+import hashlib
+import os
+import sqlite3
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from testers.generate_report import Issue, ProjectResult, fingerprint, group_by_file
+from testers.report_formats import ProjectGroups
+
+DEFAULT_STORE = "ctit-results.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    pr_link TEXT NOT NULL,
+    patch_sha256 TEXT NOT NULL,
+    llvm_revision TEXT NOT NULL,
+    check_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_pr_link ON runs (pr_link);
+CREATE INDEX IF NOT EXISTS runs_patch ON runs (patch_sha256);
+CREATE INDEX IF NOT EXISTS runs_revision ON runs (llvm_revision);
+
+CREATE TABLE IF NOT EXISTS projects (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    warnings_count INTEGER NOT NULL,
+    errors_count INTEGER NOT NULL,
+    has_crash INTEGER NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    project TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    severity TEXT NOT NULL,
+    check_name TEXT NOT NULL,
+    message TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_run ON issues (run_id);
+CREATE INDEX IF NOT EXISTS issues_check ON issues (check_name, run_id);
+CREATE INDEX IF NOT EXISTS issues_file ON issues (project, file_path);
+CREATE INDEX IF NOT EXISTS issues_fingerprint ON issues (fingerprint, run_id);
+"""
+
+
+@dataclass
+class RunMetadata:
+    """Identifies the request a set of results was produced for."""
+
+    pr_link: str = ""
+    patch_sha256: str = ""
+    llvm_revision: str = ""
+    check_name: str = ""
+
+    @classmethod
+    def from_env(cls) -> "RunMetadata":
+        """Reads the metadata the workflow exported to the environment."""
+        return cls(
+            pr_link=os.environ.get("PR_LINK", ""),
+            patch_sha256=os.environ.get("PATCH_SHA256", ""),
+            llvm_revision=os.environ.get("LLVM_REVISION", ""),
+            check_name=os.environ.get("CHECK_NAME", ""),
+        )
+
+
+def project_fingerprint(project: str, issue: Issue) -> str:
+    """
+    Returns the identity of an issue across runs.
+
+    The project is part of it, so the same finding in two projects, such
+    as two configurations of a matrix run, is tracked separately.
+    """
+    key = f"{project}\0{fingerprint(issue)}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+class ResultStore:
+    """
+    Parsed issues of every ingested run, indexed for lookups.
+
+    A run is identified by its metadata; ingesting the same run again
+    replaces its previous rows, so re-running the report is idempotent.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def add_run(self, metadata: RunMetadata, results: list[ProjectResult]) -> int:
+        """Ingests the results of one run and returns its id."""
+        return self.add_project_groups(
+            metadata, ((r, group_by_file(r.issues)) for r in results)
+        )
+
+    def add_project_groups(
+        self, metadata: RunMetadata, projects: Iterable[ProjectGroups]
+    ) -> int:
+        """
+        Ingests one run whose issues come grouped by file, so a streamed
+        report can store them one group at a time, and returns its id.
+        """
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM runs WHERE pr_link = ? AND patch_sha256 = ? "
+                "AND llvm_revision = ? AND check_name = ?",
+                (
+                    metadata.pr_link,
+                    metadata.patch_sha256,
+                    metadata.llvm_revision,
+                    metadata.check_name,
+                ),
+            )
+            cursor = self.conn.execute(
+                "INSERT INTO runs (created_at, pr_link, patch_sha256, llvm_revision, "
+                "check_name) VALUES (?, ?, ?, ?, ?)",
+                (
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    metadata.pr_link,
+                    metadata.patch_sha256,
+                    metadata.llvm_revision,
+                    metadata.check_name,
+                ),
+            )
+            run_id = cursor.lastrowid
+            assert run_id is not None
+            for r, groups in projects:
+                self.conn.execute(
+                    "INSERT INTO projects VALUES (?, ?, ?, ?, ?)",
+                    (run_id, r.name, r.warnings_count, r.errors_count, r.has_crash),
+                )
+                self.conn.executemany(
+                    "INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            run_id,
+                            r.name,
+                            i.file_path,
+                            i.line,
+                            i.col,
+                            i.severity,
+                            i.check_name,
+                            i.message,
+                            project_fingerprint(r.name, i),
+                        )
+                        for _, issues in groups
+                        for i in issues
+                    ),
+                )
+        return run_id
+
+    def issue_count(self, run_id: int) -> int:
+        return int(
+            self.conn.execute(
+                "SELECT COUNT(*) FROM issues WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+        )
+
+    def runs(self, pr_link: str | None = None) -> list[sqlite3.Row]:
+        """Returns ingested runs, newest first."""
+        sql = "SELECT * FROM runs"
+        params: list[Any] = []
+        if pr_link is not None:
+            sql += " WHERE pr_link = ?"
+            params.append(pr_link)
+        return self.conn.execute(sql + " ORDER BY id DESC", params).fetchall()
+
+    def issues(
+        self,
+        check_name: str | None = None,
+        project: str | None = None,
+        file_path: str | None = None,
+        pr_link: str | None = None,
+        run_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[sqlite3.Row]:
+        """
+        Returns matching issues with the run they were first seen in.
+
+        ``first_run`` is the oldest run containing an issue with the same
+        project fingerprint, so ``first_run < run_id`` means the project had
+        it before.
+        """
+        where, params = _filters(
+            [
+                ("i.check_name = ?", check_name),
+                ("i.project = ?", project),
+                ("i.file_path = ?", file_path),
+                ("r.pr_link = ?", pr_link),
+                ("i.run_id = ?", run_id),
+            ]
+        )
+        sql = (
+            "SELECT i.*, r.pr_link, "
+            "(SELECT MIN(f.run_id) FROM issues f "
+            "WHERE f.fingerprint = i.fingerprint) AS first_run "
+            f"FROM issues i JOIN runs r ON r.id = i.run_id{where} "
+            "ORDER BY i.run_id DESC, i.project, i.file_path, i.line"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def trend(
+        self, check_name: str | None = None, project: str | None = None
+    ) -> list[sqlite3.Row]:
+        """Returns per-run issue counts, oldest run first."""
+        where, params = _filters(
+            [("i.check_name = ?", check_name), ("i.project = ?", project)]
+        )
+        # Filter in the join condition so runs without matches count as 0.
+        on = where.replace(" WHERE ", " AND ", 1)
+        return self.conn.execute(
+            "SELECT r.id, r.created_at, r.pr_link, r.llvm_revision, "
+            "COUNT(i.run_id) AS issues, "
+            "COALESCE(SUM(i.severity = 'warning'), 0) AS warnings, "
+            "COALESCE(SUM(i.severity = 'error'), 0) AS errors "
+            f"FROM runs r LEFT JOIN issues i ON i.run_id = r.id{on} "
+            "GROUP BY r.id ORDER BY r.id",
+            params,
+        ).fetchall()
+
+
+def _filters(conditions: list[tuple[str, Any]]) -> tuple[str, list[Any]]:
+    clauses = [sql for sql, value in conditions if value is not None]
+    params = [value for _, value in conditions if value is not None]
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def store_results(path: str, results: list[ProjectResult]) -> int:
+    """Ingests report results into the store at ``path``."""
+    return store_project_groups(path, ((r, group_by_file(r.issues)) for r in results))
+
+
+def store_project_groups(path: str, projects: Iterable[ProjectGroups]) -> int:
+    """Ingests projects whose issues come grouped by file into ``path``."""
+    metadata = RunMetadata.from_env()
+    with ResultStore(path) as store:
+        run_id = store.add_project_groups(metadata, projects)
+        issues = store.issue_count(run_id)
+    print(f"Stored run {run_id} ({issues} issues) in {path}")
+    return run_id
+
+
+def _print_table(headers: list[str], rows: list[list[Any]]) -> None:
+    print("| " + " | ".join(headers) + " |")
+    print("| " + " | ".join(":---" for _ in headers) + " |")
+    for row in rows:
+        print("| " + " | ".join(str(v) for v in row) + " |")
+
+
+def query(
+    path: str,
+    what: str,
+    check_name: str | None = None,
+    project: str | None = None,
+    file_path: str | None = None,
+    pr_link: str | None = None,
+    run_id: int | None = None,
+    limit: int | None = None,
+) -> None:
+    """Prints ``runs``, ``issues`` or ``trend`` from the store as a table."""
+    if not os.path.exists(path):
+        print(f"Result store '{path}' not found.", file=sys.stderr)
+        sys.exit(1)
+
+    with ResultStore(path) as store:
+        if what == "runs":
+            _print_table(
+                ["Run", "Created", "PR", "Check", "LLVM revision", "Patch"],
+                [
+                    [
+                        r["id"],
+                        r["created_at"],
+                        r["pr_link"],
+                        r["check_name"],
+                        r["llvm_revision"],
+                        r["patch_sha256"][:12],
+                    ]
+                    for r in store.runs(pr_link)
+                ],
+            )
+        elif what == "issues":
+            _print_table(
+                ["Run", "Project", "Location", "Check", "Message", "First seen"],
+                [
+                    [
+                        i["run_id"],
+                        i["project"],
+                        f"{i['file_path']}:{i['line']}:{i['col']}",
+                        i["check_name"],
+                        i["message"],
+                        "new" if i["first_run"] == i["run_id"] else i["first_run"],
+                    ]
+                    for i in store.issues(
+                        check_name, project, file_path, pr_link, run_id, limit
+                    )
+                ],
+            )
+        elif what == "trend":
+            _print_table(
+                ["Run", "Created", "PR", "Issues", "Warnings", "Errors"],
+                [
+                    [
+                        t["id"],
+                        t["created_at"],
+                        t["pr_link"],
+                        t["issues"],
+                        t["warnings"],
+                        t["errors"],
+                    ]
+                    for t in store.trend(check_name, project)
+                ],
+            )
+        else:
+            raise ValueError(f"unknown query: {what}")
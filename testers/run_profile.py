@@ -0,0 +1,104 @@
+"""Per-translation-unit timing and clang-tidy check profiles of a run."""
+
+import glob
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+
+RUN_PROFILE_FILE = "run.json"
+_CHECK_TIME_PREFIX = "time.clang-tidy."
+_CHECK_TIME_SUFFIX = ".wall"
+
+
+@dataclass
+class UnitProfile:
+    """
+    Resources one clang-tidy invocation used.
+
+    ``cached`` units were reused from the unit cache; their measurements
+    are those of the run that filled the cache entry.
+    """
+
+    file: str
+    returncode: int = 0
+    wall_seconds: float = 0.0
+    max_rss_kib: int = 0
+    check_seconds: dict[str, float] = field(default_factory=dict)
+    cached: bool = False
+
+
+@dataclass
+class RunProfile:
+    """Profiles of every translation unit a project run analyzed."""
+
+    project: str
+    units: list[UnitProfile] = field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(unit.wall_seconds for unit in self.units)
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for unit in self.units if unit.cached)
+
+    def slowest(self, n: int) -> list[UnitProfile]:
+        """Returns the ``n`` units with the longest wall time."""
+        return sorted(self.units, key=lambda u: u.wall_seconds, reverse=True)[:n]
+
+    def check_totals(self) -> dict[str, float]:
+        """Returns the matcher time of each check, slowest first."""
+        totals: dict[str, float] = {}
+        for unit in self.units:
+            for check, seconds in unit.check_seconds.items():
+                totals[check] = totals.get(check, 0.0) + seconds
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def read_check_profile(profile_dir: str) -> dict[str, float]:
+    """
+    Reads the per-check wall time clang-tidy stored in ``profile_dir``.
+
+    These are the JSON files written by ``-store-check-profile``, whose
+    ``profile`` object has a ``time.clang-tidy.<check>.wall`` entry per
+    check.
+    """
+    times: dict[str, float] = {}
+    for path in sorted(glob.glob(os.path.join(profile_dir, "*.json"))):
+        try:
+            with open(path) as f:
+                entries = json.load(f).get("profile", {})
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Ignoring unreadable check profile {path}: {e}", file=sys.stderr)
+            continue
+        for key, seconds in entries.items():
+            if key.startswith(_CHECK_TIME_PREFIX) and key.endswith(_CHECK_TIME_SUFFIX):
+                check = key[len(_CHECK_TIME_PREFIX) : -len(_CHECK_TIME_SUFFIX)]
+                times[check] = times.get(check, 0.0) + seconds
+    return times
+
+
+def run_profile_path(log_dir: str, project: str) -> str:
+    """Returns where a project's run profile is written next to its shards."""
+    return os.path.join(log_dir, project, RUN_PROFILE_FILE)
+
+
+def write_run_profile(path: str, profile: RunProfile) -> None:
+    """Writes a run profile as JSON."""
+    with open(path, "w") as f:
+        json.dump(asdict(profile), f, indent=1)
+
+
+def load_run_profile(log_dir: str, project: str) -> RunProfile | None:
+    """Loads the run profile written next to a project's shards, if any."""
+    try:
+        with open(run_profile_path(log_dir, project)) as f:
+            data = json.load(f)
+        units = [UnitProfile(**unit) for unit in data.get("units", [])]
+        return RunProfile(project=data.get("project", project), units=units)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        print(f"Ignoring unreadable run profile for {project}: {e}", file=sys.stderr)
+        return None
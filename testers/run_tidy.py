@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+"""Run clang-tidy over a project's compile database, one log shard per TU."""
+
+import contextlib
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from parse_issue import ParseResult
+from testers.baseline import BaselineCache, baseline_key, write_baseline
+from testers.generate_report import (
+    MATRIX_SEPARATOR,
+    ProjectResult,
+    baseline_path,
+    matrix_project_name,
+    merge_results,
+    parse_log_file,
+)
+from testers.run_profile import (
+    RunProfile,
+    UnitProfile,
+    read_check_profile,
+    run_profile_path,
+    write_run_profile,
+)
+from testers.sources import file_digest, project_commit
+from testers.tu_filter import (
+    FilterStats,
+    SourceIndex,
+    command_arguments,
+    include_dirs,
+    sample_skipped,
+    select_units,
+    tokens_for_checks,
+)
+from testers.unit_cache import (
+    DEFAULT_UNIT_CACHE_MAX_BYTES,
+    UnitCache,
+    tidy_config_files,
+    unit_dependencies,
+)
+
+DEFAULT_CLANG_TIDY = "llvm-project/build/bin/clang-tidy"
+COMPILE_COMMANDS = "compile_commands.json"
+
+
+@dataclass
+class TranslationUnit:
+    """A source file from the compile database."""
+
+    file: str
+    directory: str
+    arguments: list[str] = field(default_factory=list)
+
+
+def load_compile_commands(
+    build_dir: str, file_regex: str | None = None
+) -> list[TranslationUnit]:
+    """
+    Reads the translation units of ``build_dir``/compile_commands.json.
+
+    Args:
+        build_dir: Build directory containing the compile database.
+        file_regex: Only keep files whose absolute path matches this regex.
+
+    Returns:
+        Unique translation units in compile database order.
+    """
+    with open(os.path.join(build_dir, COMPILE_COMMANDS)) as f:
+        entries = json.load(f)
+
+    pattern = re.compile(file_regex) if file_regex else None
+    seen: set[str] = set()
+    units: list[TranslationUnit] = []
+    for entry in entries:
+        directory = entry.get("directory", build_dir)
+        file = os.path.normpath(os.path.join(directory, entry["file"]))
+        if file in seen or (pattern is not None and not pattern.search(file)):
+            continue
+        seen.add(file)
+        units.append(
+            TranslationUnit(
+                file=file, directory=directory, arguments=command_arguments(entry)
+            )
+        )
+    return units
+
+
+@dataclass
+class ConfigRun:
+    """One tidy configuration of a run and the shard directory it writes."""
+
+    request: ParseResult
+    shard_dir: str
+    cache: UnitCache | None = None
+    cache_keys: dict[int, str] = field(default_factory=dict)
+
+
+def shard_name(index: int, unit: TranslationUnit) -> str:
+    """Returns the log shard file name of the ``index``-th unit."""
+    return f"{index:05d}-{os.path.basename(unit.file)}.log"
+
+
+def build_tidy_command(
+    clang_tidy: str,
+    build_dir: str,
+    request: ParseResult,
+    file: str,
+    profile_dir: str | None = None,
+) -> list[str]:
+    """
+    Builds the clang-tidy invocation for a single translation unit.
+
+    With ``profile_dir``, per-check timings are stored there as JSON
+    instead of being printed to the log.
+    """
+    checks = ",".join(["-*", *request.check_names])
+    cmd = [clang_tidy, "-p", build_dir, f"-checks={checks}", "-quiet"]
+    if request.tidy_config:
+        cmd.append(f"-config={request.tidy_config}")
+    if profile_dir is not None:
+        cmd += ["-enable-check-profile", f"-store-check-profile={profile_dir}"]
+    cmd.append(file)
+    return cmd
+
+
+def run_unit(
+    cmd: list[str], shard_path: str, profile_dir: str | None = None
+) -> UnitProfile:
+    """
+    Runs one clang-tidy command, writing its output to ``shard_path``.
+
+    Returns:
+        The exit code, wall time and peak RSS of the command, and the
+        per-check timings stored in ``profile_dir``, if given.
+    """
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+    start = time.monotonic()
+    with open(shard_path, "w") as f:
+        f.write(" ".join(cmd) + "\n")
+        f.flush()
+        proc = subprocess.Popen(cmd, stdout=f, stderr=subprocess.STDOUT)
+        # wait4 reports the resource usage of this child alone.
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    return UnitProfile(
+        file=cmd[-1],
+        returncode=proc.returncode,
+        wall_seconds=time.monotonic() - start,
+        # ru_maxrss is reported in KiB on Linux.
+        max_rss_kib=usage.ru_maxrss,
+        check_seconds=read_check_profile(profile_dir) if profile_dir else {},
+    )
+
+
+def run_config_units(
+    clang_tidy: str,
+    build_dir: str,
+    configs: list[ConfigRun],
+    units: list[TranslationUnit],
+    scheduled: list[int],
+    jobs: int,
+    profile: bool = False,
+) -> list[tuple[dict[int, str], int, list[UnitProfile]]]:
+    """
+    Runs clang-tidy on the ``scheduled`` units once per configuration, with
+    every (unit, configuration) pair sharing one worker pool.
+
+    Pairs are queued unit by unit, so the runs of a unit are close together
+    and find its sources and headers still in the page cache. Units with a
+    key in a configuration's ``cache_keys`` are looked up in its cache
+    first, and stored in it after running.
+
+    Returns:
+        For each configuration, the shard path of each scheduled unit, the
+        number of non-zero exits and the profile of each scheduled unit.
+    """
+    pairs = [(c, i) for i in scheduled for c in range(len(configs))]
+    shard_paths = [
+        {i: os.path.join(config.shard_dir, shard_name(i, units[i])) for i in scheduled}
+        for config in configs
+    ]
+
+    def run_pair(pair: tuple[int, int], profile_dir: str | None) -> UnitProfile:
+        c, i = pair
+        config = configs[c]
+        cmd = build_tidy_command(
+            clang_tidy, build_dir, config.request, units[i].file, profile_dir
+        )
+        shard_path = shard_paths[c][i]
+        key = config.cache_keys.get(i)
+        if config.cache is None or key is None:
+            return run_unit(cmd, shard_path, profile_dir)
+        cached = config.cache.fetch(key, shard_path, cmd)
+        if cached is not None:
+            return cached
+        unit = run_unit(cmd, shard_path, profile_dir)
+        config.cache.store(key, shard_path, unit)
+        return unit
+
+    profiling = (
+        tempfile.TemporaryDirectory(prefix="ctit-profile-")
+        if profile
+        else contextlib.nullcontext(None)
+    )
+    with profiling as profile_root:
+        profile_dirs = [
+            os.path.join(profile_root, f"{c}-{i}") if profile_root else None
+            for c, i in pairs
+        ]
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            finished = list(pool.map(run_pair, pairs, profile_dirs))
+
+    profiles: list[list[UnitProfile]] = [[] for _ in configs]
+    for (c, _), unit in zip(pairs, finished):
+        profiles[c].append(unit)
+    return [
+        (paths, sum(1 for unit in runs if unit.returncode != 0), runs)
+        for paths, runs in zip(shard_paths, profiles)
+    ]
+
+
+def run_units(
+    clang_tidy: str,
+    build_dir: str,
+    request: ParseResult,
+    units: list[TranslationUnit],
+    scheduled: list[int],
+    shard_dir: str,
+    jobs: int,
+    profile: bool = False,
+    cache: UnitCache | None = None,
+    cache_keys: dict[int, str] | None = None,
+) -> tuple[dict[int, str], int, list[UnitProfile]]:
+    """
+    Runs clang-tidy on the ``scheduled`` units, one shard each in ``shard_dir``.
+
+    Units with a key in ``cache_keys`` are looked up in ``cache`` first,
+    and stored in it after running.
+
+    Returns:
+        Shard path of each scheduled unit, the number of non-zero exits and
+        the profile of each scheduled unit.
+    """
+    config = ConfigRun(request, shard_dir, cache, cache_keys or {})
+    return run_config_units(
+        clang_tidy, build_dir, [config], units, scheduled, jobs, profile
+    )[0]
+
+
+def run_baseline(
+    project: str,
+    build_dir: str,
+    request: ParseResult,
+    units: list[TranslationUnit],
+    scheduled: list[int],
+    clang_tidy: str,
+    jobs: int,
+    source_root: str,
+    llvm_revision: str | None = None,
+    cache_dir: str | None = None,
+) -> ProjectResult:
+    """
+    Returns the unpatched clang-tidy result over the same scheduled units.
+
+    With ``cache_dir`` and a known LLVM revision and project commit, the
+    result is cached per (LLVM revision, project commit, check, config,
+    analyzed files), so only the patched side runs on later requests.
+    """
+    key = None
+    cache = BaselineCache(cache_dir) if cache_dir else None
+    commit = project_commit(source_root)
+    if cache is not None and llvm_revision and commit:
+        scope = [os.path.relpath(units[i].file, source_root) for i in scheduled]
+        key = baseline_key(
+            llvm_revision, commit, request.check_name, request.tidy_config, scope
+        )
+        cached = cache.load(key, project)
+        if cached is not None:
+            print(f"[{project}] Reusing cached baseline {key[:12]}")
+            return cached
+    elif cache is not None:
+        print(
+            f"[{project}] Baseline not cached: LLVM revision or project commit "
+            "unknown",
+            file=sys.stderr,
+        )
+
+    print(f"[{project}] Running baseline clang-tidy on {len(scheduled)} files")
+    with tempfile.TemporaryDirectory() as shard_dir:
+        shard_paths, failed, _ = run_units(
+            clang_tidy, build_dir, request, units, scheduled, shard_dir, jobs
+        )
+        result = merge_results(
+            project, [parse_log_file(shard_paths[i], project) for i in scheduled]
+        )
+    print(f"[{project}] Baseline finished: {failed} non-zero exits")
+
+    if cache is not None and key is not None:
+        cache.store(key, result)
+    return result
+
+
+def unit_inputs(
+    units: list[TranslationUnit],
+    scheduled: list[int],
+    source_root: str,
+    config_files: bool = True,
+    jobs: int | None = None,
+) -> dict[int, dict[str, str]]:
+    """
+    Returns the content hash of each input file of the scheduled units, by
+    path, as listed by their compiler, leaving out units whose inputs
+    cannot be listed or read. With ``config_files``, the .clang-tidy files
+    of each unit are inputs too.
+    """
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        dependencies = list(
+            pool.map(
+                lambda i: unit_dependencies(units[i].directory, units[i].arguments),
+                scheduled,
+            )
+        )
+
+    # Units of a project share most headers, so hash each file once.
+    digests: dict[str, str | None] = {}
+
+    def digest(path: str) -> str | None:
+        if path not in digests:
+            try:
+                digests[path] = file_digest(path)
+            except OSError:
+                digests[path] = None
+        return digests[path]
+
+    inputs: dict[int, dict[str, str]] = {}
+    for i, paths in zip(scheduled, dependencies):
+        if paths is None:
+            continue
+        files: dict[str, str] = {}
+        for path in paths:
+            found = digest(path)
+            if found is None:
+                break
+            files[path] = found
+        else:
+            if config_files:
+                files.update(tidy_config_files(units[i].file, source_root))
+            inputs[i] = files
+    return inputs
+
+
+def prefilter_units(
+    project: str,
+    units: list[TranslationUnit],
+    tokens: list[str],
+    source_dir: str | None = None,
+    index_dir: str | None = None,
+    verify_sample: int = 0,
+) -> tuple[list[int], list[int], FilterStats]:
+    """
+    Selects the translation units that can reach one of ``tokens``.
+
+    Returns:
+        Indices of units to run, the subset of those run only to verify the
+        filter, and the filter statistics.
+    """
+    root = source_dir or os.path.commonpath([u.file for u in units])
+    index = SourceIndex.load(root, index_dir, project)
+    kept, skipped = select_units(
+        [(u.file, include_dirs(u.arguments, u.directory)) for u in units],
+        index,
+        set(tokens),
+    )
+    index.save()
+
+    sampled = sample_skipped(skipped, verify_sample)
+    stats = FilterStats(total=len(units), skipped=len(skipped), sampled=len(sampled))
+    return sorted(kept + sampled), sampled, stats
+
+
+def run_project(
+    project: str,
+    build_dir: str,
+    request: ParseResult,
+    clang_tidy: str = DEFAULT_CLANG_TIDY,
+    log_dir: str = "logs",
+    jobs: int | None = None,
+    file_regex: str | None = None,
+    filter_tokens: list[str] | None = None,
+    full: bool = False,
+    verify_sample: int = 0,
+    source_dir: str | None = None,
+    index_dir: str | None = None,
+    baseline_clang_tidy: str | None = None,
+    baseline_cache_dir: str | None = None,
+    llvm_revision: str | None = None,
+    profile: bool = False,
+    unit_cache_dir: str | None = None,
+    unit_cache_max_bytes: int = DEFAULT_UNIT_CACHE_MAX_BYTES,
+) -> list[str]:
+    """
+    Runs clang-tidy on every translation unit of a project in parallel.
+
+    Each unit's output goes to its own shard in ``<log_dir>/<project>/``,
+    which the report step merges back into a single project result. With
+    a config matrix in ``request``, every unit runs once per configuration,
+    each writing to ``<log_dir>/<project>@<index>-<label>/``.
+
+    Args:
+        project: Project name, used as the shard directory name.
+        build_dir: Build directory containing compile_commands.json.
+        request: Parsed issue providing the check name and tidy config, or
+            the config matrix.
+        clang_tidy: Path to the clang-tidy binary.
+        log_dir: Directory the shard directory is created in.
+        jobs: Number of concurrent clang-tidy processes; defaults to the
+            number of cores.
+        file_regex: Only analyze files whose path matches this regex.
+        filter_tokens: Identifiers a TU must reach to be analyzed; defaults
+            to the known tokens of the requested checks and the names their
+            configured options add.
+        full: Analyze every TU, bypassing the token pre-filter.
+        verify_sample: Number of filtered-out TUs to analyze anyway, to
+            check that the filter did not skip any diagnostics.
+        source_dir: Root of the project sources for the pre-filter index.
+        index_dir: Directory to persist the pre-filter index in.
+        baseline_clang_tidy: Unpatched clang-tidy binary; when given, its
+            result over the same files is written to
+            ``<log_dir>/<project>.baseline.json`` for ``report --baseline``.
+        baseline_cache_dir: Directory caching baseline results.
+        llvm_revision: LLVM revision of the baseline binary, part of the
+            baseline cache key.
+        profile: Also record per-check timings with clang-tidy's check
+            profiler. Wall time and peak RSS of each unit are always written
+            to ``<log_dir>/<project>/run.json``.
+        unit_cache_dir: Directory caching the output of each translation
+            unit, so unchanged units are not analyzed again.
+        unit_cache_max_bytes: Size the unit cache is trimmed to after the
+            run, evicting the least recently used entries.
+
+    Returns:
+        Paths of the written log shards.
+    """
+    for binary in filter(None, (clang_tidy, baseline_clang_tidy)):
+        if not os.path.isfile(binary):
+            print(f"Error: clang-tidy binary not found at {binary}", file=sys.stderr)
+            sys.exit(1)
+
+    clang_tidy = os.path.abspath(clang_tidy)
+    build_dir = os.path.abspath(build_dir)
+    units = load_compile_commands(build_dir, file_regex)
+
+    if request.config_matrix and baseline_clang_tidy is not None:
+        print(
+            "Error: a baseline cannot be compared against an option matrix",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    names = [project]
+    requests = [request]
+    if request.config_matrix:
+        names = [
+            matrix_project_name(project, k, label)
+            for k, label in enumerate(request.config_matrix)
+        ]
+        requests = [
+            ParseResult(request.pr_link, request.check_name, config)
+            for config in request.config_matrix.values()
+        ]
+
+    # Shards of an earlier run with other configurations would be reported.
+    earlier = [os.path.join(log_dir, project)] + glob.glob(
+        os.path.join(glob.escape(log_dir), f"{glob.escape(project)}{MATRIX_SEPARATOR}*")
+    )
+    for stale_dir in earlier:
+        if os.path.basename(stale_dir) not in names:
+            shutil.rmtree(stale_dir, ignore_errors=True)
+    for name in names:
+        os.makedirs(os.path.join(log_dir, name), exist_ok=True)
+        for stale in glob.glob(os.path.join(log_dir, name, "*.log")):
+            os.remove(stale)
+    if os.path.exists(baseline_path(log_dir, project)):
+        os.remove(baseline_path(log_dir, project))
+
+    scheduled = list(range(len(units)))
+    sampled: list[int] = []
+    stats = None
+    if not full and units:
+        if filter_tokens is None:
+            filter_tokens = tokens_for_checks(
+                request.check_name,
+                [request.tidy_config, *request.config_matrix.values()],
+            )
+        if filter_tokens:
+            scheduled, sampled, stats = prefilter_units(
+                project, units, filter_tokens, source_dir, index_dir, verify_sample
+            )
+        else:
+            print(f"[{project}] No pre-filter tokens for the check, analyzing all")
+
+    configs = [
+        ConfigRun(config, os.path.join(log_dir, name))
+        for name, config in zip(names, requests)
+    ]
+    cache = None
+    if unit_cache_dir is not None and units:
+        cache = UnitCache(
+            unit_cache_dir, clang_tidy, request, profile, unit_cache_max_bytes
+        )
+        # Configurations share the inputs of a unit; only their keys differ.
+        inputs = unit_inputs(
+            units,
+            scheduled,
+            source_dir or os.path.commonpath([u.file for u in units]),
+            not all(config.tidy_config for config in requests),
+            jobs,
+        )
+        if len(inputs) < len(scheduled):
+            print(
+                f"[{project}] Unit cache: cannot list the inputs of "
+                f"{len(scheduled) - len(inputs)} files, running them uncached"
+            )
+        for config in configs:
+            config.cache = cache.for_request(config.request)
+            config.cache_keys = {
+                i: config.cache.key(units[i].directory, units[i].arguments, files)
+                for i, files in inputs.items()
+            }
+
+    workers = jobs or os.cpu_count() or 1
+    matrix = f" x {len(configs)} configs" if request.config_matrix else ""
+    print(
+        f"[{project}] Running clang-tidy on {len(scheduled)} files{matrix}, "
+        f"{workers} jobs"
+    )
+    runs = run_config_units(
+        clang_tidy, build_dir, configs, units, scheduled, workers, profile
+    )
+    for name, (_, failed, profiles) in zip(names, runs):
+        print(f"[{name}] Finished: {len(scheduled)} files, {failed} non-zero exits")
+        write_run_profile(run_profile_path(log_dir, name), RunProfile(name, profiles))
+    if cache is not None:
+        hits = sum(1 for _, _, profiles in runs for unit in profiles if unit.cached)
+        total = len(scheduled) * len(configs)
+        print(
+            f"[{project}] Unit cache: {hits} reused, {total - hits} run, "
+            f"{cache.evict()} evicted"
+        )
+
+    if stats is not None:
+        for i in sampled:
+            results = [parse_log_file(paths[i], project) for paths, _, _ in runs]
+            if any(r.warnings_count or r.errors_count or r.has_crash for r in results):
+                stats.sampled_with_diagnostics += 1
+        report_filter_stats(project, stats)
+
+    if baseline_clang_tidy is not None and units:
+        baseline = run_baseline(
+            project,
+            build_dir,
+            request,
+            units,
+            scheduled,
+            os.path.abspath(baseline_clang_tidy),
+            workers,
+            source_dir or os.path.commonpath([u.file for u in units]),
+            llvm_revision,
+            baseline_cache_dir,
+        )
+        write_baseline(baseline_path(log_dir, project), baseline)
+
+    return [paths[i] for paths, _, _ in runs for i in scheduled]
+
+
+def report_filter_stats(project: str, stats: FilterStats) -> None:
+    print(
+        f"[{project}] Pre-filter skipped {stats.skipped} of {stats.total} files "
+        f"({stats.scheduled} analyzed)"
+    )
+    if stats.sampled:
+        print(
+            f"[{project}] Verification: {stats.sampled_with_diagnostics} of "
+            f"{stats.sampled} sampled skipped files produced diagnostics"
+        )
+    if stats.sampled_with_diagnostics:
+        print(
+            f"Warning: the pre-filter for {project} skipped files with "
+            "diagnostics; rerun with --full",
+            file=sys.stderr,
+        )
@@ -0,0 +1,25 @@
+"""Identify file contents and project checkouts for the caches."""
+
+import hashlib
+import subprocess
+
+_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def project_commit(source_dir: str) -> str | None:
+    """Returns the checked-out commit of a project, or None if unknown."""
+    result = subprocess.run(
+        ["git", "-C", source_dir, "rev-parse", "HEAD"], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
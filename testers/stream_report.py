@@ -0,0 +1,376 @@
+"""Two-pass report generation that never holds every issue in memory."""
+
+import json
+import os
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, TextIO
+
+from testers.generate_report import (
+    DEFAULT_DETAILS_FILE,
+    DEFAULT_TOP_N,
+    Issue,
+    IssueKey,
+    IssueStats,
+    ProjectResult,
+    ReportBudget,
+    Section,
+    find_log_files,
+    issue_key,
+    iter_log_issues,
+    load_run_profiles,
+    matrix_project,
+    project_browse_urls,
+    split_common,
+    write_markdown_files,
+    write_matrix_section,
+    write_project_details,
+    write_project_performance,
+    write_sections,
+    write_summary_table,
+)
+from testers.report_formats import write_structured_reports
+from testers.result_store import store_project_groups
+from testers.run_profile import RunProfile
+
+
+class IssueSpill:
+    """
+    Issues of one log as JSON lines on disk, indexed by source file.
+
+    Only the byte offset of each issue is kept in memory, so the issues of
+    a file can be read back without loading the rest of the log's issues.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.offsets: dict[str, array[int]] = {}
+        self.size = 0
+
+    def write(self, issues: Iterable[Issue]) -> None:
+        with open(self.path, "wb") as f:
+            for issue in issues:
+                self.append(f, issue)
+
+    def append(self, f: BinaryIO, issue: Issue) -> None:
+        """Adds ``issue`` to the spill, open for writing as ``f``."""
+        record = [
+            issue.line,
+            issue.col,
+            issue.severity,
+            issue.message,
+            issue.check_name,
+            issue.context,
+        ]
+        data = json.dumps(record).encode() + b"\n"
+        f.write(data)
+        self.offsets.setdefault(issue.file_path, array("Q")).append(self.size)
+        self.size += len(data)
+
+    def file_groups(self) -> Iterator[tuple[str, list[Issue]]]:
+        """Yields the issues of each file, in the order files were added."""
+        for file_path in self.offsets:
+            yield file_path, self.read_group(file_path)
+
+    def read_group(self, file_path: str) -> list[Issue]:
+        """Reads the issues of ``file_path`` in log order."""
+        issues: list[Issue] = []
+        offsets = self.offsets.get(file_path)
+        if not offsets:
+            return issues
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                line, col, severity, message, check_name, context = json.loads(
+                    f.readline()
+                )
+                issues.append(
+                    Issue(file_path, line, col, severity, message, check_name, context)
+                )
+        return issues
+
+
+def spill_log_file(
+    log_path: str, project_name: str, spill_path: str
+) -> tuple[ProjectResult, IssueSpill]:
+    """
+    Parses a log straight into a spill file.
+
+    Repeated diagnostics are spilled too and only the raw counters are set,
+    since deduplication happens per file group when the spill is read.
+    """
+    result = ProjectResult(name=project_name)
+    spill = IssueSpill(spill_path)
+    try:
+        with open(log_path, errors="replace") as f:
+            spill.write(iter_log_issues(f, result, dedup=False))
+    except OSError as e:
+        print(f"Error reading {log_path}: {e}", file=sys.stderr)
+    return result, spill
+
+
+@dataclass
+class SpilledProject:
+    """Counts of a project whose issues stay in spill files until written."""
+
+    result: ProjectResult
+    spills: list[IssueSpill] = field(default_factory=list)
+    stats: IssueStats = field(default_factory=IssueStats)
+
+    def file_groups(self) -> Iterator[tuple[str, list[Issue]]]:
+        """
+        Yields deduplicated issues one file at a time.
+
+        Files and issues come in shard and log order, as in a report built
+        from merged results. Issue keys include the file, so repeats across
+        shards always fall into the same group.
+        """
+        files = dict.fromkeys(path for spill in self.spills for path in spill.offsets)
+        for file_path in files:
+            yield file_path, self.read_file(file_path)
+
+    def read_file(self, file_path: str) -> list[Issue]:
+        """Reads the deduplicated issues of ``file_path`` from every shard."""
+        seen: set[IssueKey] = set()
+        group: list[Issue] = []
+        for spill in self.spills:
+            for issue in spill.read_group(file_path):
+                if issue_key(issue) not in seen:
+                    seen.add(issue_key(issue))
+                    group.append(issue)
+        return group
+
+    def count(self) -> None:
+        """Computes the unique counts and stats from the spilled issues."""
+        for _, group in self.file_groups():
+            for issue in group:
+                self.stats.add(issue)
+                if issue.severity == "warning":
+                    self.result.warnings_count += 1
+                elif issue.severity == "error":
+                    self.result.errors_count += 1
+
+
+def spill_log_files(
+    log_files: list[str],
+    project_names: list[str],
+    spill_dir: str,
+    jobs: int = 1,
+) -> list[SpilledProject]:
+    """
+    First pass: spills every log and counts each project's issues.
+
+    Returns:
+        The spilled projects sorted by name.
+    """
+    spill_paths = [
+        os.path.join(spill_dir, f"{i:05d}.jsonl") for i in range(len(log_files))
+    ]
+    if jobs > 1 and len(log_files) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(log_files))) as pool:
+            spilled = list(
+                pool.map(spill_log_file, log_files, project_names, spill_paths)
+            )
+    else:
+        spilled = list(map(spill_log_file, log_files, project_names, spill_paths))
+
+    projects: dict[str, SpilledProject] = {}
+    for name, (part, spill) in zip(project_names, spilled):
+        project = projects.setdefault(name, SpilledProject(ProjectResult(name=name)))
+        project.result.has_crash |= part.has_crash
+        project.result.raw_warnings_count += part.raw_warnings_count
+        project.result.raw_errors_count += part.raw_errors_count
+        project.result.crashes += part.crashes
+        project.spills.append(spill)
+
+    for project in projects.values():
+        project.count()
+    return sorted(projects.values(), key=lambda p: p.result.name)
+
+
+@dataclass
+class SpilledMatrix:
+    """
+    Configurations of an option-matrix run, compared one file at a time.
+
+    Fingerprints include the file, so splitting each file's findings
+    gives the same common and config-specific findings as splitting all
+    of them at once. ``split`` spills the result, so writing it reads each
+    finding once more.
+    """
+
+    name: str
+    configs: list[SpilledProject]
+    common_spill: IssueSpill
+    only_spills: list[IssueSpill]
+    common: IssueStats = field(default_factory=IssueStats)
+    only: list[IssueStats] = field(default_factory=list)
+
+    def split(self) -> None:
+        """Splits and counts the findings of every file in a single pass."""
+        files = dict.fromkeys(
+            path
+            for config in self.configs
+            for spill in config.spills
+            for path in spill.offsets
+        )
+        self.only = [IssueStats() for _ in self.configs]
+        with ExitStack() as stack:
+            common_file = stack.enter_context(open(self.common_spill.path, "wb"))
+            only_files = [
+                stack.enter_context(open(spill.path, "wb"))
+                for spill in self.only_spills
+            ]
+            for file_path in files:
+                common, only = split_common(
+                    [config.read_file(file_path) for config in self.configs]
+                )
+                for issue in common:
+                    self.common.add(issue)
+                    self.common_spill.append(common_file, issue)
+                for k, issues in enumerate(only):
+                    for issue in issues:
+                        self.only[k].add(issue)
+                        self.only_spills[k].append(only_files[k], issue)
+
+
+def spilled_matrices(
+    projects: list[SpilledProject], spill_dir: str
+) -> dict[str, SpilledMatrix]:
+    """Compares the configurations of each project run with an option matrix."""
+    configs: dict[str, list[SpilledProject]] = {}
+    for project in projects:
+        name = matrix_project(project.result.name)
+        if name is not None:
+            configs.setdefault(name, []).append(project)
+
+    matrices: dict[str, SpilledMatrix] = {}
+    for i, (name, parts) in enumerate(configs.items()):
+        matrix = SpilledMatrix(
+            name,
+            parts,
+            IssueSpill(os.path.join(spill_dir, f"matrix{i:03d}-common.jsonl")),
+            [
+                IssueSpill(os.path.join(spill_dir, f"matrix{i:03d}-{k:02d}.jsonl"))
+                for k in range(len(parts))
+            ],
+        )
+        matrix.split()
+        matrices[name] = matrix
+    return matrices
+
+
+def write_streamed_report(
+    f: TextIO,
+    projects: list[SpilledProject],
+    project_urls: dict[str, str],
+    budget: ReportBudget | None = None,
+    profiles: dict[str, RunProfile] | None = None,
+    matrices: dict[str, SpilledMatrix] | None = None,
+) -> None:
+    """
+    Second pass: writes the summary, then streams each project's details.
+
+    The configurations of a matrix run share one section, as in
+    ``write_report``.
+    """
+    write_summary_table(f, [p.result for p in projects])
+    matrix_of = {
+        config.result.name: m for m in (matrices or {}).values() for config in m.configs
+    }
+
+    def section(project: SpilledProject) -> Section:
+        def write(f: TextIO, budget: ReportBudget | None) -> None:
+            name = project.result.name
+            matrix = matrix_of.get(name)
+            if matrix is not None:
+                if project is matrix.configs[0]:
+                    write_matrix_section(
+                        f,
+                        matrix.name,
+                        [config.result for config in matrix.configs],
+                        (matrix.common_spill.file_groups, matrix.common),
+                        [
+                            (spill.file_groups, stats)
+                            for spill, stats in zip(matrix.only_spills, matrix.only)
+                        ],
+                        project_urls,
+                        budget,
+                    )
+            else:
+                write_project_details(
+                    f,
+                    project.result,
+                    project_urls,
+                    budget,
+                    project.file_groups,
+                    project.stats,
+                )
+            if profiles and name in profiles:
+                write_project_performance(f, name, profiles[name], budget)
+
+        return write
+
+    write_sections(f, [section(project) for project in projects], budget)
+
+
+def stream_report(
+    log_dir: str,
+    output: str,
+    jobs: int = 1,
+    max_bytes: int | None = None,
+    max_issues: int | None = None,
+    top_n: int = DEFAULT_TOP_N,
+    details_output: str = DEFAULT_DETAILS_FILE,
+    markdown: bool = True,
+    structured_outputs: dict[str, str] | None = None,
+    store: str | None = None,
+) -> None:
+    """
+    Generates the markdown report in two streaming passes.
+
+    Peak memory scales with the largest single file group instead of the
+    total number of issues. The parse cache is not used, since cached
+    results hold every issue. Matrix runs are compared one file at a time.
+    Structured formats in ``structured_outputs`` are written together in
+    one more pass over the spills, and ``store`` is filled in another.
+    """
+    if not os.path.exists(log_dir):
+        print(f"Log directory '{log_dir}' not found.", file=sys.stderr)
+        sys.exit(1)
+
+    log_files, project_names = find_log_files(log_dir)
+    if not log_files:
+        print(f"No log files found in '{log_dir}'.", file=sys.stderr)
+        sys.exit(0)
+
+    project_urls = project_browse_urls()
+    budget = None
+    if max_bytes or max_issues:
+        budget = ReportBudget(max_bytes or None, max_issues or None, top_n)
+
+    with tempfile.TemporaryDirectory(prefix="ctit-spill-") as spill_dir:
+        projects = spill_log_files(log_files, project_names, spill_dir, jobs)
+        if markdown:
+            profiles = load_run_profiles(log_dir, (p.result.name for p in projects))
+            matrices = spilled_matrices(projects, spill_dir)
+            write_markdown_files(
+                lambda f, b: write_streamed_report(
+                    f, projects, project_urls, b, profiles, matrices
+                ),
+                output,
+                budget,
+                details_output,
+            )
+        write_structured_reports(
+            structured_outputs or {},
+            ((p.result, p.file_groups()) for p in projects),
+            project_urls,
+        )
+        if store is not None:
+            store_project_groups(store, ((p.result, p.file_groups()) for p in projects))
@@ -0,0 +1,269 @@
+"""Cheap token pre-filter selecting translation units a check can fire on."""
+
+import json
+import os
+import random
+import re
+import shlex
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from testers.sources import project_commit
+
+# Identifier tokens a check's matchers need to see somewhere in a TU (or the
+# project headers it includes) to possibly produce a diagnostic. Checks not
+# listed here, or whose matchers apply to every declaration, always run in
+# full unless tokens are given explicitly.
+CHECK_TOKENS: dict[str, list[str]] = {
+    "bugprone-use-after-move": ["move", "forward"],
+    "bugprone-string-constructor": ["string", "basic_string", "string_view"],
+    "bugprone-unchecked-optional-access": ["optional", "value"],
+    "cppcoreguidelines-avoid-goto": ["goto"],
+    "modernize-use-std-print": ["printf", "fprintf"],
+    "performance-move-const-arg": ["move"],
+}
+
+_TOKEN_RE = re.compile(rb"[A-Za-z_][A-Za-z0-9_]*")
+_INCLUDE_RE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"\n]+)[>"]', re.M)
+_INCLUDE_FLAGS = ("-I", "-iquote", "-isystem", "-idirafter")
+# Option values that only name functions or types, e.g. "::myprintf;log".
+_NAME_LIST_RE = re.compile(r"[\w:;,\s]*")
+
+
+def tokens_for_checks(check_name: str, configs: Iterable[str] = ()) -> list[str] | None:
+    """
+    Returns the filter tokens for a comma separated check list.
+
+    Options in the ``-config`` strings ``configs`` can point a check at
+    other names, e.g. ``modernize-use-std-print.PrintfLikeFunctions``, so
+    the names in their values are tokens too.
+
+    Returns None when any of the checks has no known tokens, or a config
+    is unreadable or sets a check option to anything but a list of names
+    (such as a regex), since the filter must then keep every translation
+    unit.
+    """
+    checks = [c.strip() for c in check_name.split(",") if c.strip()]
+    tokens: list[str] = []
+    for check in checks:
+        if check not in CHECK_TOKENS:
+            return None
+        tokens.extend(CHECK_TOKENS[check])
+
+    for config in filter(None, configs):
+        try:
+            options = json.loads(config).get("CheckOptions", {})
+        except (ValueError, AttributeError):
+            return None
+        if not isinstance(options, dict):
+            return None
+        for key, value in options.items():
+            if key.split(".", 1)[0] not in checks:
+                continue
+            if not _NAME_LIST_RE.fullmatch(str(value)):
+                return None
+            tokens.extend(t.decode() for t in _TOKEN_RE.findall(str(value).encode()))
+    return list(dict.fromkeys(tokens)) or None
+
+
+def include_dirs(arguments: list[str], directory: str) -> list[str]:
+    """Extracts include search directories from compiler arguments."""
+    dirs: list[str] = []
+    args = iter(arguments)
+    for arg in args:
+        for flag in _INCLUDE_FLAGS:
+            if arg.startswith(flag):
+                value = arg[len(flag) :] or next(args, "")
+                if value:
+                    dirs.append(os.path.normpath(os.path.join(directory, value)))
+                break
+    return dirs
+
+
+def command_arguments(entry: dict[str, Any]) -> list[str]:
+    """Returns the argument list of a compile database entry."""
+    if "arguments" in entry:
+        return list(entry["arguments"])
+    return shlex.split(entry.get("command", ""))
+
+
+@dataclass
+class _FileEntry:
+    size: int
+    mtime_ns: int
+    tokens: set[str]
+    includes: list[tuple[str, str]]
+
+
+class SourceIndex:
+    """
+    Per-file identifier tokens and include directives of a source tree.
+
+    Files are indexed lazily on first use. The index is persisted per pinned
+    project commit, and entries are re-read when a file's size or mtime no
+    longer matches, so local modifications (e.g. an applied patch) are
+    picked up.
+    """
+
+    def __init__(self, root: str, path: str | None = None) -> None:
+        self.root = os.path.abspath(root)
+        self.path = path
+        self._files: dict[str, _FileEntry] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, root: str, index_dir: str | None, project: str) -> "SourceIndex":
+        """Loads the persisted index of ``root`` at its current commit."""
+        commit = project_commit(root)
+        if commit is None:
+            print(
+                f"Not a git checkout, index is not persisted: {root}", file=sys.stderr
+            )
+        if index_dir is None or commit is None:
+            return cls(root)
+
+        path = os.path.join(index_dir, f"{project}-{commit}.json")
+        index = cls(root, path)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+
+        for rel, e in data.get("files", {}).items():
+            index._files[os.path.join(index.root, rel)] = _FileEntry(
+                size=e["size"],
+                mtime_ns=e["mtime_ns"],
+                tokens=set(e["tokens"]),
+                includes=[(kind, name) for kind, name in e["includes"]],
+            )
+        return index
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {
+            "root": self.root,
+            "files": {
+                os.path.relpath(path, self.root): {
+                    "size": e.size,
+                    "mtime_ns": e.mtime_ns,
+                    "tokens": sorted(e.tokens),
+                    "includes": e.includes,
+                }
+                for path, e in self._files.items()
+            },
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def entry(self, path: str) -> _FileEntry | None:
+        """Returns the index entry of ``path``, indexing it if needed."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        cached = self._files.get(path)
+        if cached and cached.size == st.st_size and cached.mtime_ns == st.st_mtime_ns:
+            return cached
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        entry = _FileEntry(
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            tokens={t.decode() for t in _TOKEN_RE.findall(data)},
+            includes=[
+                (kind.decode(), name.decode().strip())
+                for kind, name in _INCLUDE_RE.findall(data)
+            ],
+        )
+        self._files[path] = entry
+        self._dirty = True
+        return entry
+
+    def _resolve(
+        self, kind: str, name: str, including: str, search: list[str]
+    ) -> str | None:
+        dirs = [os.path.dirname(including), *search] if kind == '"' else search
+        for d in dirs:
+            candidate = os.path.normpath(os.path.join(d, name))
+            if candidate.startswith(self.root + os.sep) and os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def matches(self, file: str, search: list[str], tokens: set[str]) -> bool:
+        """
+        Returns whether ``file`` or any project header it transitively
+        includes contains one of ``tokens``.
+        """
+        stack = [os.path.normpath(file)]
+        visited: set[str] = set()
+        while stack:
+            path = stack.pop()
+            if path in visited:
+                continue
+            visited.add(path)
+
+            entry = self.entry(path)
+            if entry is None:
+                continue
+            if not tokens.isdisjoint(entry.tokens):
+                return True
+            for kind, name in entry.includes:
+                resolved = self._resolve(kind, name, path, search)
+                if resolved is not None and resolved not in visited:
+                    stack.append(resolved)
+        return False
+
+
+@dataclass
+class FilterStats:
+    """Outcome of the pre-filter for one project run."""
+
+    total: int
+    skipped: int
+    sampled: int = 0
+    sampled_with_diagnostics: int = 0
+
+    @property
+    def scheduled(self) -> int:
+        return self.total - self.skipped + self.sampled
+
+
+def select_units(
+    units: list[tuple[str, list[str]]], index: SourceIndex, tokens: set[str]
+) -> tuple[list[int], list[int]]:
+    """
+    Splits translation units into candidates and skipped ones.
+
+    Args:
+        units: (file, include search dirs) of each translation unit.
+        index: Source index of the project.
+        tokens: Identifiers at least one of which must be reachable.
+
+    Returns:
+        Indices of the candidate units and of the skipped units.
+    """
+    kept: list[int] = []
+    skipped: list[int] = []
+    for i, (file, search) in enumerate(units):
+        (kept if index.matches(file, search, tokens) else skipped).append(i)
+    return kept, skipped
+
+
+def sample_skipped(skipped: list[int], count: int, seed: int = 0) -> list[int]:
+    """Deterministically picks up to ``count`` skipped units to verify."""
+    if count <= 0 or not skipped:
+        return []
+    return sorted(random.Random(seed).sample(skipped, min(count, len(skipped))))
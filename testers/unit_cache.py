@@ -0,0 +1,204 @@
+"""Content-addressed cache of clang-tidy output per translation unit."""
+
+import copy
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from dataclasses import asdict
+
+from parse_issue import ParseResult
+from testers.baseline import normalize_tidy_config
+from testers.disk_cache import DiskCache
+from testers.run_profile import UnitProfile
+from testers.sources import file_digest
+
+DEFAULT_UNIT_CACHE_MAX_BYTES = 2 << 30
+# clang-tidy exits with 1 when it reports errors; anything else, such as
+# a crash, is not reused.
+CACHEABLE_RETURNCODES = (0, 1)
+TIDY_CONFIG_FILE = ".clang-tidy"
+_KEY_VERSION = "1"
+# Compiler options that write an output or a dependency file, which the
+# dependency scan drops together with the value that follows them.
+_OUTPUT_OPTIONS = ("-o", "-MF", "-MT", "-MQ", "-MJ")
+_OUTPUT_SWITCHES = {"-c", "-S", "-E", "-M", "-MM", "-MD", "-MMD", "-MG", "-MP"}
+# A make prerequisite: any run of non-blank characters or escaped ones.
+_MAKE_WORD_RE = re.compile(r"(?:\\.|\$\$|[^\s\\])+")
+
+
+def dependency_command(arguments: list[str]) -> list[str]:
+    """
+    Returns the compile command ``arguments`` changed to print the unit's
+    dependencies as a make rule, instead of compiling it.
+    """
+    command: list[str] = []
+    args = iter(arguments)
+    for arg in args:
+        if arg in _OUTPUT_OPTIONS:
+            next(args, None)
+        elif arg in _OUTPUT_SWITCHES or arg.startswith(_OUTPUT_OPTIONS[1:]):
+            continue
+        elif arg.startswith("-o") and not arg.startswith("-obj"):
+            continue
+        else:
+            command.append(arg)
+    return [*command, "-M"]
+
+
+def parse_make_dependencies(rule: str) -> list[str]:
+    """Returns the prerequisites of a make rule printed by ``-M``."""
+    rule = rule.replace("\\\n", " ")
+    _, _, prerequisites = rule.partition(": ")
+    return [
+        re.sub(r"\\(.)", r"\1", word).replace("$$", "$")
+        for word in _MAKE_WORD_RE.findall(prerequisites)
+    ]
+
+
+def unit_dependencies(directory: str, arguments: list[str]) -> list[str] | None:
+    """
+    Returns every file the unit's compiler reads for it, including
+    generated and system headers, or None when the compiler fails to
+    list them.
+    """
+    try:
+        proc = subprocess.run(
+            dependency_command(arguments),
+            cwd=directory,
+            capture_output=True,
+            text=True,
+        )
+    except OSError as e:
+        print(f"Cannot list dependencies in {directory}: {e}", file=sys.stderr)
+        return None
+    if proc.returncode != 0:
+        return None
+    return [
+        os.path.normpath(os.path.join(directory, path))
+        for path in parse_make_dependencies(proc.stdout)
+    ]
+
+
+def tidy_config_files(file: str, root: str) -> dict[str, str]:
+    """
+    Returns the content hash of each .clang-tidy file that clang-tidy may
+    read for ``file``, from its directory up to ``root``.
+    """
+    found: dict[str, str] = {}
+    root = os.path.abspath(root)
+    directory = os.path.dirname(os.path.abspath(file))
+    while True:
+        path = os.path.join(directory, TIDY_CONFIG_FILE)
+        if os.path.isfile(path):
+            found[path] = file_digest(path)
+        if directory == root or os.path.dirname(directory) == directory:
+            return found
+        directory = os.path.dirname(directory)
+
+
+class UnitCache(DiskCache):
+    """
+    Raw clang-tidy output per translation unit, keyed ccache-style by
+    everything that can change it.
+
+    An entry is ``<key>.log``, the output, and ``<key>.json``, the exit
+    code and the unit's original profile.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        clang_tidy: str,
+        request: ParseResult,
+        profile: bool = False,
+        max_bytes: int = DEFAULT_UNIT_CACHE_MAX_BYTES,
+    ) -> None:
+        super().__init__(cache_dir, max_bytes)
+        self._prefix = [
+            _KEY_VERSION,
+            file_digest(clang_tidy),
+            request.check_name,
+            normalize_tidy_config(request.tidy_config),
+            # Profiled entries carry per-check timings.
+            profile,
+        ]
+
+    def for_request(self, request: ParseResult) -> "UnitCache":
+        """
+        Returns the same cache keyed for another request to the same
+        binary, without hashing the binary again.
+        """
+        other = copy.copy(self)
+        other._prefix = [
+            *self._prefix[:2],
+            request.check_name,
+            normalize_tidy_config(request.tidy_config),
+            *self._prefix[4:],
+        ]
+        return other
+
+    def key(self, directory: str, arguments: list[str], inputs: dict[str, str]) -> str:
+        """
+        Returns the cache key of one translation unit.
+
+        Args:
+            directory: Working directory of the compile command.
+            arguments: The exact compile command.
+            inputs: Content hash of each input file, by path.
+        """
+        data = json.dumps([self._prefix, directory, arguments, sorted(inputs.items())])
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return f"{base}.json", f"{base}.log"
+
+    def _meta_paths(self) -> list[str]:
+        return glob.glob(os.path.join(self.cache_dir, "*", "*.json"))
+
+    def _entry_size(self, meta_path: str, payload_path: str) -> int:
+        return os.path.getsize(meta_path) + os.path.getsize(payload_path)
+
+    def fetch(self, key: str, shard_path: str, cmd: list[str]) -> UnitProfile | None:
+        """
+        Writes the cached output of ``key`` to ``shard_path``, headed by
+        ``cmd`` like a fresh run.
+
+        Returns:
+            The profile of the run that produced the entry, or None on a miss.
+        """
+        meta_path, log_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                unit = UnitProfile(**json.load(f))
+            with open(log_path, "rb") as src, open(shard_path, "wb") as dst:
+                dst.write((" ".join(cmd) + "\n").encode())
+                shutil.copyfileobj(src, dst)
+            self._touch(meta_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Ignoring unreadable unit cache entry {key}: {e}", file=sys.stderr)
+            return None
+        unit.cached = True
+        return unit
+
+    def store(self, key: str, shard_path: str, unit: UnitProfile) -> None:
+        """Caches the output of a finished run, without its command line."""
+        if unit.returncode not in CACHEABLE_RETURNCODES:
+            return
+        meta_path, log_path = self._paths(key)
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            with open(shard_path, "rb") as src, open(f"{log_path}.tmp", "wb") as dst:
+                src.readline()
+                shutil.copyfileobj(src, dst)
+            os.replace(f"{log_path}.tmp", log_path)
+            self._write_meta(meta_path, asdict(unit))
+        except OSError as e:
+            print(f"Error writing unit cache entry {key}: {e}", file=sys.stderr)
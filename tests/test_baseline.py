@@ -0,0 +1,60 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from testers.baseline import BaselineCache, baseline_key
+from testers.generate_report import Issue, ProjectResult
+
+
+class TestBaselineKey(unittest.TestCase):
+    def test_config_formatting_does_not_matter(self):
+        a = baseline_key("rev", "commit", "check", '{"A": 1, "B": 2}')
+        b = baseline_key("rev", "commit", "check", '{ "B": 2,\n "A": 1 }')
+        self.assertEqual(a, b)
+
+    def test_scope_order_does_not_matter(self):
+        a = baseline_key("rev", "commit", "check", "", ["a.cpp", "b.cpp"])
+        b = baseline_key("rev", "commit", "check", "", ["b.cpp", "a.cpp"])
+        self.assertEqual(a, b)
+
+    def test_every_component_changes_the_key(self):
+        base = baseline_key("rev", "commit", "check", "{}", ["a.cpp"])
+        for args in [
+            ("rev2", "commit", "check", "{}", ["a.cpp"]),
+            ("rev", "commit2", "check", "{}", ["a.cpp"]),
+            ("rev", "commit", "check2", "{}", ["a.cpp"]),
+            ("rev", "commit", "check", '{"A": 1}', ["a.cpp"]),
+            ("rev", "commit", "check", "{}", ["b.cpp"]),
+        ]:
+            self.assertNotEqual(baseline_key(*args), base, args)
+
+
+class TestBaselineCache(unittest.TestCase):
+    def test_round_trip(self):
+        result = ProjectResult(
+            name="proj",
+            warnings_count=1,
+            issues=[Issue("a.cpp", 1, 2, "warning", "msg", "check", "int x;")],
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BaselineCache(tmp_dir)
+            self.assertIsNone(cache.load("ab" * 32, "proj"))
+            cache.store("ab" * 32, result)
+            self.assertEqual(cache.load("ab" * 32, "proj"), result)
+            self.assertIsNone(cache.load("ab" * 32, "other"))
+
+    def test_ignores_corrupt_entry(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BaselineCache(tmp_dir)
+            cache.store("cd" * 32, ProjectResult(name="proj"))
+            path = os.path.join(tmp_dir, "cd", f"{'cd' * 32}-proj.json")
+            with open(path, "w") as f:
+                f.write("{not json")
+            with contextlib.redirect_stderr(io.StringIO()):
+                self.assertIsNone(cache.load("cd" * 32, "proj"))
+
+
+if __name__ == "__main__":
+    unittest.main()
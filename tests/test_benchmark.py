@@ -0,0 +1,102 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from testers.benchmark import (
+    bench,
+    compare_benchmarks,
+    generate_synthetic_log,
+    measure_issue_memory,
+    run_benchmark,
+)
+from testers.generate_report import parse_log_file
+
+
+class TestGenerateSyntheticLog(unittest.TestCase):
+    def test_diagnostics_are_unique(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "proj.log")
+            generate_synthetic_log(path, 120)
+            result = parse_log_file(path)
+            self.assertEqual(len(result.issues), 120)
+            self.assertEqual(result.errors_count, 3)
+            self.assertEqual(result.issues[0].context, "int v0 = compute();")
+
+    def test_duplicates_and_crashes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "proj.log")
+            lines = generate_synthetic_log(
+                path, 200, crash_density=0.1, duplicate_ratio=0.5, seed=1
+            )
+            with open(path) as f:
+                self.assertEqual(sum(1 for _ in f), lines)
+            result = parse_log_file(path)
+            self.assertTrue(result.has_crash)
+            self.assertGreater(result.raw_warnings_count, result.warnings_count)
+
+    def test_deterministic_for_seed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            a = os.path.join(tmp_dir, "a.log")
+            b = os.path.join(tmp_dir, "b.log")
+            generate_synthetic_log(a, 50, crash_density=0.2, duplicate_ratio=0.3)
+            generate_synthetic_log(b, 50, crash_density=0.2, duplicate_ratio=0.3)
+            with open(a) as fa, open(b) as fb:
+                self.assertEqual(fa.read(), fb.read())
+
+
+class TestRunBenchmark(unittest.TestCase):
+    def test_reports_all_stages(self):
+        results = run_benchmark(100, duplicate_ratio=0.2)
+        self.assertEqual(
+            list(results["stages"]),
+            [
+                "parse_log_file",
+                "get_relative_path",
+                "write_project_details",
+                "generate_markdown",
+            ],
+        )
+        for stage in results["stages"].values():
+            self.assertGreater(stage["lines_per_s"], 0)
+            self.assertGreater(stage["mb_per_s"], 0)
+            self.assertGreater(stage["peak_bytes"], 0)
+        self.assertEqual(results["log"]["lines"], 300)
+        json.dumps(results)
+
+    def test_compare(self):
+        base = {"stages": {"parse_log_file": {"seconds": 2.0}}}
+        current = {
+            "stages": {
+                "parse_log_file": {"seconds": 1.0},
+                "generate_markdown": {"seconds": 1.0},
+            }
+        }
+        table = compare_benchmarks(base, current)
+        self.assertIn("| parse_log_file | 2.000 | 1.000 | 2.00x |", table)
+        self.assertNotIn("generate_markdown", table)
+
+    def test_bench_writes_json(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "bench.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                bench(output, 50)
+                bench(output, 50, compare=output)
+            with open(output) as f:
+                self.assertIn("stages", json.load(f))
+
+
+class TestMeasureIssueMemory(unittest.TestCase):
+    def test_compact_issues_are_smaller(self):
+        stats = measure_issue_memory(2000)
+        self.assertEqual(stats["diagnostics"], 2000)
+        self.assertLess(
+            stats["compact_bytes_per_issue"], stats["plain_bytes_per_issue"]
+        )
+        self.assertGreater(stats["saving"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import contextlib
+import io
+import os
+import stat
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from testers.build import (
+    build_clang_tidy,
+    link_build_dir,
+    load_applied_patch,
+    prune_build_trees,
+    switch_patch,
+)
+
+# Records each invocation, and only compiles without CONFIGURE_ONLY.
+STUB_BUILD_SCRIPT = """#!/bin/bash
+set -euo pipefail
+mkdir -p "$BUILD_DIR"
+echo "${CONFIGURE_ONLY:-build}" >> "$BUILD_DIR/../calls"
+if [ -n "${CONFIGURE_ONLY:-}" ]; then
+    exit 0
+fi
+mkdir -p "$BUILD_DIR/bin"
+echo "built" > "$BUILD_DIR/bin/clang-tidy"
+"""
+
+
+@patch("testers.build_cache.strip_debug_info")
+class TestBuildClangTidy(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = self._tmp.name
+        self.build_dir = os.path.join(self.tmp_dir, "build")
+        self.script = os.path.join(self.tmp_dir, "build.sh")
+        with open(self.script, "w") as f:
+            f.write(STUB_BUILD_SCRIPT)
+        os.chmod(self.script, os.stat(self.script).st_mode | stat.S_IEXEC)
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _build(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return build_clang_tidy(self.build_dir, self.script, **kwargs)
+
+    def _calls(self):
+        with open(os.path.join(self.tmp_dir, "calls")) as f:
+            return f.read().split()
+
+    def test_second_build_is_restored(self, mock_strip):
+        kwargs = {"cache_dir": self.cache_dir, "llvm_revision": "r1"}
+        self.assertFalse(self._build(patch_sha256="p1", **kwargs))
+        os.remove(os.path.join(self.build_dir, "bin", "clang-tidy"))
+
+        self.assertTrue(self._build(patch_sha256="p1", **kwargs))
+        self.assertEqual(self._calls(), ["build", "1"])
+        with open(os.path.join(self.build_dir, "bin", "clang-tidy")) as f:
+            self.assertEqual(f.read(), "built\n")
+
+        self.assertFalse(self._build(patch_sha256="p2", **kwargs))
+        self.assertEqual(self._calls(), ["build", "1", "build"])
+
+    def test_without_cache_always_builds(self, mock_strip):
+        self.assertFalse(self._build())
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertFalse(self._build(cache_dir=self.cache_dir))
+        self.assertEqual(self._calls(), ["build", "build"])
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_failed_build_exits(self, mock_strip):
+        with open(self.script, "w") as f:
+            f.write("exit 3\n")
+        with self.assertRaises(SystemExit) as ctx:
+            with contextlib.redirect_stderr(io.StringIO()):
+                self._build(cache_dir=self.cache_dir)
+        self.assertEqual(ctx.exception.code, 3)
+
+
+def _git(*args, cwd):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = self._tmp.name
+        self.llvm_dir = os.path.join(self.tmp_dir, "llvm-project")
+        os.makedirs(self.llvm_dir)
+        for name in ("a.cpp", "b.cpp"):
+            self._write(name, "int x;\n")
+        _git("init", "-q", cwd=self.llvm_dir)
+        _git("add", ".", cwd=self.llvm_dir)
+        _git(
+            "-c",
+            "user.name=ctit",
+            "-c",
+            "user.email=ctit@example.com",
+            "commit",
+            "-q",
+            "-m",
+            "base",
+            cwd=self.llvm_dir,
+        )
+        self.patch_a = self._patch("a.cpp", "patch-a.diff")
+        self.patch_b = self._patch("b.cpp", "patch-b.diff")
+        self.tree_dir = os.path.join(self.tmp_dir, "trees", "rev")
+        os.makedirs(self.tree_dir)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, content):
+        with open(os.path.join(self.llvm_dir, name), "w") as f:
+            f.write(content)
+
+    def _read(self, name):
+        with open(os.path.join(self.llvm_dir, name)) as f:
+            return f.read()
+
+    def _patch(self, name, patch_name):
+        self._write(name, "int y;\n")
+        path = os.path.join(self.tmp_dir, patch_name)
+        with open(path, "w") as f:
+            f.write(_git("diff", cwd=self.llvm_dir))
+        _git("checkout", ".", cwd=self.llvm_dir)
+        return path
+
+    def _switch(self, patch_path):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return switch_patch(self.llvm_dir, self.tree_dir, patch_path)
+
+    def test_switch_reverts_previous_patch(self):
+        self.assertEqual(self._switch(self.patch_a).touched, ["a.cpp"])
+        self.assertEqual(self._read("a.cpp"), "int y;\n")
+
+        applied = self._switch(self.patch_b)
+        self.assertEqual(applied.touched, ["b.cpp"])
+        self.assertEqual(load_applied_patch(self.tree_dir), applied)
+        self.assertEqual(self._read("a.cpp"), "int x;\n")
+        self.assertEqual(self._read("b.cpp"), "int y;\n")
+
+    def test_switch_keeps_already_applied_patch(self):
+        self._switch(self.patch_a)
+        # The workflow resets the checkout and applies the patch itself.
+        _git("checkout", ".", cwd=self.llvm_dir)
+        _git("apply", self.patch_b, cwd=self.llvm_dir)
+        self._switch(self.patch_b)
+        self.assertEqual(self._read("a.cpp"), "int x;\n")
+        self.assertEqual(self._read("b.cpp"), "int y;\n")
+
+    def test_switch_rejects_conflicting_patch(self):
+        self._write("a.cpp", "int z;\n")
+        with self.assertRaises(SystemExit):
+            with contextlib.redirect_stderr(io.StringIO()):
+                self._switch(self.patch_a)
+        self.assertIsNone(load_applied_patch(self.tree_dir))
+
+    def test_link_build_dir(self):
+        build_dir = os.path.join(self.llvm_dir, "build")
+        link_build_dir(build_dir, self.tree_dir)
+        other = os.path.join(self.tmp_dir, "trees", "other")
+        link_build_dir(build_dir, other)
+        self.assertEqual(os.readlink(build_dir), other)
+
+        os.remove(build_dir)
+        os.makedirs(build_dir)
+        with self.assertRaises(SystemExit):
+            with contextlib.redirect_stderr(io.StringIO()):
+                link_build_dir(build_dir, self.tree_dir)
+
+    def test_prune_keeps_most_recent_trees(self):
+        root = os.path.dirname(self.tree_dir)
+        for i, name in enumerate(["old", "newer"]):
+            path = os.path.join(root, name)
+            os.makedirs(path)
+            os.utime(path, (1000 + i, 1000 + i))
+        removed = prune_build_trees(root, 2, self.tree_dir)
+        self.assertEqual(removed, [os.path.join(root, "old")])
+        self.assertEqual(sorted(os.listdir(root)), ["newer", "rev"])
+
+    def test_build_happens_in_tree(self):
+        script = os.path.join(self.tmp_dir, "build.sh")
+        with open(script, "w") as f:
+            f.write(STUB_BUILD_SCRIPT)
+        build_dir = os.path.join(self.llvm_dir, "build")
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_clang_tidy(
+                build_dir,
+                script,
+                llvm_dir=self.llvm_dir,
+                tree_dir=os.path.dirname(self.tree_dir),
+                patch=self.patch_a,
+            )
+        revision = _git("rev-parse", "HEAD", cwd=self.llvm_dir).strip()
+        tree = os.path.join(os.path.dirname(self.tree_dir), revision)
+        self.assertEqual(os.readlink(build_dir), tree)
+        self.assertTrue(os.path.isfile(os.path.join(tree, "bin", "clang-tidy")))
+        self.assertEqual(load_applied_patch(tree).touched, ["a.cpp"])
+
+
+if __name__ == "__main__":
+    unittest.main()
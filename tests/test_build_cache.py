@@ -0,0 +1,92 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from testers.build_cache import BuildCache, build_flags, build_key
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+class TestBuildKey(unittest.TestCase):
+    def test_covers_revision_patch_and_flags(self):
+        key = build_key("rev", "patch", {"script": "1"})
+        self.assertEqual(key, build_key("rev", "patch", {"script": "1"}))
+        self.assertNotEqual(key, build_key("rev2", "patch", {"script": "1"}))
+        self.assertNotEqual(key, build_key("rev", "patch2", {"script": "1"}))
+        self.assertNotEqual(key, build_key("rev", "patch", {"script": "2"}))
+
+    def test_flags_include_script_and_environment(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            script = os.path.join(tmp_dir, "build.sh")
+            _write(script, "cmake -DFOO=ON\n")
+            with patch.dict("os.environ", {"LLVM_USE_LINKER": "lld"}):
+                flags = build_flags(script)
+            self.assertEqual(flags["LLVM_USE_LINKER"], "lld")
+            _write(script, "cmake -DFOO=OFF\n")
+            self.assertNotEqual(build_flags(script)["script"], flags["script"])
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = self._tmp.name
+        self.build_dir = os.path.join(self.tmp_dir, "build")
+        _write(os.path.join(self.build_dir, "bin", "clang-tidy"), "binary")
+        _write(
+            os.path.join(self.build_dir, "lib", "clang", "22", "include", "stddef.h"),
+            "header",
+        )
+        self.cache = BuildCache(os.path.join(self.tmp_dir, "cache"))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    @patch("testers.build_cache.strip_debug_info")
+    def test_store_and_fetch(self, mock_strip):
+        self.assertFalse(self.cache.fetch("k1", self.build_dir))
+        self.cache.store("k1", self.build_dir)
+        mock_strip.assert_called_once()
+        self.assertTrue(self.cache.has("k1"))
+
+        restored = os.path.join(self.tmp_dir, "restored")
+        self.assertTrue(self.cache.fetch("k1", restored))
+        with open(os.path.join(restored, "bin", "clang-tidy")) as f:
+            self.assertEqual(f.read(), "binary")
+        header = os.path.join(restored, "lib", "clang", "22", "include", "stddef.h")
+        self.assertTrue(os.path.isfile(header))
+
+    def test_failed_store_leaves_no_entry(self):
+        os.remove(os.path.join(self.build_dir, "bin", "clang-tidy"))
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.cache.store("k1", self.build_dir)
+        self.assertFalse(self.cache.has("k1"))
+        self.assertEqual(os.listdir(self.cache.cache_dir), [])
+
+    @patch("testers.build_cache.strip_debug_info")
+    def test_evicts_least_recently_used(self, mock_strip):
+        for i, key in enumerate(["k1", "k2", "k3"]):
+            self.cache.store(key, self.build_dir)
+            meta = os.path.join(self.cache.cache_dir, f"{key}.json")
+            os.utime(meta, (time.time() - 100 + i, time.time() - 100 + i))
+        # Restoring the oldest entry makes it the most recently used.
+        self.cache.fetch("k1", os.path.join(self.tmp_dir, "restored"))
+
+        self.cache.max_bytes = 2 * len("binary" + "header")
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertEqual(
+            sorted(os.listdir(self.cache.cache_dir)),
+            ["k1", "k1.json", "k3", "k3.json"],
+        )
+        self.assertEqual(self.cache.evict(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
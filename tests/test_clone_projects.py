@@ -1,35 +1,294 @@
 import json
 import os
+import shutil
+import subprocess
 import tempfile
 import unittest
-from unittest.mock import patch
+from unittest.mock import call, patch
 
-from testers.clone_projects import clone_project, clone_projects
+from testers.clone_projects import (
+    WorktreeState,
+    clone_project,
+    clone_projects,
+    has_commit,
+    mirror_path,
+    read_worktree_state,
+)
 
 
+def _git(*args, cwd=None):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def _make_remote(tmp_dir, name, commits=3):
+    """Creates a bare repo standing in for a remote; returns (url, shas)."""
+    src = os.path.join(tmp_dir, f"{name}-src")
+    _git("init", "-q", src)
+    shas = []
+    for i in range(commits):
+        with open(os.path.join(src, "file.txt"), "w") as f:
+            f.write(f"{name} revision {i}\n")
+        _git("add", "file.txt", cwd=src)
+        _git(
+            "-c",
+            "user.name=ctit",
+            "-c",
+            "user.email=ctit@example.com",
+            "commit",
+            "-q",
+            "-m",
+            f"commit {i}",
+            cwd=src,
+        )
+        shas.append(_git("rev-parse", "HEAD", cwd=src))
+
+    bare = os.path.join(tmp_dir, f"{name}.git")
+    _git("clone", "-q", "--bare", src, bare)
+    return f"file://{bare}", shas
+
+
+@patch("testers.clone_projects.has_commit", return_value=False)
+@patch("testers.clone_projects.subprocess.run")
 class TestCloneProject(unittest.TestCase):
-    @patch("testers.clone_projects.subprocess.run")
+    CHECKOUT = ["git", "-C", "/dest/proj", "checkout", "-q", "--force", "--detach"]
+
+    @patch(
+        "testers.clone_projects.read_worktree_state",
+        return_value=WorktreeState("old", False, False),
+    )
     @patch("testers.clone_projects.os.path.isdir", return_value=True)
-    def test_only_checks_out_when_dir_exists(self, mock_isdir, mock_run):
+    def test_fetches_and_checks_out_new_pin(self, mock_isdir, mock_state, mock_run, _):
         clone_project("proj", "https://example.com/proj.git", "abc123", "/dest/proj")
-        mock_run.assert_called_once_with(
-            ["git", "-C", "/dest/proj", "checkout", "abc123"],
-            check=True,
+        self.assertEqual(
+            mock_run.call_args_list,
+            [
+                call(
+                    ["git", "-C", "/dest/proj", "fetch", "--depth", "1"]
+                    + ["origin", "abc123"],
+                    check=True,
+                ),
+                call([*self.CHECKOUT, "abc123"], check=True),
+            ],
         )
 
-    @patch("testers.clone_projects.subprocess.run")
+    @patch(
+        "testers.clone_projects.read_worktree_state",
+        return_value=WorktreeState(None, False, False),
+    )
     @patch("testers.clone_projects.os.path.isdir", return_value=False)
-    def test_clones_and_checks_out_when_dir_missing(self, mock_isdir, mock_run):
+    def test_inits_and_fetches_when_dir_missing(
+        self, mock_isdir, mock_state, mock_run, _
+    ):
         clone_project("proj", "https://example.com/proj.git", "abc123", "/dest/proj")
+        mock_run.assert_any_call(["git", "init", "-q", "/dest/proj"], check=True)
         mock_run.assert_any_call(
-            ["git", "clone", "https://example.com/proj.git", "/dest/proj"],
+            [
+                "git",
+                "-C",
+                "/dest/proj",
+                "remote",
+                "add",
+                "origin",
+                "https://example.com/proj.git",
+            ],
             check=True,
         )
+        self.assertEqual(mock_run.call_count, 4)
+
+    @patch(
+        "testers.clone_projects.read_worktree_state",
+        return_value=WorktreeState("old", False, False),
+    )
+    @patch("testers.clone_projects.os.path.isdir", return_value=True)
+    def test_partial_clone_filter(self, mock_isdir, mock_state, mock_run, _):
+        clone_project(
+            "proj", "https://example.com/proj.git", "abc123", "/dest/proj", "blob:none"
+        )
         mock_run.assert_any_call(
-            ["git", "-C", "/dest/proj", "checkout", "abc123"],
+            [
+                "git",
+                "-C",
+                "/dest/proj",
+                "fetch",
+                "--depth",
+                "1",
+                "--filter=blob:none",
+                "origin",
+                "abc123",
+            ],
             check=True,
         )
-        self.assertEqual(mock_run.call_count, 2)
+
+    @patch(
+        "testers.clone_projects.read_worktree_state",
+        return_value=WorktreeState("abc123", False, False),
+    )
+    @patch("testers.clone_projects.os.path.isdir", return_value=True)
+    def test_noop_when_already_synced(self, mock_isdir, mock_state, mock_run, _):
+        timings = clone_project(
+            "proj", "https://example.com/proj.git", "abc123", "/dest/proj"
+        )
+        mock_run.assert_not_called()
+        self.assertEqual(list(timings), ["status"])
+
+    @patch(
+        "testers.clone_projects.read_worktree_state",
+        return_value=WorktreeState("abc123", True, False),
+    )
+    @patch("testers.clone_projects.os.path.isdir", return_value=True)
+    def test_resets_tracked_changes_without_fetch(
+        self, mock_isdir, mock_state, mock_run, _
+    ):
+        clone_project("proj", "https://example.com/proj.git", "abc123", "/dest/proj")
+        mock_run.assert_called_once_with([*self.CHECKOUT, "abc123"], check=True)
+
+    @patch(
+        "testers.clone_projects.read_worktree_state",
+        return_value=WorktreeState("abc123", False, True),
+    )
+    @patch("testers.clone_projects.os.path.isdir", return_value=True)
+    def test_only_cleans_untracked_files(self, mock_isdir, mock_state, mock_run, _):
+        timings = clone_project(
+            "proj", "https://example.com/proj.git", "abc123", "/dest/proj"
+        )
+        mock_run.assert_called_once_with(
+            ["git", "-C", "/dest/proj", "clean", "-q", "-f", "-d"], check=True
+        )
+        self.assertIn("clean", timings)
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestCloneProjectLocalRemote(unittest.TestCase):
+    def test_fetches_only_pinned_commit(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url, shas = _make_remote(tmp_dir, "proj")
+            dest = os.path.join(tmp_dir, "out", "proj")
+
+            clone_project("proj", url, shas[1], dest)
+
+            self.assertEqual(_git("-C", dest, "rev-parse", "HEAD"), shas[1])
+            self.assertEqual(_git("-C", dest, "rev-list", "--count", "HEAD"), "1")
+            with open(os.path.join(dest, "file.txt")) as f:
+                self.assertEqual(f.read(), "proj revision 1\n")
+
+    def test_refetches_new_pin_into_existing_dir(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url, shas = _make_remote(tmp_dir, "proj")
+            dest = os.path.join(tmp_dir, "out", "proj")
+
+            clone_project("proj", url, shas[0], dest)
+            clone_project("proj", url, shas[2], dest)
+
+            self.assertEqual(_git("-C", dest, "rev-parse", "HEAD"), shas[2])
+
+    def test_repeat_sync_restores_dirty_tree(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url, shas = _make_remote(tmp_dir, "proj")
+            dest = os.path.join(tmp_dir, "out", "proj")
+            clone_project("proj", url, shas[1], dest)
+
+            os.remove(os.path.join(dest, "file.txt"))
+            with open(os.path.join(dest, ".clang-tidy"), "w") as f:
+                f.write("Checks: '*'\n")
+            state = read_worktree_state(dest)
+            self.assertTrue(state.tracked_changes)
+            self.assertTrue(state.untracked_files)
+
+            timings = clone_project("proj", url, shas[1], dest)
+            self.assertNotIn("fetch", timings)
+            self.assertTrue(read_worktree_state(dest).matches(shas[1]))
+            self.assertFalse(os.path.exists(os.path.join(dest, ".clang-tidy")))
+
+            timings = clone_project("proj", url, shas[1], dest)
+            self.assertEqual(list(timings), ["status"])
+
+    def test_clone_projects_in_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            projects = {}
+            for name in ("a", "b", "c"):
+                url, shas = _make_remote(tmp_dir, name)
+                projects[name] = {"url": url, "commit": shas[0]}
+            config_path = os.path.join(tmp_dir, "projects.json")
+            with open(config_path, "w") as f:
+                json.dump({"projects": projects}, f)
+
+            work_dir = os.path.join(tmp_dir, "out")
+            clone_projects(work_dir, config_path, jobs=3, filter_spec="blob:none")
+
+            for name, proj in projects.items():
+                dest = os.path.join(work_dir, name)
+                self.assertEqual(_git("-C", dest, "rev-parse", "HEAD"), proj["commit"])
+
+
+class TestMirrorPath(unittest.TestCase):
+    def test_named_after_repo(self):
+        path = mirror_path("/cache", "https://github.com/danmar/cppcheck.git")
+        self.assertTrue(path.startswith("/cache/cppcheck-"))
+        self.assertTrue(path.endswith(".git"))
+
+    def test_distinct_per_url(self):
+        self.assertNotEqual(
+            mirror_path("/cache", "https://a.example.com/proj.git"),
+            mirror_path("/cache", "https://b.example.com/proj.git"),
+        )
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestCloneProjectMirrorCache(unittest.TestCase):
+    def test_creates_worktree_from_mirror(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url, shas = _make_remote(tmp_dir, "proj")
+            cache_dir = os.path.join(tmp_dir, "cache")
+            dest = os.path.join(tmp_dir, "out", "proj")
+
+            clone_project("proj", url, shas[1], dest, cache_dir=cache_dir)
+
+            mirror = mirror_path(cache_dir, url)
+            self.assertTrue(has_commit(mirror, shas[1]))
+            self.assertEqual(_git("-C", dest, "rev-parse", "HEAD"), shas[1])
+            self.assertEqual(
+                os.path.realpath(_git("-C", dest, "rev-parse", "--git-common-dir")),
+                os.path.realpath(mirror),
+            )
+
+    def test_warm_cache_does_not_touch_remote(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url, shas = _make_remote(tmp_dir, "proj")
+            cache_dir = os.path.join(tmp_dir, "cache")
+            clone_project(
+                "proj", url, shas[0], os.path.join(tmp_dir, "a"), cache_dir=cache_dir
+            )
+
+            # The remote going away must not matter once the mirror is warm.
+            shutil.rmtree(url.removeprefix("file://"))
+            dest = os.path.join(tmp_dir, "b")
+            clone_project("proj", url, shas[0], dest, cache_dir=cache_dir)
+            self.assertEqual(_git("-C", dest, "rev-parse", "HEAD"), shas[0])
+
+    def test_recreates_deleted_worktree(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url, shas = _make_remote(tmp_dir, "proj")
+            cache_dir = os.path.join(tmp_dir, "cache")
+            dest = os.path.join(tmp_dir, "out", "proj")
+
+            clone_project("proj", url, shas[0], dest, cache_dir=cache_dir)
+            shutil.rmtree(dest)
+            clone_project("proj", url, shas[2], dest, cache_dir=cache_dir)
+
+            self.assertEqual(_git("-C", dest, "rev-parse", "HEAD"), shas[2])
+
+    def test_existing_dir_switches_to_new_pin(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url, shas = _make_remote(tmp_dir, "proj")
+            cache_dir = os.path.join(tmp_dir, "cache")
+            dest = os.path.join(tmp_dir, "out", "proj")
+
+            clone_project("proj", url, shas[0], dest)
+            clone_project("proj", url, shas[2], dest, cache_dir=cache_dir)
+
+            self.assertEqual(_git("-C", dest, "rev-parse", "HEAD"), shas[2])
 
 
 class TestCloneProjects(unittest.TestCase):
@@ -52,10 +311,20 @@ class TestCloneProjects(unittest.TestCase):
             self.assertTrue(os.path.isdir(work_dir))
             self.assertEqual(mock_clone.call_count, 2)
             mock_clone.assert_any_call(
-                "a", "https://example.com/a.git", "aaa", os.path.join(work_dir, "a")
+                "a",
+                "https://example.com/a.git",
+                "aaa",
+                os.path.join(work_dir, "a"),
+                filter_spec=None,
+                cache_dir=None,
             )
             mock_clone.assert_any_call(
-                "b", "https://example.com/b.git", "bbb", os.path.join(work_dir, "b")
+                "b",
+                "https://example.com/b.git",
+                "bbb",
+                os.path.join(work_dir, "b"),
+                filter_spec=None,
+                cache_dir=None,
             )
 
     @patch("testers.clone_projects.clone_project")
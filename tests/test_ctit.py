@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch
 
 from ctit import main
+from testers.result_store import DEFAULT_STORE
 
 
 class TestCtitCli(unittest.TestCase):
@@ -24,13 +25,294 @@ class TestCtitCli(unittest.TestCase):
     def test_clone_calls_clone_projects(self, mock_clone):
         main(["clone", "--work-dir", "/tmp/out", "--config", "custom.json"])
         mock_clone.assert_called_once_with(
-            work_dir="/tmp/out", config_path="custom.json"
+            work_dir="/tmp/out",
+            config_path="custom.json",
+            jobs=1,
+            filter_spec=None,
+            cache_dir=None,
+        )
+
+    @patch("ctit.clone_projects")
+    def test_clone_passes_jobs_and_filter(self, mock_clone):
+        main(["clone", "--jobs", "4", "--filter", "blob:none", "--cache-dir", "/c"])
+        mock_clone.assert_called_once_with(
+            work_dir="test_projects",
+            config_path="projects.json",
+            jobs=4,
+            filter_spec="blob:none",
+            cache_dir="/c",
         )
 
     @patch("ctit.generate_report")
     def test_report_calls_generate_report(self, mock_report):
         main(["report", "--log-dir", "/tmp/logs", "--output", "/tmp/out.md"])
-        mock_report.assert_called_once_with(log_dir="/tmp/logs", output="/tmp/out.md")
+        mock_report.assert_called_once_with(
+            log_dir="/tmp/logs",
+            output="/tmp/out.md",
+            jobs=1,
+            use_cache=True,
+            baseline=False,
+            max_bytes=60_000,
+            max_issues=0,
+            top_n=10,
+            details_output="issue-details.md.gz",
+            markdown=True,
+            summary_only=False,
+        )
+
+    @patch("ctit.generate_report")
+    def test_report_passes_jobs(self, mock_report):
+        main(["report", "--log-dir", "/tmp/logs", "--jobs", "4"])
+        mock_report.assert_called_once_with(
+            log_dir="/tmp/logs",
+            output="issue.md",
+            jobs=4,
+            use_cache=True,
+            baseline=False,
+            max_bytes=60_000,
+            max_issues=0,
+            top_n=10,
+            details_output="issue-details.md.gz",
+            markdown=True,
+            summary_only=False,
+        )
+
+    @patch("ctit.generate_report")
+    def test_report_no_cache(self, mock_report):
+        main(["report", "--no-cache"])
+        self.assertFalse(mock_report.call_args.kwargs["use_cache"])
+
+    @patch("ctit.generate_report")
+    def test_report_baseline(self, mock_report):
+        main(["report", "--baseline"])
+        self.assertTrue(mock_report.call_args.kwargs["baseline"])
+
+    @patch("ctit.generate_report")
+    def test_report_budget_options(self, mock_report):
+        main(["report", "--max-bytes", "0", "--max-issues", "50", "--top-n", "3"])
+        kwargs = mock_report.call_args.kwargs
+        self.assertEqual(kwargs["max_bytes"], 0)
+        self.assertEqual(kwargs["max_issues"], 50)
+        self.assertEqual(kwargs["top_n"], 3)
+
+    @patch("ctit.generate_report")
+    @patch("ctit.stream_report")
+    def test_report_stream(self, mock_stream, mock_report):
+        main(["report", "--stream", "--jobs", "2"])
+        mock_report.assert_not_called()
+        mock_stream.assert_called_once_with(
+            log_dir="logs",
+            output="issue.md",
+            jobs=2,
+            max_bytes=60_000,
+            max_issues=0,
+            top_n=10,
+            details_output="issue-details.md.gz",
+            markdown=True,
+            structured_outputs={},
+            store=None,
+        )
+
+    @patch("ctit.write_result_formats")
+    @patch("ctit.generate_report")
+    def test_report_formats(self, mock_report, mock_formats):
+        main(
+            ["report", "--format", "json", "--format", "sarif"]
+            + ["--sarif-output", "out.sarif.gz"]
+        )
+        self.assertFalse(mock_report.call_args.kwargs["markdown"])
+        outputs, results, _ = mock_formats.call_args.args
+        self.assertEqual(outputs, {"json": "issue.json", "sarif": "out.sarif.gz"})
+        self.assertIs(results, mock_report.return_value)
+
+    @patch("ctit.stream_report")
+    def test_report_stream_store(self, mock_stream):
+        main(["report", "--stream", "--store"])
+        self.assertEqual(mock_stream.call_args.kwargs["store"], DEFAULT_STORE)
+
+    def test_report_stream_rejects_baseline(self):
+        with self.assertRaises(SystemExit) as ctx:
+            with patch("sys.stderr"):
+                main(["report", "--stream", "--baseline"])
+        self.assertNotEqual(ctx.exception.code, 0)
+
+    @patch("ctit.generate_report")
+    def test_report_summary_only(self, mock_report):
+        main(["report", "--summary-only"])
+        self.assertTrue(mock_report.call_args.kwargs["summary_only"])
+
+    def test_report_summary_only_rejects_store(self):
+        with self.assertRaises(SystemExit) as ctx:
+            with patch("sys.stderr"):
+                main(["report", "--summary-only", "--store", "s.sqlite"])
+        self.assertNotEqual(ctx.exception.code, 0)
+
+    @patch("ctit.store_results")
+    @patch("ctit.generate_report")
+    def test_report_store(self, mock_report, mock_store):
+        main(["report", "--store", "/tmp/store.sqlite"])
+        mock_store.assert_called_once_with(
+            "/tmp/store.sqlite", mock_report.return_value
+        )
+
+    @patch("ctit.store_results")
+    @patch("ctit.generate_report")
+    def test_report_store_default(self, mock_report, mock_store):
+        main(["report", "--store"])
+        mock_store.assert_called_once_with(DEFAULT_STORE, mock_report.return_value)
+
+    @patch("ctit.store_results")
+    @patch("ctit.generate_report")
+    def test_report_without_store(self, mock_report, mock_store):
+        main(["report"])
+        mock_store.assert_not_called()
+
+    @patch("ctit.query")
+    def test_query_calls_query(self, mock_query):
+        main(["query", "issues", "--store", "s.sqlite", "--check", "c", "--run", "3"])
+        mock_query.assert_called_once_with(
+            path="s.sqlite",
+            what="issues",
+            check_name="c",
+            project=None,
+            file_path=None,
+            pr_link=None,
+            run_id=3,
+            limit=None,
+        )
+
+    @patch("ctit.run_project")
+    def test_run_calls_run_project(self, mock_run):
+        main(["run", "proj", "--build-dir", "/b", "--check", "bugprone-foo"])
+        kwargs = mock_run.call_args.kwargs
+        self.assertEqual(kwargs["project"], "proj")
+        self.assertEqual(kwargs["build_dir"], "/b")
+        self.assertEqual(kwargs["request"].check_name, "bugprone-foo")
+
+    @patch("ctit.run_project")
+    def test_run_prefilter_options(self, mock_run):
+        main(
+            ["run", "proj", "--build-dir", "/b", "--check", "c"]
+            + ["--filter-token", "move", "--filter-token", "forward"]
+            + ["--verify-sample", "3", "--full"]
+        )
+        kwargs = mock_run.call_args.kwargs
+        self.assertEqual(kwargs["filter_tokens"], ["move", "forward"])
+        self.assertEqual(kwargs["verify_sample"], 3)
+        self.assertTrue(kwargs["full"])
+
+    @patch.dict("os.environ", {"LLVM_REVISION": "abc123"})
+    @patch("ctit.run_project")
+    def test_run_baseline_options(self, mock_run):
+        main(
+            ["run", "proj", "--build-dir", "/b", "--check", "c"]
+            + ["--baseline-clang-tidy", "/up/clang-tidy"]
+            + ["--baseline-cache-dir", "/cache"]
+        )
+        kwargs = mock_run.call_args.kwargs
+        self.assertEqual(kwargs["baseline_clang_tidy"], "/up/clang-tidy")
+        self.assertEqual(kwargs["baseline_cache_dir"], "/cache")
+        self.assertEqual(kwargs["llvm_revision"], "abc123")
+
+    @patch("ctit.run_project")
+    def test_run_profile(self, mock_run):
+        main(["run", "proj", "--build-dir", "/b", "--check", "c"])
+        self.assertFalse(mock_run.call_args.kwargs["profile"])
+        main(["run", "proj", "--build-dir", "/b", "--check", "c", "--profile"])
+        self.assertTrue(mock_run.call_args.kwargs["profile"])
+
+    @patch("ctit.run_project")
+    def test_run_unit_cache(self, mock_run):
+        main(
+            ["run", "proj", "--build-dir", "/b", "--check", "c"]
+            + ["--unit-cache-dir", "/uc", "--unit-cache-max-bytes", "1000"]
+        )
+        kwargs = mock_run.call_args.kwargs
+        self.assertEqual(kwargs["unit_cache_dir"], "/uc")
+        self.assertEqual(kwargs["unit_cache_max_bytes"], 1000)
+
+    @patch.dict("os.environ", {"CHECK_NAME": "env-check", "TIDY_CONFIG": "{}"})
+    @patch("ctit.run_project")
+    def test_run_reads_check_from_env(self, mock_run):
+        main(["run", "proj", "--build-dir", "/b"])
+        request = mock_run.call_args.kwargs["request"]
+        self.assertEqual(request.check_name, "env-check")
+        self.assertEqual(request.tidy_config, "{}")
+
+    @patch.dict("os.environ", {"TIDY_CONFIG_MATRIX": '{"Mode=a": "{}"}'})
+    @patch("ctit.run_project")
+    def test_run_config_matrix(self, mock_run):
+        main(["run", "proj", "--build-dir", "/b", "--check", "c"])
+        request = mock_run.call_args.kwargs["request"]
+        self.assertEqual(request.config_matrix, {"Mode=a": "{}"})
+        with self.assertRaises(SystemExit), patch("sys.stderr"):
+            main(
+                ["run", "proj", "--build-dir", "/b", "--check", "c"]
+                + ["--config-matrix", "[1]"]
+            )
+
+    @patch.dict("os.environ", {"CHECK_NAME": ""})
+    def test_run_requires_check(self):
+        with self.assertRaises(SystemExit) as ctx:
+            with patch("sys.stderr"):
+                main(["run", "proj", "--build-dir", "/b"])
+        self.assertNotEqual(ctx.exception.code, 0)
+
+    @patch.dict(
+        "os.environ",
+        {
+            "LLVM_REVISION": "abc",
+            "PATCH_SHA256": "def",
+            "CTIT_BUILD_CACHE_DIR": "",
+            "CTIT_BUILD_TREE_DIR": "",
+        },
+    )
+    @patch("ctit.build_clang_tidy")
+    def test_build_calls_build_clang_tidy(self, mock_build):
+        main(["build"])
+        mock_build.assert_called_once_with(
+            build_dir="llvm-project/build",
+            build_script="build.sh",
+            cache_dir=None,
+            cache_max_bytes=10 << 30,
+            llvm_revision="abc",
+            patch_sha256="def",
+            llvm_dir="llvm-project",
+            tree_dir=None,
+            patch=None,
+            keep_trees=2,
+        )
+        main(["build", "--cache-dir", "/c", "--cache-max-bytes", "100"])
+        kwargs = mock_build.call_args.kwargs
+        self.assertEqual(kwargs["cache_dir"], "/c")
+        self.assertEqual(kwargs["cache_max_bytes"], 100)
+
+    @patch.dict("os.environ", {"CTIT_BUILD_TREE_DIR": "/trees"})
+    @patch("ctit.build_clang_tidy")
+    def test_build_incremental_options(self, mock_build):
+        main(["build", "--patch", "patch.diff", "--keep-trees", "3"])
+        kwargs = mock_build.call_args.kwargs
+        self.assertEqual(kwargs["tree_dir"], "/trees")
+        self.assertEqual(kwargs["patch"], "patch.diff")
+        self.assertEqual(kwargs["keep_trees"], 3)
+
+    def test_bench_help(self):
+        with self.assertRaises(SystemExit) as ctx:
+            main(["bench", "--help"])
+        self.assertEqual(ctx.exception.code, 0)
+
+    @patch("ctit.bench")
+    def test_bench_calls_bench(self, mock_bench):
+        main(["bench", "--diagnostics", "10", "--duplicate-ratio", "0.5"])
+        mock_bench.assert_called_once_with(
+            output="bench.json",
+            diagnostics=10,
+            crash_density=0.0,
+            duplicate_ratio=0.5,
+            seed=0,
+            compare=None,
+            issue_memory=False,
+        )
 
     def test_no_subcommand_exits_nonzero(self):
         with self.assertRaises(SystemExit) as ctx:
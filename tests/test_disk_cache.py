@@ -0,0 +1,54 @@
+import glob
+import os
+import tempfile
+import time
+import unittest
+
+from testers.disk_cache import DiskCache
+
+
+class _TextCache(DiskCache):
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.txt"
+
+    def _meta_paths(self):
+        return glob.glob(os.path.join(self.cache_dir, "*.json"))
+
+    def _entry_size(self, meta_path, payload_path):
+        return os.path.getsize(payload_path)
+
+    def store(self, key, text):
+        meta_path, payload_path = self._paths(key)
+        with open(payload_path, "w") as f:
+            f.write(text)
+        self._write_meta(meta_path, {})
+
+
+class TestDiskCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = _TextCache(tmp_dir, max_bytes=20)
+            for i, key in enumerate(("old", "used", "new")):
+                cache.store(key, "x" * 10)
+                past = time.time() - 100 + i
+                os.utime(cache._paths(key)[0], (past, past))
+            cache._touch(cache._paths("used")[0])
+
+            self.assertEqual(cache.evict(), 1)
+            self.assertEqual(
+                sorted(os.listdir(tmp_dir)),
+                ["new.json", "new.txt", "used.json", "used.txt"],
+            )
+
+    def test_skips_incomplete_entries(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = _TextCache(tmp_dir, max_bytes=0)
+            cache.store("a", "x")
+            os.remove(cache._paths("a")[1])
+            self.assertEqual(cache.evict(), 0)
+            self.assertTrue(os.path.exists(cache._paths("a")[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,19 +1,77 @@
+import gzip
 import io
 import os
+import random
+import resource
 import tempfile
+import tracemalloc
 import unittest
 from unittest.mock import patch
 
 from testers.generate_report import (
+    CrashRecord,
     Issue,
     ProjectResult,
+    ISSUE_PATTERN,
+    ReportBudget,
+    ResultDiff,
+    baseline_path,
+    diff_results,
+    fair_share,
+    fingerprint,
     generate_markdown,
+    find_log_files,
     generate_report,
     get_relative_path,
+    group_crashes,
+    iter_log_issues,
+    match_issue_line,
+    matrix_diffs,
+    matrix_project,
+    matrix_project_name,
+    merge_results,
+    message_group,
+    normalize_frame,
     parse_log_file,
+    parse_log_files,
+    result_from_dict,
+    result_to_dict,
+    scan_log_summary,
+    write_budgeted_issues,
     write_project_details,
+    write_project_diff,
+    write_project_performance,
     write_summary_table,
 )
+from testers.baseline import write_baseline
+from testers.benchmark import generate_synthetic_log
+from testers.parse_cache import CACHE_FILE
+from testers.run_profile import (
+    RunProfile,
+    UnitProfile,
+    run_profile_path,
+    write_run_profile,
+)
+
+CRASH_DUMP = (
+    "PLEASE submit a bug report to https://github.com/llvm/llvm-project/issues/ "
+    "and include the crash backtrace.\n"
+    "Stack dump:\n"
+    "0.\tProgram arguments: /bin/clang-tidy -p build -quiet -export-fixes "
+    "/tmp/fixes.yaml -checks=-*,bugprone-foo /w/proj/src/a.cpp\n"
+    "1.\t<eof> parser at end of file\n"
+    "2.\tASTMatcher: Processing 'bugprone-foo' against:\n"
+    "\tCXXRecordDecl S : <src/a.cpp:1:1, col:10>\n"
+    " #0 0x000055d5e1b0a6a1 llvm::sys::PrintStackTrace(llvm::raw_ostream&, int) "
+    "(/bin/clang-tidy+0x1b0a6a1)\n"
+    " #1 0x000055d5e1b08f7e SignalHandler(int) Signals.cpp:0:0\n"
+    " #2 0x00007f3c0c842520 (/lib/x86_64-linux-gnu/libc.so.6+0x42520)\n"
+    " #3 0x000055d5e0c1d2e3 clang::tidy::bugprone::FooCheck::check("
+    "clang::ast_matchers::MatchFinder::MatchResult const&) "
+    "(/bin/clang-tidy+0xc1d2e3)\n"
+    " #4 0x000055d5e15a0b11 (/bin/clang-tidy+0x15a0b11)\n"
+    "Segmentation fault (core dumped)\n"
+)
 
 
 class TestProjectResultStatus(unittest.TestCase):
@@ -63,6 +121,11 @@ class TestGetRelativePath(unittest.TestCase):
         path = "/root/_work/cppcheck/src/deep/nested/file.h"
         self.assertEqual(get_relative_path(path, "cppcheck"), "src/deep/nested/file.h")
 
+    def test_matrix_config_path(self):
+        path = "/root/_work/cppcheck/lib/token.cpp"
+        name = matrix_project_name("cppcheck", 0, "Mode=a")
+        self.assertEqual(get_relative_path(path, name), "lib/token.cpp")
+
     def testtest_projects_dir_takes_priority(self):
         path = "/root/test_projects/cppcheck/test-projects/cppcheck/file.cpp"
         self.assertEqual(
@@ -163,6 +226,37 @@ class TestParseLogFile(unittest.TestCase):
             self.assertEqual(result.name, "nonexistent")
             self.assertEqual(result.warnings_count, 0)
 
+    def test_duplicate_issues_counted_once(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            header_warning = (
+                "/path/proj/include/a.h:5:1: warning: msg [check-a]\n" "  int x;\n"
+            )
+            log = (
+                header_warning
+                + "/path/proj/src/a.cpp:1:1: error: other [check-b]\n"
+                + header_warning
+                + header_warning
+            )
+            path = self._write_log(tmp_dir, "proj", log)
+            result = parse_log_file(path)
+            self.assertEqual(result.warnings_count, 1)
+            self.assertEqual(result.raw_warnings_count, 3)
+            self.assertEqual(result.errors_count, 1)
+            self.assertEqual(result.raw_errors_count, 1)
+            self.assertEqual(len(result.issues), 2)
+            self.assertEqual(result.issues[0].context, "int x;")
+
+    def test_same_location_different_check_not_deduplicated(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log = (
+                "/path/a.cpp:1:1: warning: msg [check-a]\n"
+                "/path/a.cpp:1:1: warning: msg [check-b]\n"
+            )
+            path = self._write_log(tmp_dir, "proj", log)
+            result = parse_log_file(path)
+            self.assertEqual(result.warnings_count, 2)
+            self.assertEqual(len(result.issues), 2)
+
     def test_noise_lines_ignored(self):
         with tempfile.TemporaryDirectory() as tmp_dir:
             log = (
@@ -177,6 +271,455 @@ class TestParseLogFile(unittest.TestCase):
             self.assertEqual(len(result.issues), 1)
 
 
+def _synthetic_log_lines(total_bytes, issue_every=100_000):
+    """Lazily yields clang-tidy-like log lines totalling ``total_bytes``."""
+    noise = "    some_function_call(argument_one, argument_two);  // context\n"
+    caret = "    ^~~~~~~~~~~~~~~~~~~~~\n"
+    issue = "/work/test_projects/proj/src/file.cpp:{}:5: warning: msg [check-a]\n"
+    written = 0
+    i = 0
+    while written < total_bytes:
+        if i % issue_every == 0:
+            line = issue.format(i)
+        else:
+            line = noise if i % 2 else caret
+        written += len(line)
+        i += 1
+        yield line
+
+
+class TestIterLogIssues(unittest.TestCase):
+    def test_yields_issues_lazily(self):
+        def lines():
+            yield "/path/a.cpp:1:1: warning: msg [check-a]\n"
+            yield "  int x;\n"
+            raise AssertionError("read past the lookahead line")
+
+        result = ProjectResult(name="proj")
+        issue = next(iter_log_issues(lines(), result))
+        self.assertEqual(issue.context, "int x;")
+        self.assertEqual(result.warnings_count, 1)
+
+    def test_does_not_append_to_result(self):
+        result = ProjectResult(name="proj")
+        lines = ["/path/a.cpp:1:1: warning: msg [check-a]\n"]
+        issues = list(iter_log_issues(lines, result))
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(result.issues, [])
+
+    def test_last_line_issue_has_no_context(self):
+        result = ProjectResult(name="proj")
+        lines = ["noise\n", "/path/a.cpp:1:1: error: msg [check-a]"]
+        issues = list(iter_log_issues(lines, result))
+        self.assertIsNone(issues[0].context)
+        self.assertEqual(result.errors_count, 1)
+
+    def test_crash_line_used_as_context(self):
+        result = ProjectResult(name="proj")
+        lines = ["/path/a.cpp:1:1: warning: msg [check-a]\n", "Stack dump:\n"]
+        issues = list(iter_log_issues(lines, result))
+        self.assertEqual(issues[0].context, "Stack dump:")
+        self.assertTrue(result.has_crash)
+
+    def test_memory_is_flat(self):
+        result = ProjectResult(name="proj")
+        tracemalloc.start()
+        try:
+            lines = _synthetic_log_lines(8 << 20)
+            count = sum(1 for _ in iter_log_issues(lines, result))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(count, 0)
+        self.assertLess(peak, 1 << 20)
+
+    @unittest.skipUnless(
+        os.environ.get("CTIT_LARGE_TESTS"), "set CTIT_LARGE_TESTS=1 to run"
+    )
+    def test_multi_gigabyte_log(self):
+        total_bytes = 3 << 30
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "proj.log")
+            with open(path, "w") as f:
+                f.writelines(_synthetic_log_lines(total_bytes))
+
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            result = parse_log_file(path)
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        self.assertGreater(result.warnings_count, 0)
+        self.assertEqual(len(result.issues), result.warnings_count)
+        # ru_maxrss is reported in KiB on Linux.
+        self.assertLess(rss_after - rss_before, 64 << 10)
+
+
+class TestMatchIssueLine(unittest.TestCase):
+    def _assert_matches_regex(self, line):
+        match = ISSUE_PATTERN.match(line)
+        self.assertEqual(match_issue_line(line), match and match.groups(), line)
+
+    def test_splits_diagnostic(self):
+        self.assertEqual(
+            match_issue_line("/p/a.cpp:10:5: warning: use 'x' [check-a]"),
+            ("/p/a.cpp", "10", "5", "warning", "use 'x'", "check-a"),
+        )
+
+    def test_rejects_non_diagnostics(self):
+        for line in ["  int x;", "      ^", "a.cpp:1:1: note: here", ""]:
+            self.assertIsNone(match_issue_line(line))
+
+    def test_ambiguous_lines_match_regex(self):
+        for line in [
+            r"C:\w\test_projects\p\a.cpp:1:2: error: m [c]",
+            "/p/a:b.cpp:3:4: warning: m [c]",
+            "/p/a.cpp:1:2: warning: says 'x: error: y' [c]",
+            "/p/a.cpp:1:2: warning: m [a] [c]",
+            "/p/a.cpp:1:2: warning: m [c] x: warning: []",
+            "/p/a.cpp:1:x: warning: m [c]",
+            "/p/a.cpp:1:2: warning:  [c]",
+            "/p/a.cpp:1:2: warning: m []]",
+            ":1:2: warning: m [c]",
+        ]:
+            self._assert_matches_regex(line)
+
+    def test_random_lines_match_regex(self):
+        rng = random.Random(0)
+        parts = [
+            *("/p", "a.cpp", ":", "1", "12", " ", "[", "]", " [", "c", "x"),
+            *(": warning: ", ": error: "),
+        ]
+        for _ in range(5_000):
+            line = "".join(rng.choice(parts) for _ in range(rng.randint(1, 12)))
+            self._assert_matches_regex(line)
+
+
+class TestScanLogSummary(unittest.TestCase):
+    def _write(self, tmp_dir, name, content):
+        path = os.path.join(tmp_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_matches_parsed_counts(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "proj.log")
+            generate_synthetic_log(path, 2_000, crash_density=0.01, duplicate_ratio=0.2)
+            parsed = parse_log_file(path, "proj")
+            parsed.issues, parsed.crashes = [], []
+            self.assertEqual(scan_log_summary("proj", [path]), parsed)
+
+    def test_dedups_across_shards(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            shared = "/w/proj/common.h:1:1: warning: m [c]\n"
+            paths = [
+                self._write(tmp_dir, "a.log", shared + "    int a;\n"),
+                self._write(tmp_dir, "b.log", shared + "/w/proj/b.cpp:2:2: error: e"),
+                self._write(tmp_dir, "empty.log", ""),
+            ]
+            result = scan_log_summary("proj", paths)
+        self.assertEqual((result.warnings_count, result.raw_warnings_count), (1, 2))
+        self.assertEqual((result.errors_count, result.raw_errors_count), (0, 0))
+        self.assertFalse(result.has_crash)
+        self.assertEqual(result.issues, [])
+
+    def test_line_with_both_markers_counts_once(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = self._write(
+                tmp_dir,
+                "proj.log",
+                "/w/a.cpp:1:1: warning: says 'x: error: y' [c]\n"
+                "/w/a.cpp:2:1: error: says 'x: warning: y' [c]\n"
+                "/w/a.cpp:3:1: warning: m [c]\nStack dump:\n",
+            )
+            result = scan_log_summary("proj", [path])
+            parsed = parse_log_file(path, "proj")
+        self.assertEqual(result.warnings_count, 2)
+        self.assertEqual(result.errors_count, 1)
+        self.assertTrue(result.has_crash)
+        parsed.issues, parsed.crashes = [], []
+        self.assertEqual(result, parsed)
+
+    def test_crash_lines_match_parsing(self):
+        lines = [
+            "PLEASE submit a bug report to https://llvm.org/bugs/ and include it.",
+            "Stack dump without symbol names (ensure llvm-symbolizer is in PATH):",
+            "  Stack dump:",
+            "Segmentation fault (core dumped)",
+            "error: Stack dump: in message [c]",
+            "note: PLEASE submit a bug report mentioned mid-line",
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for line in lines:
+                path = self._write(
+                    tmp_dir, "proj.log", f"/w/a.cpp:1:1: warning: m [c]\n{line}\n"
+                )
+                parsed = parse_log_file(path, "proj")
+                parsed.issues, parsed.crashes = [], []
+                with self.subTest(line=line):
+                    self.assertEqual(scan_log_summary("proj", [path]), parsed)
+                    self.assertEqual(parsed.has_crash, "mid-line" not in line)
+
+
+class TestCrashRecord(unittest.TestCase):
+    def _crashes(self, log):
+        result = ProjectResult(name="proj")
+        issues = list(iter_log_issues(log.splitlines(keepends=True), result))
+        return result, issues
+
+    def test_extracts_crash_dump(self):
+        result, _ = self._crashes(CRASH_DUMP)
+        self.assertTrue(result.has_crash)
+        (crash,) = result.crashes
+        self.assertTrue(crash.bug_report.startswith("PLEASE submit a bug report"))
+        self.assertEqual(crash.source_file, "/w/proj/src/a.cpp")
+        self.assertEqual(
+            crash.stack_context[:2],
+            [
+                "<eof> parser at end of file",
+                "ASTMatcher: Processing 'bugprone-foo' against:",
+            ],
+        )
+        self.assertEqual(len(crash.frames), 5)
+        self.assertEqual(
+            crash.signature_frames(),
+            [
+                "clang::tidy::bugprone::FooCheck::check("
+                "clang::ast_matchers::MatchFinder::MatchResult const&)",
+                "clang-tidy+0x15a0b11",
+            ],
+        )
+        self.assertEqual(
+            crash.repro_command,
+            "/bin/clang-tidy -p build -checks=-*,bugprone-foo /w/proj/src/a.cpp",
+        )
+
+    def test_signature_ignores_addresses(self):
+        relocated = CRASH_DUMP.replace("0x000055d5", "0x00006612")
+        other = CRASH_DUMP.replace("FooCheck", "BarCheck")
+        result, _ = self._crashes(CRASH_DUMP + relocated + other)
+        first, second, third = result.crashes
+        self.assertEqual(first.signature, second.signature)
+        self.assertNotEqual(first.signature, third.signature)
+        self.assertEqual([len(g) for g in group_crashes(result.crashes)], [2, 1])
+
+    def test_diagnostic_after_frames_ends_dump(self):
+        log = CRASH_DUMP.replace("Segmentation fault (core dumped)\n", "")
+        log += "/w/proj/a.cpp:1:1: warning: m [c]\n    int a;\n #9 0x1 late()\n"
+        result, issues = self._crashes(log)
+        self.assertEqual(len(result.crashes), 1)
+        self.assertEqual(len(result.crashes[0].frames), 5)
+        self.assertEqual(issues[0].context, "int a;")
+
+    def test_interleaved_diagnostic_keeps_dump_open(self):
+        header, frames = CRASH_DUMP.split(" #0 ", 1)
+        diagnostic = "/w/proj/b.cpp:2:1: warning: other [c]\n    int b;\n"
+        result, issues = self._crashes(header + diagnostic + " #0 " + frames)
+        (crash,) = result.crashes
+        self.assertEqual(len(crash.frames), 5)
+        self.assertEqual(
+            crash.signature, self._crashes(CRASH_DUMP)[0].crashes[0].signature
+        )
+        self.assertEqual([i.message for i in issues], ["other"])
+        self.assertEqual(issues[0].context, "int b;")
+
+    def test_normalize_frame(self):
+        for frame, expected in [
+            ("#0 0x1f foo() (/bin/clang-tidy+0x1f)", "foo()"),
+            ("#1 0x1f (/lib/libc.so.6+0x42520)", "libc.so.6+0x42520"),
+            ("#2 0x1f foo() /src/Foo.cpp:12:3", "foo()"),
+            ("3  clang-tidy 0x000055c4a2e0f1d1 foo(int) + 81", "foo(int)"),
+            ("4  libc.so.6 0x00007f3c0c842520", "libc.so.6"),
+        ]:
+            self.assertEqual(normalize_frame(frame), expected)
+
+    def test_repro_without_program_arguments(self):
+        self.assertIsNone(CrashRecord().repro_command)
+        self.assertIsNone(CrashRecord().source_file)
+
+
+class TestParseLogFiles(unittest.TestCase):
+    def _write_logs(self, tmp_dir):
+        paths = []
+        for name in ("zeta", "alpha", "mid"):
+            path = os.path.join(tmp_dir, f"{name}.log")
+            with open(path, "w") as f:
+                f.write(f"/path/{name}/a.cpp:1:1: warning: msg [check-{name}]\n")
+                f.write("  int x;\n")
+            paths.append(path)
+        return paths
+
+    def test_sorted_by_name(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            results = parse_log_files(self._write_logs(tmp_dir))
+            self.assertEqual([r.name for r in results], ["alpha", "mid", "zeta"])
+
+    def test_parallel_matches_serial(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = self._write_logs(tmp_dir)
+            self.assertEqual(parse_log_files(paths, jobs=3), parse_log_files(paths))
+
+
+class TestLogShards(unittest.TestCase):
+    def test_find_log_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "llvm"))
+            for rel in ("cppcheck.log", "llvm/00001-b.cpp.log", "llvm/00000-a.cpp.log"):
+                open(os.path.join(tmp_dir, rel), "w").close()
+
+            log_files, names = find_log_files(tmp_dir)
+            self.assertEqual(
+                [os.path.relpath(p, tmp_dir) for p in log_files],
+                ["cppcheck.log", "llvm/00000-a.cpp.log", "llvm/00001-b.cpp.log"],
+            )
+            self.assertEqual(names, ["cppcheck", "llvm", "llvm"])
+
+    def test_merge_results(self):
+        shared = Issue("common.h", 1, 1, "warning", "msg", "check")
+        a = ProjectResult(
+            name="proj",
+            warnings_count=2,
+            raw_warnings_count=2,
+            issues=[shared, Issue("a.cpp", 1, 1, "warning", "msg", "check")],
+        )
+        b = ProjectResult(
+            name="proj",
+            warnings_count=1,
+            errors_count=1,
+            has_crash=True,
+            raw_warnings_count=3,
+            raw_errors_count=1,
+            issues=[shared, Issue("b.cpp", 1, 1, "error", "msg", "check")],
+        )
+        merged = merge_results("proj", [a, b])
+        self.assertEqual(merged.warnings_count, 2)
+        self.assertEqual(merged.errors_count, 1)
+        self.assertEqual(merged.raw_warnings_count, 5)
+        self.assertEqual(merged.raw_errors_count, 1)
+        self.assertTrue(merged.has_crash)
+        self.assertEqual(
+            [i.file_path for i in merged.issues], ["common.h", "a.cpp", "b.cpp"]
+        )
+
+
+class TestResultSerialization(unittest.TestCase):
+    def test_round_trip(self):
+        result = ProjectResult(
+            name="proj",
+            warnings_count=1,
+            has_crash=True,
+            issues=[Issue("a.cpp", 1, 2, "warning", "msg", "check", "int x;")],
+            crashes=[CrashRecord("clang-tidy a.cpp", None, ["ctx"], ["#0 0x1 f()"])],
+        )
+        self.assertEqual(result_from_dict(result_to_dict(result)), result)
+
+
+class TestDiffResults(unittest.TestCase):
+    def _result(self, issues):
+        return ProjectResult(name="proj", issues=issues)
+
+    def test_fingerprint_ignores_location_and_whitespace(self):
+        a = Issue("a.cpp", 10, 5, "warning", "msg", "check", "  int  x;")
+        b = Issue("a.cpp", 42, 1, "warning", "msg", "check", "int x;")
+        self.assertEqual(fingerprint(a), fingerprint(b))
+
+    def test_fingerprint_distinguishes_message_and_file(self):
+        a = Issue("a.cpp", 1, 1, "warning", "msg", "check")
+        self.assertNotEqual(
+            fingerprint(a), fingerprint(Issue("b.cpp", 1, 1, "warning", "msg", "check"))
+        )
+        self.assertNotEqual(
+            fingerprint(a), fingerprint(Issue("a.cpp", 1, 1, "warning", "x", "check"))
+        )
+
+    def test_shifted_lines_are_unchanged(self):
+        baseline = self._result([Issue("a.cpp", 10, 5, "warning", "m", "c", "x;")])
+        patched = self._result([Issue("a.cpp", 14, 5, "warning", "m", "c", "x;")])
+        diff = diff_results(baseline, patched)
+        self.assertEqual((diff.added, diff.removed), ([], []))
+
+    def test_added_and_removed(self):
+        kept = Issue("a.cpp", 1, 1, "warning", "kept", "c")
+        gone = Issue("a.cpp", 2, 1, "warning", "gone", "c")
+        new = Issue("a.cpp", 3, 1, "warning", "new", "c")
+        diff = diff_results(self._result([kept, gone]), self._result([kept, new]))
+        self.assertEqual(diff.added, [new])
+        self.assertEqual(diff.removed, [gone])
+
+    def test_matches_duplicates_as_multiset(self):
+        issue = Issue("a.cpp", 1, 1, "warning", "m", "c", "x;")
+        again = Issue("a.cpp", 9, 1, "warning", "m", "c", "x;")
+        diff = diff_results(self._result([issue]), self._result([issue, again]))
+        self.assertEqual(diff.added, [again])
+        self.assertEqual(diff.removed, [])
+
+
+class TestMatrixDiffs(unittest.TestCase):
+    def test_project_names_sort_in_matrix_order(self):
+        names = [matrix_project_name("proj", k, "Mode=a b/c") for k in (10, 2)]
+        self.assertEqual(names, ["proj@10-Mode=a_b_c", "proj@02-Mode=a_b_c"])
+        self.assertEqual(matrix_project(names[0]), "proj")
+        self.assertIsNone(matrix_project("proj"))
+
+    def test_splits_common_and_specific_findings(self):
+        shared = Issue("/w/proj/a.cpp", 1, 1, "warning", "shared", "c", "x;")
+        strict = Issue("/w/proj/a.cpp", 2, 1, "warning", "strict", "c", "y;")
+        loose = Issue("/w/proj/b.cpp", 3, 1, "warning", "loose", "c", "z;")
+        results = [
+            ProjectResult(name="proj@00-Strict=false", issues=[shared, loose]),
+            ProjectResult(name="proj@01-Strict=true", issues=[strict, shared]),
+            ProjectResult(name="other", issues=[shared]),
+        ]
+        (matrix,) = matrix_diffs(results).values()
+        self.assertEqual(matrix.name, "proj")
+        self.assertEqual(matrix.common, [shared])
+        self.assertEqual(
+            matrix.only,
+            {"proj@00-Strict=false": [loose], "proj@01-Strict=true": [strict]},
+        )
+
+    def test_report_lists_common_findings_once(self):
+        shared = Issue("/w/proj/a.cpp", 1, 1, "warning", "shared-msg", "c", "x;")
+        strict = Issue("/w/proj/a.cpp", 2, 1, "warning", "strict-msg", "c", "y;")
+        results = [
+            ProjectResult(name="proj@00-Strict=false", issues=[shared]),
+            ProjectResult(name="proj@01-Strict=true", issues=[shared, strict]),
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "report.md")
+            generate_markdown(results, output_path, matrices=matrix_diffs(results))
+            with open(output_path) as f:
+                content = f.read()
+        self.assertIn("proj Across 2 configs (1 common, 1 config-specific)", content)
+        self.assertEqual(content.count("shared-msg"), 1)
+        self.assertLess(
+            content.index("Only with `01-Strict=true`"), content.index("strict-msg")
+        )
+        self.assertNotIn("Only with `00-Strict=false`", content)
+
+
+class TestWriteProjectDiff(unittest.TestCase):
+    def test_writes_added_and_removed_sections(self):
+        result = ProjectResult(name="proj")
+        diff = ResultDiff(
+            name="proj",
+            added=[Issue("/w/proj/a.cpp", 1, 1, "warning", "new", "check-a")],
+            removed=[Issue("/w/proj/b.cpp", 2, 1, "warning", "old", "check-b")],
+        )
+        f = io.StringIO()
+        write_project_diff(f, result, diff, {})
+        content = f.getvalue()
+        self.assertIn("+1 added, -1 removed", content)
+        self.assertLess(content.index("Added"), content.index("new"))
+        self.assertLess(content.index("Removed"), content.index("old"))
+        self.assertIn("#### ➕ Added findings", content)
+        self.assertIn("##### 📄 `/w/proj/a.cpp`", content)
+
+    def test_skips_unchanged_project(self):
+        f = io.StringIO()
+        write_project_diff(f, ProjectResult(name="proj"), ResultDiff(name="proj"), {})
+        self.assertEqual(f.getvalue(), "")
+
+
 class TestWriteSummaryTable(unittest.TestCase):
     def test_single_project_pass(self):
         f = io.StringIO()
@@ -204,6 +747,28 @@ class TestWriteSummaryTable(unittest.TestCase):
         self.assertIn("| **a** |", output)
         self.assertIn("| **b** |", output)
 
+    def test_raw_counts_shown_when_duplicated(self):
+        f = io.StringIO()
+        results = [
+            ProjectResult(
+                name="proj",
+                warnings_count=2,
+                errors_count=1,
+                raw_warnings_count=7,
+                raw_errors_count=1,
+            )
+        ]
+        write_summary_table(f, results)
+        output = f.getvalue()
+        self.assertIn("| 2 (7 raw) | 1 | - |", output)
+        self.assertIn("raw counts include repeats", output)
+
+    def test_no_raw_note_without_duplicates(self):
+        f = io.StringIO()
+        results = [ProjectResult(name="proj", warnings_count=1, raw_warnings_count=1)]
+        write_summary_table(f, results)
+        self.assertNotIn("raw", f.getvalue())
+
     def test_header_present(self):
         f = io.StringIO()
         write_summary_table(f, [])
@@ -227,6 +792,17 @@ class TestWriteProjectDetails(unittest.TestCase):
         self.assertIn("CRASH DETECTED", output)
         self.assertIn("<details>", output)
 
+    def test_crash_signatures(self):
+        result = ProjectResult(name="proj", has_crash=True)
+        list(iter_log_issues(CRASH_DUMP.splitlines() * 2, result))
+        f = io.StringIO()
+        write_project_details(f, result, {})
+        output = f.getvalue()
+        self.assertIn("Crash signatures", output)
+        self.assertIn(f"**2 crashes** `{result.crashes[0].signature}`", output)
+        self.assertIn("Files: `/w/proj/src/a.cpp`", output)
+        self.assertIn("  /bin/clang-tidy -p build -checks=-*,bugprone-foo", output)
+
     def test_warning_with_context(self):
         f = io.StringIO()
         issue = Issue(
@@ -297,6 +873,44 @@ class TestWriteProjectDetails(unittest.TestCase):
         self.assertIn("1:1", output)
         self.assertNotIn("https://", output)
 
+    def test_sections_per_check(self):
+        issues = [
+            Issue("a.cpp", 1, 1, "warning", "m1", "check-b"),
+            Issue("b.cpp", 2, 2, "warning", "m2", "check-a"),
+            Issue("a.cpp", 3, 3, "warning", "m3", "check-b"),
+        ]
+        result = ProjectResult(name="proj", warnings_count=3, issues=issues)
+        f = io.StringIO()
+        write_project_details(f, result, {})
+        output = f.getvalue()
+        b = output.index("#### 🔎 `check-b` (2 issues)")
+        a = output.index("#### 🔎 `check-a` (1 issues)")
+        self.assertLess(b, output.index("m3"))
+        self.assertLess(output.index("m3"), a)
+        self.assertLess(a, output.index("m2"))
+        self.assertEqual(output.count("`a.cpp`"), 1)
+        # File headings nest below the check headings.
+        self.assertIn("##### 📄 `a.cpp`", output)
+
+        single = ProjectResult(name="proj", warnings_count=1, issues=issues[1:2])
+        f = io.StringIO()
+        write_project_details(f, single, {})
+        self.assertNotIn("🔎", f.getvalue())
+
+    def test_checks_share_the_budget(self):
+        issues = [Issue("a.cpp", i, 1, "warning", f"m{i}", "noisy") for i in range(50)]
+        issues.append(Issue("b.cpp", 1, 1, "warning", "rare", "quiet"))
+        result = ProjectResult(name="proj", warnings_count=51, issues=issues)
+        f = io.StringIO()
+        budget = ReportBudget(max_bytes=3_000)
+        budget.begin_section(f)
+        write_project_details(f, result, {}, budget)
+        output = f.getvalue()
+        # The noisy check is summarized, leaving room for the quiet one.
+        self.assertIn("exceed the report budget", output)
+        self.assertIn("rare", output)
+        self.assertEqual(budget.truncated, ["proj"])
+
     def test_groups_issues_by_file(self):
         f = io.StringIO()
         issues = [
@@ -310,6 +924,199 @@ class TestWriteProjectDetails(unittest.TestCase):
         self.assertLess(output.index("`a.cpp`"), output.index("`b.cpp`"))
 
 
+def _noisy_result(name="proj", count=500):
+    return ProjectResult(
+        name=name,
+        warnings_count=count,
+        issues=[
+            Issue(
+                f"src/file{i % 7}.cpp",
+                i,
+                1,
+                "warning",
+                f"variable 'v{i}' is unused" if i % 3 else f"call to 'f{i}' leaks",
+                "check-a",
+                f"int v{i};",
+            )
+            for i in range(count)
+        ],
+    )
+
+
+class TestWriteProjectPerformance(unittest.TestCase):
+    def _profile(self):
+        return RunProfile(
+            "proj",
+            [
+                UnitProfile("/w/proj/src/fast.cpp", 0, 0.5, 1024, {"check-a": 0.1}),
+                UnitProfile("/w/proj/src/slow.cpp", 0, 9.0, 2048, {"check-a": 4.0}),
+            ],
+        )
+
+    def test_lists_slowest_files_and_checks(self):
+        f = io.StringIO()
+        write_project_performance(f, "proj", self._profile())
+        output = f.getvalue()
+        self.assertIn("proj Performance (2 files, 9.5s total, slowest 9.0s)", output)
+        self.assertLess(output.index("src/slow.cpp"), output.index("src/fast.cpp"))
+        self.assertIn("| `src/slow.cpp` | 9.00 | 2 |", output)
+        self.assertIn("| `check-a` | 4.10 |", output)
+
+    def test_counts_cached_files(self):
+        profile = self._profile()
+        profile.units[0].cached = True
+        f = io.StringIO()
+        write_project_performance(f, "proj", profile)
+        self.assertIn("proj Performance (2 files, 1 cached, 9.5s total", f.getvalue())
+
+    def test_without_check_profile(self):
+        f = io.StringIO()
+        write_project_performance(
+            f, "proj", RunProfile("proj", [UnitProfile("/w/proj/a.cpp")])
+        )
+        self.assertNotIn("Matcher time", f.getvalue())
+        f = io.StringIO()
+        write_project_performance(f, "proj", RunProfile("proj"))
+        self.assertEqual(f.getvalue(), "")
+
+    def test_budget(self):
+        f = io.StringIO()
+        budget = ReportBudget(max_bytes=100, top_n=1)
+        budget.begin_section(f)
+        write_project_performance(f, "proj", self._profile(), budget)
+        self.assertEqual(f.getvalue(), "")
+        self.assertEqual(budget.truncated, ["proj"])
+
+
+class TestReportBudget(unittest.TestCase):
+    def test_message_group_ignores_quoted_names(self):
+        a = Issue("a.cpp", 1, 1, "warning", "variable 'x' is unused", "c")
+        b = Issue("b.cpp", 2, 1, "warning", "variable 'y' is unused", "c")
+        self.assertEqual(message_group(a), message_group(b))
+
+    def test_issues_within_budget_are_listed_in_full(self):
+        result = _noisy_result(count=5)
+        budget = ReportBudget(max_bytes=10_000)
+        f = io.StringIO()
+        budget.begin_section(f)
+        write_budgeted_issues(f, "proj", result.issues, None, budget)
+        self.assertEqual(f.getvalue().count("- ⚠️"), 5)
+        self.assertEqual(budget.truncated, [])
+
+    def test_over_budget_writes_top_groups_and_samples(self):
+        result = _noisy_result()
+        budget = ReportBudget(max_bytes=4_000, top_n=3)
+        f = io.StringIO()
+        budget.begin_section(f)
+        write_budgeted_issues(f, "proj", result.issues, None, budget)
+        content = f.getvalue()
+
+        self.assertLessEqual(len(content.encode()), 4_000)
+        self.assertEqual(budget.truncated, ["proj"])
+        self.assertIn("500 issues exceed the report budget", content)
+        self.assertIn("| `src/file0.cpp` | 72 |", content)
+        self.assertIn("| `check-a` | variable '…' is unused | 333 |", content)
+        self.assertIn("| `check-a` | call to '…' leaks | 167 |", content)
+        self.assertIn("**Sample occurrences**", content)
+        # A sample of each message group comes first, then the allowance is
+        # filled with further occurrences.
+        samples = content.split("Sample occurrences")[1]
+        self.assertIn("call to 'f0' leaks", samples)
+        self.assertIn("variable 'v1' is unused", samples)
+        self.assertGreater(content.count("- ⚠️"), 20)
+        self.assertGreater(len(content.encode()), 3_500)
+
+    def test_max_issues(self):
+        result = _noisy_result(count=20)
+        budget = ReportBudget(max_issues=10)
+        f = io.StringIO()
+        budget.begin_section(f)
+        write_budgeted_issues(f, "proj", result.issues, None, budget)
+        self.assertEqual(budget.truncated, ["proj"])
+        self.assertLessEqual(f.getvalue().count("- ⚠️"), 10)
+
+    def test_budget_is_shared_between_projects(self):
+        results = [_noisy_result("a"), _noisy_result("b", count=3)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "report.md")
+            details_path = os.path.join(tmp_dir, "details.md.gz")
+            with patch("sys.stdout", new_callable=io.StringIO):
+                generate_markdown(
+                    results,
+                    output_path,
+                    budget=ReportBudget(max_bytes=8_000),
+                    details_path=details_path,
+                )
+            with open(output_path) as f:
+                content = f.read()
+            with gzip.open(details_path, "rt") as f:
+                details = f.read()
+
+        self.assertLessEqual(len(content.encode()), 8_000)
+        # The small project after the noisy one is still listed in full.
+        self.assertIn("src/file2.cpp", content.split("🔍 b Details")[1])
+        self.assertEqual(details.count("- ⚠️"), 503)
+
+    def test_crash_heavy_report_stays_within_budget(self):
+        results = []
+        for p in range(5):
+            result = _noisy_result(f"p{p}", count=200)
+            result.crashes = [
+                CrashRecord(
+                    f"clang-tidy src/c{i}.cpp", f"src/c{i}.cpp", [], [f"#0 0x1 f{i}()"]
+                )
+                for i in range(50)
+            ]
+            results.append(result)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "report.md")
+            with patch("sys.stdout", new_callable=io.StringIO):
+                generate_markdown(
+                    results, output_path, budget=ReportBudget(max_bytes=3_000)
+                )
+            with open(output_path) as f:
+                content = f.read()
+
+        self.assertLessEqual(len(content.encode()), 3_000)
+        self.assertGreater(len(content.encode()), 2_500)
+        self.assertEqual(content.count("<details>"), content.count("</details>"))
+
+    def test_small_later_projects_leave_their_share_to_noisy_ones(self):
+        results = [_noisy_result("a", 500), _noisy_result("b", 2_000)]
+        results.append(_noisy_result("c", 3))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "report.md")
+            with patch("sys.stdout", new_callable=io.StringIO):
+                generate_markdown(
+                    results, output_path, budget=ReportBudget(max_bytes=12_000)
+                )
+            with open(output_path) as f:
+                content = f.read()
+
+        self.assertLessEqual(len(content.encode()), 12_000)
+        self.assertGreater(len(content.encode()), 11_000)
+        self.assertEqual(content.split("🔍 c Details")[1].count("- ⚠️"), 3)
+
+    def test_fair_share(self):
+        inf = float("inf")
+        self.assertEqual(fair_share(900, [inf, inf, 100]), 400)
+        self.assertEqual(fair_share(900, [100, inf, inf]), 100)
+        self.assertEqual(fair_share(900, [100, 200]), 700)
+        self.assertEqual(fair_share(-5, [inf]), 0)
+
+    def test_no_details_file_when_within_budget(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            details_path = os.path.join(tmp_dir, "details.md.gz")
+            with patch("sys.stdout", new_callable=io.StringIO):
+                generate_markdown(
+                    [_noisy_result(count=2)],
+                    os.path.join(tmp_dir, "report.md"),
+                    budget=ReportBudget(max_bytes=60_000),
+                    details_path=details_path,
+                )
+            self.assertFalse(os.path.exists(details_path))
+
+
 class TestGenerateMarkdown(unittest.TestCase):
     def test_generates_file(self):
         with tempfile.TemporaryDirectory() as tmp_dir:
@@ -398,6 +1205,121 @@ class TestGenerateReport(unittest.TestCase):
             self.assertIn("| **proj** |", content)
             self.assertIn("check-a", content)
 
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_performance_section_from_run_profile(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(os.path.join(log_dir, "proj"))
+            with open(os.path.join(log_dir, "proj", "00000-a.cpp.log"), "w") as f:
+                f.write("/w/proj/a.cpp:1:1: warning: m [check-a]\n")
+            write_run_profile(
+                run_profile_path(log_dir, "proj"),
+                RunProfile("proj", [UnitProfile("/w/proj/a.cpp", 0, 1.5, 4096)]),
+            )
+
+            output_path = os.path.join(tmp_dir, "report.md")
+            with patch("sys.stdout", new=io.StringIO()):
+                generate_report(log_dir, output_path)
+            with open(output_path) as f:
+                content = f.read()
+
+        self.assertIn("proj Performance (1 files", content)
+        self.assertIn("| `a.cpp` | 1.50 | 4 |", content)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_summary_only_report(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(os.path.join(log_dir, "proj"))
+            for name in ("00000-a.cpp.log", "00001-b.cpp.log"):
+                with open(os.path.join(log_dir, "proj", name), "w") as f:
+                    f.write("/w/proj/a.h:1:1: warning: shared [check-a]\n")
+
+            output_path = os.path.join(tmp_dir, "report.md")
+            with patch("sys.stdout", new=io.StringIO()):
+                (result,) = generate_report(log_dir, output_path, summary_only=True)
+            with open(output_path) as f:
+                content = f.read()
+            self.assertFalse(os.path.exists(os.path.join(log_dir, CACHE_FILE)))
+
+        self.assertEqual(result.warnings_count, 1)
+        self.assertEqual(result.raw_warnings_count, 2)
+        self.assertIn("| **proj** | ⚠️ Warnings | 1 (2 raw) |", content)
+        self.assertNotIn("<details>", content)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_second_run_reparses_only_changed_logs(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(log_dir)
+            for name in ("a", "b"):
+                with open(os.path.join(log_dir, f"{name}.log"), "w") as f:
+                    f.write(f"/path/{name}/x.cpp:1:1: warning: bad [check-{name}]\n")
+
+            output_path = os.path.join(tmp_dir, "report.md")
+            generate_report(log_dir, output_path)
+            with open(output_path) as f:
+                first = f.read()
+
+            with open(os.path.join(log_dir, "b.log"), "a") as f:
+                f.write("/path/b/y.cpp:2:2: error: worse [check-b]\n")
+
+            with patch(
+                "testers.generate_report.parse_log_file", wraps=parse_log_file
+            ) as mock_parse:
+                generate_report(log_dir, output_path)
+            mock_parse.assert_called_once_with(os.path.join(log_dir, "b.log"), "b")
+
+            with open(output_path) as f:
+                second = f.read()
+            self.assertNotEqual(first, second)
+            self.assertIn("worse", second)
+            self.assertIn("check-a", second)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_parallel_report_is_byte_identical(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(log_dir)
+            for name in ("b", "a", "c"):
+                with open(os.path.join(log_dir, f"{name}.log"), "w") as f:
+                    f.write(f"/path/{name}/x.cpp:1:1: warning: bad [check-{name}]\n")
+                    f.write("Segmentation fault\n" if name == "c" else "  int x;\n")
+
+            serial_path = os.path.join(tmp_dir, "serial.md")
+            parallel_path = os.path.join(tmp_dir, "parallel.md")
+            generate_report(log_dir, serial_path)
+            generate_report(log_dir, parallel_path, jobs=3)
+
+            with open(serial_path, "rb") as f:
+                serial = f.read()
+            with open(parallel_path, "rb") as f:
+                self.assertEqual(f.read(), serial)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_baseline_report_lists_only_changes(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, "proj.log"), "w") as f:
+                f.write(
+                    "/w/proj/a.cpp:12:1: warning: existing [check]\n"
+                    "/w/proj/a.cpp:20:1: warning: introduced [check]\n"
+                )
+            baseline = ProjectResult(
+                name="proj",
+                warnings_count=1,
+                issues=[Issue("a.cpp", 10, 1, "warning", "existing", "check")],
+            )
+            write_baseline(baseline_path(tmp_dir, "proj"), baseline)
+
+            output_path = os.path.join(tmp_dir, "report.md")
+            with patch("sys.stdout", new_callable=io.StringIO):
+                generate_report(tmp_dir, output_path, baseline=True)
+            with open(output_path) as f:
+                content = f.read()
+            self.assertIn("+1 added, -0 removed", content)
+            self.assertIn("introduced", content)
+            self.assertNotIn("existing", content)
+
 
 if __name__ == "__main__":
     unittest.main()
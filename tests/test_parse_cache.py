@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from testers.parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = self._tmp.name
+        self.cache_path = os.path.join(self.tmp_dir, "cache.json")
+        self.log_path = os.path.join(self.tmp_dir, "proj.log")
+        with open(self.log_path, "w") as f:
+            f.write("log contents\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_miss_on_empty_cache(self):
+        cache = ParseCache(self.cache_path, "v1")
+        self.assertIsNone(cache.lookup(self.log_path))
+        self.assertEqual(cache.misses, 1)
+
+    def test_hit_after_save_and_reload(self):
+        cache = ParseCache(self.cache_path, "v1")
+        cache.store(self.log_path, {"name": "proj"})
+        cache.save()
+
+        reloaded = ParseCache(self.cache_path, "v1")
+        self.assertEqual(reloaded.lookup(self.log_path), {"name": "proj"})
+        self.assertEqual(reloaded.hits, 1)
+
+    def test_version_change_invalidates(self):
+        cache = ParseCache(self.cache_path, "v1")
+        cache.store(self.log_path, {"name": "proj"})
+        cache.save()
+
+        self.assertIsNone(ParseCache(self.cache_path, "v2").lookup(self.log_path))
+
+    def test_content_change_invalidates(self):
+        cache = ParseCache(self.cache_path, "v1")
+        cache.store(self.log_path, {"name": "proj"})
+        st = os.stat(self.log_path)
+
+        # Same size and mtime, different contents.
+        with open(self.log_path, "w") as f:
+            f.write("LOG CONTENTS\n")
+        os.utime(self.log_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        self.assertIsNone(cache.lookup(self.log_path))
+
+    def test_missing_log_is_a_miss(self):
+        cache = ParseCache(self.cache_path, "v1")
+        cache.store(self.log_path, {"name": "proj"})
+        os.remove(self.log_path)
+        self.assertIsNone(cache.lookup(self.log_path))
+
+    def test_malformed_result_is_a_miss(self):
+        cache = ParseCache(self.cache_path, "v1")
+        cache.store(self.log_path, {"name": "proj"})
+        cache.entries[os.path.abspath(self.log_path)]["result"] = ["proj"]
+        self.assertIsNone(cache.lookup(self.log_path))
+        self.assertEqual(cache.misses, 1)
+
+    def test_prune_drops_removed_logs(self):
+        cache = ParseCache(self.cache_path, "v1")
+        cache.store(self.log_path, {"name": "proj"})
+        cache.prune([])
+        self.assertEqual(cache.entries, {})
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(self.cache_path, "w") as f:
+            f.write("not json{{")
+        cache = ParseCache(self.cache_path, "v1")
+        self.assertEqual(cache.entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -86,6 +86,86 @@ class TestParseIssue(unittest.TestCase):
             config["CheckOptions"],
         )
 
+    def test_multiple_checks_with_option_blocks(self):
+        body = """
+        https://github.com/llvm/llvm-project/pull/1 bugprone-foo readability-bar
+        bugprone-foo:
+        StrictMode: true
+        readability-bar:
+        Suffix: _x
+        bugprone-foo.Other: 1
+        """
+        result = parse_body(body)
+        self.assertEqual(result.check_name, "bugprone-foo,readability-bar")
+        self.assertEqual(result.check_names, ["bugprone-foo", "readability-bar"])
+        self.assertEqual(
+            json.loads(result.tidy_config)["CheckOptions"],
+            {
+                "bugprone-foo.StrictMode": "true",
+                "readability-bar.Suffix": "_x",
+                "bugprone-foo.Other": "1",
+            },
+        )
+
+    def test_comma_separated_checks(self):
+        result = parse_body("https://x/pull/1 a-check,b-check a-check")
+        self.assertEqual(result.check_names, ["a-check", "b-check"])
+        self.assertEqual(result.tidy_config, "")
+
+    def test_multiple_checks_require_block(self):
+        with self.assertRaises(ValueError):
+            parse_body("https://x/pull/1 a-check b-check\nStrictMode: true")
+        with self.assertRaises(ValueError):
+            parse_body("https://x/pull/1 a-check b-check\nc-check.StrictMode: true")
+
+    def test_option_matrix(self):
+        body = """
+        https://x/pull/1 a-check b-check
+        a-check:
+        Mode: strict | loose
+        Regex: ^(foo|bar)$
+        b-check.Suffix: _x | _y
+        """
+        result = parse_body(body)
+        self.assertEqual(
+            list(result.config_matrix),
+            [
+                "a-check.Mode=strict,b-check.Suffix=_x",
+                "a-check.Mode=strict,b-check.Suffix=_y",
+                "a-check.Mode=loose,b-check.Suffix=_x",
+                "a-check.Mode=loose,b-check.Suffix=_y",
+            ],
+        )
+        self.assertEqual(
+            json.loads(result.config_matrix["a-check.Mode=loose,b-check.Suffix=_y"]),
+            {
+                "CheckOptions": {
+                    "a-check.Mode": "loose",
+                    "a-check.Regex": "^(foo|bar)$",
+                    "b-check.Suffix": "_y",
+                }
+            },
+        )
+        self.assertEqual(
+            result.tidy_config,
+            result.config_matrix["a-check.Mode=strict,b-check.Suffix=_x"],
+        )
+
+    def test_single_check_matrix_labels_omit_prefix(self):
+        result = parse_body("https://x/pull/1 a-check\nMode: on | off")
+        self.assertEqual(list(result.config_matrix), ["Mode=on", "Mode=off"])
+
+    def test_no_matrix_without_alternatives(self):
+        result = parse_body("https://x/pull/1 a-check\nMode: on")
+        self.assertEqual(result.config_matrix, {})
+
+    def test_matrix_size_is_capped(self):
+        body = "https://x/pull/1 a-check\n" + "\n".join(
+            f"Opt{i}: 0 | 1" for i in range(5)
+        )
+        with self.assertRaises(ValueError):
+            parse_body(body)
+
     def test_empty_body(self):
         with self.assertRaises(ValueError):
             parse_body("")
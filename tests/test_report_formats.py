@@ -0,0 +1,138 @@
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from testers.generate_report import (
+    CrashRecord,
+    Issue,
+    ProjectResult,
+    result_from_dict,
+)
+from testers.report_formats import write_result_formats
+from testers.stream_report import stream_report
+
+
+def _results():
+    return [
+        ProjectResult(
+            name="proj",
+            warnings_count=2,
+            errors_count=1,
+            has_crash=True,
+            issues=[
+                Issue("src/a.cpp", 1, 2, "warning", "first", "check-a", "int x;"),
+                Issue("src/b.cpp", 3, 4, "error", "ünïcode", "check-b"),
+                Issue("src/a.cpp", 5, 6, "warning", "again", "check-a"),
+            ],
+            crashes=[
+                CrashRecord(
+                    "clang-tidy -quiet src/a.cpp", frames=["#0 0x1 f() (/t+0x1)"]
+                )
+            ],
+        ),
+        ProjectResult(name="empty"),
+    ]
+
+
+class TestWriteResultFormats(unittest.TestCase):
+    def _write(self, tmp_dir, outputs, urls=None):
+        outputs = {fmt: os.path.join(tmp_dir, path) for fmt, path in outputs.items()}
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_result_formats(outputs, _results(), urls or {})
+        return outputs
+
+    def test_json_round_trips_results(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            outputs = self._write(tmp_dir, {"json": "issue.json"})
+            with open(outputs["json"]) as f:
+                data = json.load(f)
+
+        self.assertEqual(data["version"], 1)
+        proj, empty = (result_from_dict(p) for p in data["projects"])
+        self.assertEqual(empty, ProjectResult(name="empty"))
+        self.assertTrue(proj.has_crash)
+        self.assertEqual(proj.crashes[0].frames, ["#0 0x1 f() (/t+0x1)"])
+        # Issues are grouped by file, as in the markdown report.
+        self.assertEqual(
+            [i.message for i in proj.issues], ["first", "again", "ünïcode"]
+        )
+
+    def test_sarif_results_and_rules(self):
+        urls = {"proj": "https://github.com/o/proj/blob/abc"}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            outputs = self._write(tmp_dir, {"sarif": "issue.sarif"}, urls)
+            with open(outputs["sarif"]) as f:
+                sarif = json.load(f)
+
+        self.assertEqual(sarif["version"], "2.1.0")
+        proj, empty = sarif["runs"]
+        self.assertEqual(
+            [r["id"] for r in proj["tool"]["driver"]["rules"]], ["check-a", "check-b"]
+        )
+        self.assertFalse(proj["invocations"][0]["executionSuccessful"])
+        (notification,) = proj["invocations"][0]["toolExecutionNotifications"]
+        self.assertEqual(
+            notification["message"]["text"], "clang-tidy crashed 1 time(s) in f()"
+        )
+        self.assertEqual(
+            notification["properties"]["reproCommand"], "clang-tidy src/a.cpp"
+        )
+        self.assertEqual(
+            proj["originalUriBaseIds"]["SRCROOT"]["uri"],
+            "https://github.com/o/proj/blob/abc/",
+        )
+        first = proj["results"][0]
+        self.assertEqual(first["ruleId"], "check-a")
+        self.assertEqual(first["level"], "warning")
+        location = first["locations"][0]["physicalLocation"]
+        self.assertEqual(location["artifactLocation"]["uri"], "src/a.cpp")
+        self.assertEqual(location["region"]["startLine"], 1)
+        self.assertEqual(location["region"]["snippet"]["text"], "int x;")
+        self.assertEqual(proj["results"][2]["level"], "error")
+        self.assertEqual(empty["results"], [])
+        self.assertNotIn("originalUriBaseIds", empty)
+
+    def test_gzip_outputs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            outputs = self._write(
+                tmp_dir, {"json": "issue.json.gz", "sarif": "issue.sarif.gz"}
+            )
+            with gzip.open(outputs["json"], "rt") as f:
+                self.assertEqual(len(json.load(f)["projects"]), 2)
+            with gzip.open(outputs["sarif"], "rt") as f:
+                self.assertEqual(len(json.load(f)["runs"]), 2)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_streamed_formats_match(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(log_dir)
+            with open(os.path.join(log_dir, "proj.log"), "w") as f:
+                f.write(
+                    "/w/proj/a.cpp:1:1: warning: m [c]\n    int a;\n"
+                    "/w/proj/a.cpp:1:1: warning: m [c]\n"
+                )
+            streamed = os.path.join(tmp_dir, "streamed.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                stream_report(
+                    log_dir,
+                    os.path.join(tmp_dir, "issue.md"),
+                    markdown=False,
+                    structured_outputs={"json": streamed},
+                )
+            with open(streamed) as f:
+                (proj,) = json.load(f)["projects"]
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, "issue.md")))
+
+        self.assertEqual(proj["warnings_count"], 1)
+        self.assertEqual(proj["raw_warnings_count"], 2)
+        self.assertEqual(proj["issues"][0]["context"], "int a;")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from testers.generate_report import Issue, ProjectResult
+from testers.result_store import ResultStore, RunMetadata, query, store_results
+
+
+def _result(*messages, name="proj"):
+    return ProjectResult(
+        name=name,
+        warnings_count=len(messages),
+        issues=[
+            Issue("src/a.cpp", i + 1, 1, "warning", msg, "check-a")
+            for i, msg in enumerate(messages)
+        ],
+    )
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.store = ResultStore(os.path.join(self.tmp_dir.name, "store.sqlite"))
+        self.addCleanup(self.store.close)
+
+    def test_add_run_and_list_runs(self):
+        run_id = self.store.add_run(
+            RunMetadata("pr/1", "sha", "rev", "check-a"), [_result("m")]
+        )
+        (run,) = self.store.runs()
+        self.assertEqual(run["id"], run_id)
+        self.assertEqual(run["pr_link"], "pr/1")
+        self.assertEqual(run["patch_sha256"], "sha")
+        self.assertEqual(self.store.runs("pr/other"), [])
+
+    def test_reingesting_a_run_replaces_it(self):
+        metadata = RunMetadata("pr/1", "sha", "rev", "check-a")
+        self.store.add_run(metadata, [_result("a", "b")])
+        self.store.add_run(metadata, [_result("a")])
+        self.assertEqual(len(self.store.runs()), 1)
+        self.assertEqual(len(self.store.issues()), 1)
+
+    def test_first_seen_tracks_fingerprints_across_runs(self):
+        first = self.store.add_run(RunMetadata("pr/1"), [_result("old")])
+        second = self.store.add_run(RunMetadata("pr/2"), [_result("new", "old")])
+        rows = {r["message"]: r for r in self.store.issues(run_id=second)}
+        self.assertEqual(rows["old"]["first_run"], first)
+        self.assertEqual(rows["new"]["first_run"], second)
+
+    def test_first_seen_is_per_project(self):
+        first = self.store.add_run(RunMetadata("pr/1"), [_result("m")])
+        second = self.store.add_run(
+            RunMetadata("pr/2"), [_result("m"), _result("m", name="other")]
+        )
+        rows = {r["project"]: r for r in self.store.issues(run_id=second)}
+        self.assertEqual(rows["proj"]["first_run"], first)
+        self.assertEqual(rows["other"]["first_run"], second)
+
+    def test_issue_filters(self):
+        self.store.add_run(
+            RunMetadata("pr/1"), [_result("a"), _result("b", name="other")]
+        )
+        self.assertEqual(len(self.store.issues()), 2)
+        self.assertEqual(len(self.store.issues(project="other")), 1)
+        self.assertEqual(len(self.store.issues(check_name="check-b")), 0)
+        self.assertEqual(len(self.store.issues(file_path="src/a.cpp")), 2)
+        self.assertEqual(len(self.store.issues(pr_link="pr/2")), 0)
+        self.assertEqual(len(self.store.issues(limit=1)), 1)
+
+    def test_trend_counts_runs_without_matches(self):
+        self.store.add_run(RunMetadata("pr/1"), [_result("a", "b")])
+        self.store.add_run(RunMetadata("pr/2"), [ProjectResult(name="proj")])
+        trend = self.store.trend(check_name="check-a")
+        self.assertEqual([t["issues"] for t in trend], [2, 0])
+        self.assertEqual([t["warnings"] for t in trend], [2, 0])
+
+
+class TestStoreResults(unittest.TestCase):
+    @patch.dict(
+        "os.environ",
+        {"PR_LINK": "pr/9", "PATCH_SHA256": "abc", "LLVM_REVISION": "rev"},
+    )
+    def test_reads_metadata_from_env(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "store.sqlite")
+            with contextlib.redirect_stdout(io.StringIO()):
+                store_results(path, [_result("m")])
+            with ResultStore(path) as store:
+                (run,) = store.runs()
+            self.assertEqual(
+                (run["pr_link"], run["patch_sha256"], run["llvm_revision"]),
+                ("pr/9", "abc", "rev"),
+            )
+
+
+class TestQuery(unittest.TestCase):
+    def test_prints_issues_table(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "store.sqlite")
+            with ResultStore(path) as store:
+                store.add_run(RunMetadata("pr/1"), [_result("first")])
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                query(path, "issues")
+            self.assertIn(
+                "| 1 | proj | src/a.cpp:1:1 | check-a | first | new |", out.getvalue()
+            )
+
+    def test_missing_store_exits(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit) as ctx:
+                query("/nonexistent/store.sqlite", "runs")
+        self.assertEqual(ctx.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from testers.run_profile import (
+    RunProfile,
+    UnitProfile,
+    load_run_profile,
+    read_check_profile,
+    run_profile_path,
+    write_run_profile,
+)
+
+
+class TestReadCheckProfile(unittest.TestCase):
+    def test_sums_wall_time_per_check(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, seconds in [("1-a.cpp.json", 0.5), ("2-a.cpp.json", 0.25)]:
+                with open(os.path.join(tmp_dir, name), "w") as f:
+                    json.dump(
+                        {
+                            "file": "/s/a.cpp",
+                            "profile": {
+                                "time.clang-tidy.bugprone-foo.wall": seconds,
+                                "time.clang-tidy.bugprone-foo.user": 9.0,
+                            },
+                        },
+                        f,
+                    )
+            with open(os.path.join(tmp_dir, "3-broken.json"), "w") as f:
+                f.write("{")
+            with contextlib.redirect_stderr(io.StringIO()):
+                times = read_check_profile(tmp_dir)
+        self.assertEqual(times, {"bugprone-foo": 0.75})
+
+    def test_missing_directory(self):
+        self.assertEqual(read_check_profile("/nonexistent/profile"), {})
+
+
+class TestRunProfile(unittest.TestCase):
+    def _profile(self):
+        return RunProfile(
+            "proj",
+            [
+                UnitProfile("/s/a.cpp", 0, 1.0, 100, {"c1": 0.5, "c2": 0.1}),
+                UnitProfile("/s/b.cpp", 1, 3.0, 200, {"c2": 0.7}),
+                UnitProfile("/s/c.cpp", 0, 2.0, 300),
+            ],
+        )
+
+    def test_slowest_and_check_totals(self):
+        profile = self._profile()
+        self.assertEqual(profile.total_seconds, 6.0)
+        self.assertEqual([u.file for u in profile.slowest(2)], ["/s/b.cpp", "/s/c.cpp"])
+        totals = profile.check_totals()
+        self.assertEqual(list(totals), ["c2", "c1"])
+        self.assertAlmostEqual(totals["c2"], 0.8)
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "proj"))
+            write_run_profile(run_profile_path(tmp_dir, "proj"), self._profile())
+            self.assertEqual(load_run_profile(tmp_dir, "proj"), self._profile())
+            self.assertIsNone(load_run_profile(tmp_dir, "other"))
+
+    def test_unreadable_profile_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "proj"))
+            with open(run_profile_path(tmp_dir, "proj"), "w") as f:
+                f.write("[]")
+            with contextlib.redirect_stderr(io.StringIO()):
+                self.assertIsNone(load_run_profile(tmp_dir, "proj"))
+
+
+if __name__ == "__main__":
+    unittest.main()
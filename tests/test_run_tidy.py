@@ -0,0 +1,507 @@
+import contextlib
+import io
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from parse_issue import ParseResult, parse_body
+from testers.generate_report import (
+    diff_results,
+    find_log_files,
+    load_baseline,
+    matrix_diffs,
+    parse_log_files,
+)
+from testers.run_profile import load_run_profile
+from testers.run_tidy import (
+    TranslationUnit,
+    build_tidy_command,
+    load_compile_commands,
+    run_project,
+    shard_name,
+)
+
+STUB_CLANG_TIDY = f"""#!{sys.executable}
+import json
+import os
+import sys
+
+checks = next(a for a in sys.argv if a.startswith("-checks="))
+source = sys.argv[-1]
+for arg in sys.argv:
+    if arg.startswith("-store-check-profile="):
+        with open(os.path.join(arg.split("=", 1)[1], "0-unit.json"), "w") as f:
+            check = checks.split(",")[-1]
+            json.dump({{"profile": {{f"time.clang-tidy.{{check}}.wall": 0.5}}}}, f)
+if source.endswith("crash.cpp"):
+    print("Stack dump:")
+    sys.exit(139)
+print(f"{{source}}:1:1: warning: stub finding [{{checks.split(',')[-1]}}]")
+print("  int x;")
+print("/project/include/common.h:3:1: warning: header finding [shared-check]")
+print("  int y;")
+if any(a.startswith("-config=") and '"true"' in a for a in sys.argv):
+    print(f"{{source}}:2:1: warning: strict finding [{{checks.split(',')[-1]}}]")
+    print("  int z;")
+"""
+
+
+# Lists a unit's dependencies like `c++ -M`: the source, and the generated
+# header in the build directory once it exists.
+STUB_COMPILER = f"""#!{sys.executable}
+import os
+import sys
+
+if sys.argv[-1] != "-M" or "-c" in sys.argv or "-o" in sys.argv:
+    sys.exit(1)
+deps = [sys.argv[-2]] + [h for h in ["config.h"] if os.path.exists(h)]
+print("unit.o: " + " \\\\\\n  ".join(deps))
+"""
+
+
+# The unpatched binary only reports the header finding, a few lines earlier.
+BASELINE_STUB_CLANG_TIDY = f"""#!{sys.executable}
+print("/project/include/common.h:1:1: warning: header finding [shared-check]")
+print("  int y;")
+"""
+
+
+def _write_stub(path, script):
+    with open(path, "w") as f:
+        f.write(script)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def _write_project(tmp_dir, files):
+    src_dir = os.path.join(tmp_dir, "proj")
+    build_dir = os.path.join(src_dir, "build")
+    os.makedirs(build_dir)
+    compiler = os.path.join(tmp_dir, "c++")
+    _write_stub(compiler, STUB_COMPILER)
+    entries = []
+    for name in files:
+        with open(os.path.join(src_dir, name), "w") as f:
+            f.write("int main() { return 0; }\n")
+        entries.append(
+            {
+                "directory": build_dir,
+                "file": f"../{name}",
+                "command": f"{compiler} -c ../{name} -o {name}.o",
+            }
+        )
+    with open(os.path.join(build_dir, "compile_commands.json"), "w") as f:
+        json.dump(entries, f)
+
+    clang_tidy = os.path.join(tmp_dir, "clang-tidy")
+    _write_stub(clang_tidy, STUB_CLANG_TIDY)
+    return src_dir, build_dir, clang_tidy
+
+
+class TestLoadCompileCommands(unittest.TestCase):
+    def test_resolves_and_deduplicates(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src_dir, build_dir, _ = _write_project(tmp_dir, ["a.cpp", "b.cpp"])
+            with open(os.path.join(build_dir, "compile_commands.json")) as f:
+                entries = json.load(f)
+            with open(os.path.join(build_dir, "compile_commands.json"), "w") as f:
+                json.dump(entries + entries[:1], f)
+
+            units = load_compile_commands(build_dir)
+            self.assertEqual(
+                [u.file for u in units],
+                [os.path.join(src_dir, "a.cpp"), os.path.join(src_dir, "b.cpp")],
+            )
+
+    def test_file_regex(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _, build_dir, _ = _write_project(tmp_dir, ["a.cpp", "b.S"])
+            units = load_compile_commands(build_dir, r"(?<!\.S)$")
+            self.assertEqual([os.path.basename(u.file) for u in units], ["a.cpp"])
+
+
+class TestBuildTidyCommand(unittest.TestCase):
+    def test_without_config(self):
+        request = ParseResult("pr", "bugprone-foo", "")
+        self.assertEqual(
+            build_tidy_command("clang-tidy", "/b", request, "/s/a.cpp"),
+            ["clang-tidy", "-p", "/b", "-checks=-*,bugprone-foo", "-quiet", "/s/a.cpp"],
+        )
+
+    def test_multiple_checks_share_one_invocation(self):
+        request = ParseResult("pr", "bugprone-foo, readability-bar", "")
+        cmd = build_tidy_command("clang-tidy", "/b", request, "/s/a.cpp")
+        self.assertIn("-checks=-*,bugprone-foo,readability-bar", cmd)
+
+    def test_with_profile(self):
+        request = ParseResult("pr", "bugprone-foo", "")
+        cmd = build_tidy_command("clang-tidy", "/b", request, "/s/a.cpp", "/p")
+        self.assertIn("-enable-check-profile", cmd)
+        self.assertIn("-store-check-profile=/p", cmd)
+        self.assertEqual(cmd[-1], "/s/a.cpp")
+
+    def test_with_config(self):
+        request = ParseResult("pr", "bugprone-foo", '{"CheckOptions": {}}')
+        cmd = build_tidy_command("clang-tidy", "/b", request, "/s/a.cpp")
+        self.assertIn('-config={"CheckOptions": {}}', cmd)
+        self.assertEqual(cmd[-1], "/s/a.cpp")
+
+
+class TestShardName(unittest.TestCase):
+    def test_sorts_in_compile_database_order(self):
+        names = [
+            shard_name(i, TranslationUnit(f"/s/{n}.cpp", "/b"))
+            for i, n in enumerate(["z", "a"])
+        ]
+        self.assertEqual(names, sorted(names))
+
+
+class TestRunProject(unittest.TestCase):
+    def test_writes_one_shard_per_unit(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _, build_dir, clang_tidy = _write_project(
+                tmp_dir, ["a.cpp", "b.cpp", "crash.cpp"]
+            )
+            log_dir = os.path.join(tmp_dir, "logs")
+            request = ParseResult("pr", "bugprone-foo", "")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                shards = run_project(
+                    "proj", build_dir, request, clang_tidy, log_dir, jobs=2
+                )
+
+            self.assertEqual(len(shards), 3)
+            self.assertTrue(all(os.path.dirname(p).endswith("proj") for p in shards))
+            with open(shards[0]) as f:
+                self.assertIn("[bugprone-foo]", f.read())
+
+            log_files, names = find_log_files(log_dir)
+            (result,) = parse_log_files(log_files, project_names=names)
+            self.assertEqual(result.name, "proj")
+            self.assertTrue(result.has_crash)
+            # The shared header finding is reported once across shards.
+            self.assertEqual(result.warnings_count, 3)
+            self.assertEqual(result.raw_warnings_count, 4)
+
+    def test_writes_run_profile(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src_dir, build_dir, clang_tidy = _write_project(
+                tmp_dir, ["a.cpp", "crash.cpp"]
+            )
+            log_dir = os.path.join(tmp_dir, "logs")
+            request = ParseResult("pr", "bugprone-foo", "")
+
+            for profile in (False, True):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run_project(
+                        "proj", build_dir, request, clang_tidy, log_dir, profile=profile
+                    )
+                units = load_run_profile(log_dir, "proj").units
+                self.assertEqual(
+                    [u.file for u in units],
+                    [os.path.join(src_dir, n) for n in ("a.cpp", "crash.cpp")],
+                )
+                self.assertEqual([u.returncode for u in units], [0, 139])
+                self.assertTrue(all(u.wall_seconds > 0 for u in units))
+                self.assertTrue(all(u.max_rss_kib > 0 for u in units))
+                expected = {"bugprone-foo": 0.5} if profile else {}
+                self.assertEqual(units[0].check_seconds, expected)
+
+    def test_unit_cache_reuses_unchanged_units(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src_dir, build_dir, clang_tidy = _write_project(
+                tmp_dir, ["a.cpp", "b.cpp", "crash.cpp"]
+            )
+            log_dir = os.path.join(tmp_dir, "logs")
+            cache_dir = os.path.join(tmp_dir, "unit-cache")
+            request = ParseResult("pr", "bugprone-foo", "")
+
+            def run():
+                out = io.StringIO()
+                with contextlib.redirect_stdout(out):
+                    shards = run_project(
+                        "proj",
+                        build_dir,
+                        request,
+                        clang_tidy,
+                        log_dir,
+                        source_dir=src_dir,
+                        unit_cache_dir=cache_dir,
+                    )
+                contents = []
+                for path in shards:
+                    with open(path) as f:
+                        contents.append(f.read())
+                units = load_run_profile(log_dir, "proj").units
+                return out.getvalue(), contents, [u.cached for u in units]
+
+            out, first, cached = run()
+            self.assertIn("Unit cache: 0 reused, 3 run", out)
+            self.assertEqual(cached, [False, False, False])
+
+            with open(os.path.join(src_dir, "b.cpp"), "a") as f:
+                f.write("int z;\n")
+            out, second, cached = run()
+            # The crash is never cached, so it runs again.
+            self.assertIn("Unit cache: 1 reused, 2 run", out)
+            self.assertEqual(cached, [True, False, False])
+            self.assertEqual(second, first)
+
+            # A generated header in the build directory is an input too.
+            with open(os.path.join(build_dir, "config.h"), "w") as f:
+                f.write("#define X 1\n")
+            out, _, cached = run()
+            self.assertIn("Unit cache: 0 reused, 3 run", out)
+            out, _, cached = run()
+            self.assertIn("Unit cache: 2 reused, 1 run", out)
+            with open(os.path.join(build_dir, "config.h"), "w") as f:
+                f.write("#define X 2\n")
+            out, _, cached = run()
+            self.assertIn("Unit cache: 0 reused, 3 run", out)
+
+    def test_unit_cache_skips_units_without_dependencies(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src_dir, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp"])
+            os.remove(os.path.join(tmp_dir, "c++"))
+            request = ParseResult("pr", "bugprone-foo", "")
+            for expected in ("0 reused, 1 run", "0 reused, 1 run"):
+                out = io.StringIO()
+                with (
+                    contextlib.redirect_stdout(out),
+                    contextlib.redirect_stderr(io.StringIO()),
+                ):
+                    run_project(
+                        "proj",
+                        build_dir,
+                        request,
+                        clang_tidy,
+                        os.path.join(tmp_dir, "logs"),
+                        source_dir=src_dir,
+                        unit_cache_dir=os.path.join(tmp_dir, "unit-cache"),
+                    )
+                self.assertIn("cannot list the inputs of 1 files", out.getvalue())
+                self.assertIn(f"Unit cache: {expected}", out.getvalue())
+
+    def test_config_matrix_runs_every_config(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src_dir, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp", "b.cpp"])
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(os.path.join(log_dir, "proj"))
+            request = parse_body("https://x/pull/1 bugprone-foo\nStrict: false | true")
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                shards = run_project(
+                    "proj",
+                    build_dir,
+                    request,
+                    clang_tidy,
+                    log_dir,
+                    source_dir=src_dir,
+                    unit_cache_dir=os.path.join(tmp_dir, "unit-cache"),
+                )
+
+            self.assertEqual(len(shards), 4)
+            self.assertIn("Unit cache: 0 reused, 4 run", out.getvalue())
+            self.assertFalse(os.path.exists(os.path.join(log_dir, "proj")))
+            log_files, names = find_log_files(log_dir)
+            results = parse_log_files(log_files, project_names=names)
+            self.assertEqual(
+                [r.name for r in results],
+                ["proj@00-Strict=false", "proj@01-Strict=true"],
+            )
+            for result in results:
+                self.assertEqual(len(load_run_profile(log_dir, result.name).units), 2)
+
+            (matrix,) = matrix_diffs(results).values()
+            self.assertEqual(len(matrix.common), 3)
+            self.assertEqual(matrix.only["proj@00-Strict=false"], [])
+            self.assertEqual(
+                {i.message for i in matrix.only["proj@01-Strict=true"]},
+                {"strict finding"},
+            )
+
+    def test_config_matrix_rejects_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp"])
+            request = parse_body("https://x/pull/1 bugprone-foo\nStrict: false | true")
+            with (
+                self.assertRaises(SystemExit),
+                contextlib.redirect_stderr(io.StringIO()),
+            ):
+                run_project(
+                    "proj",
+                    build_dir,
+                    request,
+                    clang_tidy,
+                    os.path.join(tmp_dir, "logs"),
+                    baseline_clang_tidy=clang_tidy,
+                )
+
+    def test_prefilter_skips_unrelated_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src_dir, build_dir, clang_tidy = _write_project(
+                tmp_dir, ["a.cpp", "b.cpp", "c.cpp"]
+            )
+            with open(os.path.join(src_dir, "b.cpp"), "w") as f:
+                f.write("int y = std::move(x);\n")
+            log_dir = os.path.join(tmp_dir, "logs")
+            request = ParseResult("pr", "bugprone-use-after-move", "")
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                shards = run_project(
+                    "proj", build_dir, request, clang_tidy, log_dir, source_dir=src_dir
+                )
+
+            self.assertEqual([os.path.basename(p) for p in shards], ["00001-b.cpp.log"])
+            self.assertIn("Pre-filter skipped 2 of 3 files", out.getvalue())
+
+    def test_full_bypasses_prefilter(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp", "b.cpp"])
+            request = ParseResult("pr", "bugprone-use-after-move", "")
+            with contextlib.redirect_stdout(io.StringIO()):
+                shards = run_project(
+                    "proj",
+                    build_dir,
+                    request,
+                    clang_tidy,
+                    os.path.join(tmp_dir, "logs"),
+                    full=True,
+                )
+            self.assertEqual(len(shards), 2)
+
+    def test_verify_sample_reports_missed_diagnostics(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp", "b.cpp"])
+            request = ParseResult("pr", "bugprone-foo", "")
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                shards = run_project(
+                    "proj",
+                    build_dir,
+                    request,
+                    clang_tidy,
+                    os.path.join(tmp_dir, "logs"),
+                    filter_tokens=["never_present"],
+                    verify_sample=1,
+                )
+            self.assertEqual(len(shards), 1)
+            self.assertIn(
+                "1 of 1 sampled skipped files produced diagnostics", out.getvalue()
+            )
+            self.assertIn("rerun with --full", out.getvalue())
+
+    def test_removes_stale_shards(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp"])
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(os.path.join(log_dir, "proj"))
+            stale = os.path.join(log_dir, "proj", "99999-old.cpp.log")
+            open(stale, "w").close()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_project(
+                    "proj",
+                    build_dir,
+                    ParseResult("pr", "c", ""),
+                    clang_tidy,
+                    log_dir,
+                )
+            self.assertFalse(os.path.exists(stale))
+
+    def test_baseline_diff_only_shows_patch_findings(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp", "b.cpp"])
+            baseline_tidy = os.path.join(tmp_dir, "baseline-clang-tidy")
+            _write_stub(baseline_tidy, BASELINE_STUB_CLANG_TIDY)
+            log_dir = os.path.join(tmp_dir, "logs")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_project(
+                    "proj",
+                    build_dir,
+                    ParseResult("pr", "bugprone-foo", ""),
+                    clang_tidy,
+                    log_dir,
+                    baseline_clang_tidy=baseline_tidy,
+                )
+
+            log_files, names = find_log_files(log_dir)
+            self.assertEqual(len(log_files), 2)
+            (patched,) = parse_log_files(log_files, project_names=names)
+            diff = diff_results(load_baseline(log_dir, "proj"), patched)
+            self.assertEqual(
+                [os.path.basename(i.file_path) for i in diff.added], ["a.cpp", "b.cpp"]
+            )
+            self.assertEqual(diff.removed, [])
+
+    def test_baseline_is_cached_per_revision(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src_dir, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp"])
+            subprocess.run(["git", "init", "-q", src_dir], check=True)
+            subprocess.run(
+                ["git", "-C", src_dir, "-c", "user.name=t", "-c", "user.email=t@t"]
+                + ["commit", "-q", "--allow-empty", "-m", "init"],
+                check=True,
+            )
+            baseline_tidy = os.path.join(tmp_dir, "baseline-clang-tidy")
+            _write_stub(baseline_tidy, BASELINE_STUB_CLANG_TIDY)
+            log_dir = os.path.join(tmp_dir, "logs")
+
+            def run(revision):
+                out = io.StringIO()
+                with contextlib.redirect_stdout(out):
+                    run_project(
+                        "proj",
+                        build_dir,
+                        ParseResult("pr", "bugprone-foo", ""),
+                        clang_tidy,
+                        log_dir,
+                        source_dir=src_dir,
+                        baseline_clang_tidy=baseline_tidy,
+                        baseline_cache_dir=os.path.join(tmp_dir, "cache"),
+                        llvm_revision=revision,
+                    )
+                return out.getvalue()
+
+            self.assertIn("Running baseline", run("rev1"))
+            # A broken baseline binary proves the cached result is used.
+            _write_stub(baseline_tidy, f"#!{sys.executable}\nraise SystemExit(1)\n")
+            self.assertIn("Reusing cached baseline", run("rev1"))
+            self.assertEqual(load_baseline(log_dir, "proj").warnings_count, 1)
+            self.assertIn("Running baseline", run("rev2"))
+            self.assertEqual(load_baseline(log_dir, "proj").warnings_count, 0)
+
+    def test_removes_stale_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _, build_dir, clang_tidy = _write_project(tmp_dir, ["a.cpp"])
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(log_dir)
+            with open(os.path.join(log_dir, "proj.baseline.json"), "w") as f:
+                f.write("{}")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_project(
+                    "proj", build_dir, ParseResult("pr", "c", ""), clang_tidy, log_dir
+                )
+            self.assertIsNone(load_baseline(log_dir, "proj"))
+
+    def test_missing_binary_exits(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    run_project(
+                        "proj",
+                        tmp_dir,
+                        ParseResult("pr", "c", ""),
+                        os.path.join(tmp_dir, "missing"),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from testers.sources import file_digest, project_commit
+
+
+class TestFileDigest(unittest.TestCase):
+    def test_matches_sha256(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "a.log")
+            with open(path, "w") as f:
+                f.write("abc")
+            self.assertEqual(
+                file_digest(path),
+                "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad",
+            )
+
+
+class TestProjectCommit(unittest.TestCase):
+    def test_not_a_checkout(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertIsNone(project_commit(tmp_dir))
+
+    @unittest.skipUnless(shutil.which("git"), "git is not installed")
+    def test_returns_head(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            subprocess.run(["git", "init", "-q", tmp_dir], check=True)
+            subprocess.run(
+                ["git", "-C", tmp_dir, "-c", "user.name=t", "-c", "user.email=t@t"]
+                + ["commit", "-q", "--allow-empty", "-m", "init"],
+                check=True,
+            )
+            head = subprocess.run(
+                ["git", "-C", tmp_dir, "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            self.assertEqual(project_commit(tmp_dir), head)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from testers.benchmark import generate_synthetic_log
+from testers.generate_report import Issue, find_log_files, generate_report
+from testers.result_store import ResultStore
+from testers.run_profile import (
+    RunProfile,
+    UnitProfile,
+    run_profile_path,
+    write_run_profile,
+)
+from testers.stream_report import (
+    IssueSpill,
+    SpilledProject,
+    spill_log_files,
+    stream_report,
+)
+
+SHARD_A = (
+    "/w/proj/src/a.cpp:1:1: warning: first [check-a]\n"
+    "    int a;\n"
+    "/w/proj/include/common.h:3:1: warning: shared [check-a]\n"
+    "    int shared;\n"
+    "/w/proj/src/a.cpp:9:2: error: worse [check-b]\n"
+)
+SHARD_B = (
+    "/w/proj/include/common.h:3:1: warning: shared [check-a]\n"
+    "    int shared;\n"
+    "/w/proj/src/b.cpp:2:1: warning: second [check-a]\n"
+    "Stack dump:\n"
+)
+
+
+def _write_logs(log_dir):
+    os.makedirs(os.path.join(log_dir, "proj"))
+    for name, content in [("00000-a.cpp.log", SHARD_A), ("00001-b.cpp.log", SHARD_B)]:
+        with open(os.path.join(log_dir, "proj", name), "w") as f:
+            f.write(content)
+    with open(os.path.join(log_dir, "other.log"), "w") as f:
+        f.write("/w/other/x.cpp:5:5: warning: lone [check-c]\n    int x;\n")
+    write_run_profile(
+        run_profile_path(log_dir, "proj"),
+        RunProfile("proj", [UnitProfile("/w/proj/src/a.cpp", 0, 2.0, 1024)]),
+    )
+
+
+class TestIssueSpill(unittest.TestCase):
+    def test_reads_back_groups(self):
+        issues = [
+            Issue("a.cpp", 1, 2, "warning", "m1", "c", "int x;"),
+            Issue("b.cpp", 3, 4, "error", "m2", "c"),
+            Issue("a.cpp", 5, 6, "warning", "m3 ünïcode", "c", None),
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spill = IssueSpill(os.path.join(tmp_dir, "spill.jsonl"))
+            spill.write(issues)
+            self.assertEqual(list(spill.offsets), ["a.cpp", "b.cpp"])
+            self.assertEqual(spill.read_group("a.cpp"), [issues[0], issues[2]])
+            self.assertEqual(spill.read_group("b.cpp"), [issues[1]])
+            self.assertEqual(spill.read_group("c.cpp"), [])
+
+
+class TestSpillLogFiles(unittest.TestCase):
+    def test_counts_dedup_across_shards(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            _write_logs(log_dir)
+            log_files, names = find_log_files(log_dir)
+            other, proj = spill_log_files(log_files, names, tmp_dir)
+
+            self.assertEqual(other.result.name, "other")
+            self.assertEqual(proj.result.warnings_count, 3)
+            self.assertEqual(proj.result.raw_warnings_count, 4)
+            self.assertEqual(proj.result.errors_count, 1)
+            self.assertTrue(proj.result.has_crash)
+            self.assertEqual(proj.result.issues, [])
+            self.assertEqual(
+                [path for path, _ in proj.file_groups()],
+                ["src/a.cpp", "include/common.h", "src/b.cpp"],
+            )
+
+
+class TestStreamReport(unittest.TestCase):
+    def _reports(self, log_dir, tmp_dir, **kwargs):
+        materialized = os.path.join(tmp_dir, "materialized.md")
+        streamed = os.path.join(tmp_dir, "streamed.md")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_report(log_dir, materialized, use_cache=False, **kwargs)
+            stream_report(log_dir, streamed, **kwargs)
+        with open(materialized) as f, open(streamed) as g:
+            return f.read(), g.read()
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_matches_materialized_report(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            _write_logs(log_dir)
+            materialized, streamed = self._reports(log_dir, tmp_dir, jobs=2)
+        self.assertEqual(streamed, materialized)
+        self.assertIn("CRASH", streamed)
+        self.assertIn("#### 🔎 `check-b` (1 issues)", streamed)
+        self.assertIn("proj Performance", streamed)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_matches_materialized_report_with_budget(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(log_dir)
+            generate_synthetic_log(os.path.join(log_dir, "proj.log"), 2_000)
+            details = os.path.join(tmp_dir, "details.md.gz")
+            materialized, streamed = self._reports(
+                log_dir, tmp_dir, max_bytes=5_000, details_output=details
+            )
+            with gzip.open(details, "rt") as f:
+                full = f.read()
+        self.assertEqual(streamed, materialized)
+        self.assertIn("exceed the report budget", streamed)
+        self.assertEqual(sum(x.startswith("- ") for x in full.splitlines()), 2_000)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_stores_deduplicated_issues(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            _write_logs(log_dir)
+            store = os.path.join(tmp_dir, "store.sqlite")
+            with contextlib.redirect_stdout(io.StringIO()):
+                stream_report(log_dir, os.path.join(tmp_dir, "r.md"), store=store)
+            with ResultStore(store) as results:
+                issues = results.issues(project="proj")
+        self.assertEqual(len(issues), 4)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_matches_materialized_matrix_report(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            for name, content in [
+                ("proj@00-Strict=false", SHARD_A),
+                ("proj@01-Strict=true", SHARD_A + SHARD_B),
+            ]:
+                os.makedirs(os.path.join(log_dir, name))
+                with open(os.path.join(log_dir, name, "00000-a.cpp.log"), "w") as f:
+                    f.write(content)
+            with patch.object(
+                SpilledProject,
+                "read_file",
+                autospec=True,
+                side_effect=SpilledProject.read_file,
+            ) as read_file:
+                materialized, streamed = self._reports(log_dir, tmp_dir)
+        self.assertEqual(streamed, materialized)
+        # Counting reads 2 + 3 files and splitting 2 x 3; writing reads neither.
+        self.assertEqual(read_file.call_count, 11)
+        self.assertIn("proj Across 2 configs (3 common, 1 config-specific)", streamed)
+        self.assertIn("Only with `01-Strict=true` (1)", streamed)
+        self.assertNotIn("Only with `00-Strict=false`", streamed)
+
+    @patch("testers.generate_report.load_projects", side_effect=OSError)
+    def test_peak_memory_is_bounded_by_file_groups(self, mock_load):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_dir = os.path.join(tmp_dir, "logs")
+            os.makedirs(log_dir)
+            generate_synthetic_log(os.path.join(log_dir, "proj.log"), 20_000)
+            output = os.path.join(tmp_dir, "issue.md")
+
+            peaks = []
+            for run in (stream_report, generate_report):
+                tracemalloc.start()
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        if run is generate_report:
+                            run(log_dir, output, use_cache=False)
+                        else:
+                            run(log_dir, output)
+                    peaks.append(tracemalloc.get_traced_memory()[1])
+                finally:
+                    tracemalloc.stop()
+
+        streamed_peak, materialized_peak = peaks
+        self.assertLess(streamed_peak, materialized_peak / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from testers.tu_filter import (
+    CHECK_TOKENS,
+    SourceIndex,
+    command_arguments,
+    include_dirs,
+    sample_skipped,
+    select_units,
+    tokens_for_checks,
+)
+
+
+def _write(root, rel, content):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+class TestTokensForChecks(unittest.TestCase):
+    def test_known_check(self):
+        self.assertEqual(
+            tokens_for_checks("bugprone-use-after-move"),
+            CHECK_TOKENS["bugprone-use-after-move"],
+        )
+
+    def test_unknown_check_disables_filter(self):
+        self.assertIsNone(tokens_for_checks("readability-identifier-naming"))
+
+    def test_any_unknown_check_disables_filter(self):
+        self.assertIsNone(
+            tokens_for_checks("bugprone-use-after-move,readability-identifier-naming")
+        )
+
+    def test_combines_known_checks(self):
+        tokens = tokens_for_checks(
+            "cppcoreguidelines-avoid-goto,modernize-use-std-print"
+        )
+        self.assertEqual(set(tokens), {"goto", "printf", "fprintf"})
+
+    def test_configured_names_widen_tokens(self):
+        config = (
+            '{"CheckOptions": {"modernize-use-std-print.PrintfLikeFunctions": '
+            '"::myprintf; log::print", "other-check.Names": "^x.*$"}}'
+        )
+        tokens = tokens_for_checks("modernize-use-std-print", ["", config])
+        self.assertEqual(tokens, ["printf", "fprintf", "myprintf", "log", "print"])
+
+    def test_configured_pattern_disables_filter(self):
+        config = '{"CheckOptions": {"bugprone-use-after-move.Functions": "^re.*$"}}'
+        self.assertIsNone(tokens_for_checks("bugprone-use-after-move", [config]))
+        self.assertIsNone(tokens_for_checks("bugprone-use-after-move", ["{"]))
+
+
+class TestIncludeDirs(unittest.TestCase):
+    def test_joined_and_separate_flags(self):
+        args = ["c++", "-Iinc", "-I", "/abs", "-isystem", "sys", "-iquoteq", "a.cpp"]
+        self.assertEqual(
+            include_dirs(args, "/build"),
+            ["/build/inc", "/abs", "/build/sys", "/build/q"],
+        )
+
+    def test_command_string(self):
+        entry = {"command": "c++ -I'dir with space' -c a.cpp"}
+        self.assertEqual(
+            command_arguments(entry), ["c++", "-Idir with space", "-c", "a.cpp"]
+        )
+
+
+class TestSourceIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.inc = os.path.join(self.root, "include")
+        _write(self.root, "include/moves.h", "void f() { std::move(x); }\n")
+        _write(self.root, "include/plain.h", '#include "moves.h"\n')
+        self.direct = _write(self.root, "src/direct.cpp", "int a = std::move(b);\n")
+        self.via_header = _write(self.root, "src/via.cpp", "#include <plain.h>\n")
+        self.local = _write(self.root, "src/local.cpp", '#include "local.h"\n')
+        _write(self.root, "src/local.h", "int y;\n")
+        self.unrelated = _write(self.root, "src/none.cpp", "#include <vector>\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_matches_direct_and_transitive(self):
+        index = SourceIndex(self.root)
+        tokens = {"move"}
+        self.assertTrue(index.matches(self.direct, [], tokens))
+        self.assertTrue(index.matches(self.via_header, [self.inc], tokens))
+        self.assertFalse(index.matches(self.via_header, [], tokens))
+        self.assertFalse(index.matches(self.local, [self.inc], tokens))
+        self.assertFalse(index.matches(self.unrelated, [self.inc], tokens))
+
+    def test_include_cycle_terminates(self):
+        _write(self.root, "src/a.h", '#include "b.h"\n')
+        _write(self.root, "src/b.h", '#include "a.h"\n')
+        tu = _write(self.root, "src/cycle.cpp", '#include "a.h"\n')
+        self.assertFalse(SourceIndex(self.root).matches(tu, [], {"move"}))
+
+    def test_reindexes_modified_files(self):
+        index = SourceIndex(self.root)
+        self.assertFalse(index.matches(self.local, [], {"move"}))
+        _write(self.root, "src/local.h", "int y = std::move(z);\n")
+        self.assertTrue(index.matches(self.local, [], {"move"}))
+
+    def test_select_units(self):
+        index = SourceIndex(self.root)
+        kept, skipped = select_units(
+            [(self.direct, []), (self.unrelated, []), (self.via_header, [self.inc])],
+            index,
+            {"move"},
+        )
+        self.assertEqual(kept, [0, 2])
+        self.assertEqual(skipped, [1])
+
+    @unittest.skipUnless(shutil.which("git"), "git is not installed")
+    def test_persisted_per_commit(self):
+        subprocess.run(["git", "init", "-q", self.root], check=True)
+        subprocess.run(["git", "-C", self.root, "add", "."], check=True)
+        subprocess.run(
+            [
+                "git",
+                "-C",
+                self.root,
+                "-c",
+                "user.name=ctit",
+                "-c",
+                "user.email=ctit@example.com",
+                "commit",
+                "-q",
+                "-m",
+                "init",
+            ],
+            check=True,
+        )
+        index_dir = os.path.join(self.root, "index")
+
+        index = SourceIndex.load(self.root, index_dir, "proj")
+        index.matches(self.direct, [], {"move"})
+        index.save()
+        self.assertTrue(os.path.isfile(index.path))
+
+        reloaded = SourceIndex.load(self.root, index_dir, "proj")
+        self.assertEqual(reloaded.path, index.path)
+        self.assertIn("move", reloaded.entry(self.direct).tokens)
+
+
+class TestSampleSkipped(unittest.TestCase):
+    def test_deterministic_and_bounded(self):
+        skipped = list(range(100))
+        self.assertEqual(sample_skipped(skipped, 5), sample_skipped(skipped, 5))
+        self.assertEqual(len(sample_skipped(skipped, 5)), 5)
+        self.assertEqual(sample_skipped([1, 2], 5), [1, 2])
+        self.assertEqual(sample_skipped(skipped, 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
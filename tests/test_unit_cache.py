@@ -0,0 +1,162 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+
+from parse_issue import ParseResult
+from testers.run_profile import UnitProfile
+from testers.unit_cache import (
+    UnitCache,
+    dependency_command,
+    parse_make_dependencies,
+    tidy_config_files,
+)
+
+
+class TestUnitCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = self._tmp.name
+        self.clang_tidy = os.path.join(self.tmp_dir, "clang-tidy")
+        with open(self.clang_tidy, "w") as f:
+            f.write("binary v1\n")
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.request = ParseResult("pr", "bugprone-foo", "")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _cache(self, request=None, profile=False, max_bytes=1 << 20):
+        return UnitCache(
+            self.cache_dir,
+            self.clang_tidy,
+            request or self.request,
+            profile,
+            max_bytes,
+        )
+
+    def _shard(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_key_covers_inputs(self):
+        cache = self._cache()
+        key = cache.key("/b", ["c++", "a.cpp"], {"/s/a.cpp": "1"})
+        self.assertEqual(key, cache.key("/b", ["c++", "a.cpp"], {"/s/a.cpp": "1"}))
+        self.assertNotEqual(key, cache.key("/b", ["c++", "a.cpp"], {"/s/a.cpp": "2"}))
+        self.assertNotEqual(key, cache.key("/b", ["c++", "-O2", "a.cpp"], {}))
+        self.assertNotEqual(key, cache.key("/c", ["c++", "a.cpp"], {"/s/a.cpp": "1"}))
+        args = ("/b", ["c++", "a.cpp"], {"/s/a.cpp": "1"})
+        self.assertNotEqual(key, self._cache(profile=True).key(*args))
+        other_check = ParseResult("pr", "bugprone-bar", "")
+        self.assertNotEqual(key, self._cache(other_check).key(*args))
+        with open(self.clang_tidy, "w") as f:
+            f.write("binary v2\n")
+        self.assertNotEqual(key, self._cache().key(*args))
+
+    def test_key_ignores_config_formatting(self):
+        spaced = ParseResult("pr", "c", '{"Checks": "c",  "CheckOptions": {}}')
+        compact = ParseResult("pr", "c", '{"CheckOptions":{},"Checks":"c"}')
+        args = ("/b", ["c++", "a.cpp"], {})
+        self.assertEqual(
+            self._cache(spaced).key(*args), self._cache(compact).key(*args)
+        )
+
+    def test_store_and_fetch(self):
+        cache = self._cache()
+        shard = self._shard(
+            "0.log", "clang-tidy old a.cpp\na.cpp:1:1: warning: w [c]\n"
+        )
+        cache.store("ab12", shard, UnitProfile("a.cpp", 1, 2.5, 100))
+
+        out = os.path.join(self.tmp_dir, "out.log")
+        unit = cache.fetch("ab12", out, ["clang-tidy", "new", "a.cpp"])
+        self.assertEqual(unit, UnitProfile("a.cpp", 1, 2.5, 100, cached=True))
+        with open(out) as f:
+            self.assertEqual(
+                f.read(), "clang-tidy new a.cpp\na.cpp:1:1: warning: w [c]\n"
+            )
+        self.assertIsNone(cache.fetch("cd34", out, ["clang-tidy"]))
+
+    def test_crashes_are_not_stored(self):
+        cache = self._cache()
+        shard = self._shard("0.log", "cmd\nStack dump:\n")
+        cache.store("ab12", shard, UnitProfile("a.cpp", 139))
+        self.assertIsNone(cache.fetch("ab12", shard, ["cmd"]))
+
+    def test_unreadable_entry_is_a_miss(self):
+        cache = self._cache()
+        cache.store("ab12", self._shard("0.log", "cmd\n"), UnitProfile("a.cpp"))
+        with open(os.path.join(self.cache_dir, "ab", "ab12.json"), "w") as f:
+            f.write("{")
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertIsNone(cache.fetch("ab12", self._shard("1.log", ""), ["cmd"]))
+
+    def test_evicts_least_recently_used(self):
+        shard = self._shard("0.log", "cmd\n" + "x" * 100)
+        cache = self._cache()
+        for i, key in enumerate(["aa01", "aa02", "aa03"]):
+            cache.store(key, shard, UnitProfile("a.cpp"))
+            meta = os.path.join(self.cache_dir, "aa", f"{key}.json")
+            os.utime(meta, (time.time() - 100 + i, time.time() - 100 + i))
+        # Reusing the oldest entry makes it the most recently used.
+        cache.fetch("aa01", self._shard("1.log", ""), ["cmd"])
+
+        entry = os.path.getsize(os.path.join(self.cache_dir, "aa", "aa01.log"))
+        entry += os.path.getsize(os.path.join(self.cache_dir, "aa", "aa01.json"))
+        cache.max_bytes = 2 * entry
+        self.assertEqual(cache.evict(), 1)
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.cache_dir, "aa"))),
+            ["aa01.json", "aa01.log", "aa03.json", "aa03.log"],
+        )
+        self.assertEqual(cache.evict(), 0)
+
+
+class TestTidyConfigFiles(unittest.TestCase):
+    def test_walks_up_to_root(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = os.path.join(tmp_dir, "proj")
+            src = os.path.join(root, "src")
+            os.makedirs(src)
+            for directory in (tmp_dir, root, src):
+                with open(os.path.join(directory, ".clang-tidy"), "w") as f:
+                    f.write(f"Checks: '{directory}'\n")
+
+            found = tidy_config_files(os.path.join(src, "a.cpp"), root)
+            self.assertEqual(
+                sorted(found),
+                [os.path.join(root, ".clang-tidy"), os.path.join(src, ".clang-tidy")],
+            )
+            self.assertNotEqual(*found.values())
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestDependencies(unittest.TestCase):
+    def test_dependency_command_drops_outputs(self):
+        self.assertEqual(
+            dependency_command(
+                ["c++", "-Iinc", "-MD", "-MF", "a.d", "-c", "../a.cpp", "-oa.o"]
+            ),
+            ["c++", "-Iinc", "../a.cpp", "-M"],
+        )
+        self.assertEqual(
+            dependency_command(["clang", "-o", "a.o", "-MTa.o", "-objcmt-foo", "a.m"]),
+            ["clang", "-objcmt-foo", "a.m", "-M"],
+        )
+
+    def test_parse_make_dependencies(self):
+        rule = (
+            "a.o: ../a.cpp gen/config.h \\\n  /usr/include/my\\ dir/x.h \\\n  $$y.h\n"
+        )
+        self.assertEqual(
+            parse_make_dependencies(rule),
+            ["../a.cpp", "gen/config.h", "/usr/include/my dir/x.h", "$y.h"],
+        )